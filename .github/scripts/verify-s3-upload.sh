@@ -1,5 +1,10 @@
 #!/usr/bin/env bash
-# Verify that a file uploaded to S3-compatible storage matches expected checksum
+# Verify that a file uploaded to S3-compatible storage matches expected checksum.
+# When botocore is importable this is a thin wrapper around
+# scripts/ci/verify_s3_upload.py, which streams the object through sha256 (or
+# trusts a stored full-object SHA256 checksum) without downloading it to disk.
+# Otherwise it falls back to downloading with the aws CLI and hashing the copy;
+# nothing is installed at runtime, so a PyPI outage cannot fail a release.
 set -euo pipefail
 
 FILE_PATH="${1:?Usage: $0 <file_path> <s3_url> <expected_checksum> <endpoint_url>}"
@@ -7,13 +12,24 @@ S3_URL="${2:?Missing S3 URL}"
 EXPECTED_CHECKSUM="${3:?Missing expected checksum}"
 ENDPOINT_URL="${4:?Missing endpoint URL}"
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+VERIFIER="${SCRIPT_DIR}/../../scripts/ci/verify_s3_upload.py"
+PYTHON_BIN="$(command -v python3 || command -v python || true)"
 FILENAME=$(basename "$FILE_PATH")
 
 echo "[INFO] Verifying upload of ${FILENAME}"
 echo "[INFO] Expected checksum: ${EXPECTED_CHECKSUM}"
 
+if [[ -n "$PYTHON_BIN" ]] && "$PYTHON_BIN" -c "import botocore" >/dev/null 2>&1; then
+  exec "$PYTHON_BIN" "$VERIFIER" \
+    --endpoint-url "${ENDPOINT_URL}" \
+    --object "${S3_URL}" "${EXPECTED_CHECKSUM}"
+fi
+
+echo "[INFO] botocore not available; downloading with the aws CLI to verify"
+
 # Download file from S3 to temp location
-TEMP_FILE="/tmp/verify_${FILENAME}_$$"
+TEMP_FILE="${RUNNER_TEMP:-/tmp}/verify_${FILENAME}_$$"
 trap 'rm -f "$TEMP_FILE"' EXIT
 
 echo "[INFO] Downloading from S3: ${S3_URL}"
@@ -0,0 +1,892 @@
+#!/usr/bin/env python3
+"""Match build error logs against known failure patterns in a single pass.
+
+The old analyze-error.sh ran one grep per pattern, reading the log 14 times.
+Here a single `grep -nE -e p1 -e p2 ...` prints every line that matches any
+known pattern, and only those lines are classified in Python. A line can
+count towards several patterns. Where grep is unavailable the log is read
+by ErrorScanner instead.
+
+Matches are reported with counts and line numbers, earliest first, because
+the first error is usually the root cause.
+
+Follow mode scans a log while the build is still writing it. It reads only
+the bytes appended since the offset stored in a checkpoint file, with
+ErrorScanner. Each known pattern is reported as a GitHub annotation the first
+time it appears. Fatal ones (keychain, linker, disk space, Rust compile
+errors) can stop the build; execute_build.sh still retries a stopped build
+whose log shows a transient failure.
+
+Usage:
+    python analyze_build_errors.py <log_file> [--json]
+    python analyze_build_errors.py <log_file> --state FILE [--follow --stop-file F]
+        [--abort-file F] [--kill-pid PID]
+    python analyze_build_errors.py --benchmark [--size-mb N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+BLOCK_SIZE = 4 * 1024 * 1024
+FALLBACK_LINES = 10
+MAX_LINE_NUMBERS = 20
+MAX_EXAMPLE_CHARS = 300
+RULE = "━" * 55
+
+# Shown when nothing known matches, like the old `grep -iE ... | head -10`
+FALLBACK_WORDS = (b"error", b"failed", b"panic", b"fatal")
+# Byte-wise matching like the bytes regexes, and much faster than a UTF-8 locale
+GREP_ENV = {**os.environ, "LC_ALL": "C"}
+
+
+@dataclass(frozen=True)
+class ErrorPattern:
+    name: str
+    pattern: str
+    solution: str
+    # The build cannot succeed once this appears (and is not retried), so a
+    # follow-mode watcher may stop it early instead of waiting for the end
+    fatal: bool = False
+
+
+KNOWN_ERRORS = (
+    ErrorPattern(
+        "keychain",
+        r"codesign.*errSecInternalComponent",
+        """\
+🔐 **Keychain Access Issue**
+
+**Solution**: Unlock keychain with `security unlock-keychain`
+
+**Common Causes**:
+- Keychain locked after timeout
+- Certificate not properly imported
+- Wrong keychain being used
+
+**Docs**: See macOS signing documentation""",
+        fatal=True,
+    ),
+    ErrorPattern(
+        "windows-linker",
+        r"LINK : fatal error LNK1120|LINK : fatal error LNK",
+        """\
+🔗 **Windows Linker Error**
+
+**Solution**: Missing DLL or library dependency
+
+**Check**:
+- Visual Studio installation complete
+- Windows SDK version matches requirements
+- PATH includes required libraries
+
+**Common Fix**: Reinstall Visual Studio Build Tools""",
+        fatal=True,
+    ),
+    ErrorPattern(
+        "windows-encoding",
+        r"UnicodeDecodeError.*cp1252",
+        """\
+📝 **Windows Encoding Error**
+
+**Solution**: Add `PYTHONIOENCODING=utf-8` to environment
+
+**Why**: Windows uses cp1252 by default, but build logs contain UTF-8
+
+**Status**: This should already be fixed in CI config - if seeing this, config wasn't applied""",
+    ),
+    ErrorPattern(
+        "disk-space",
+        r"No space left on device",
+        """\
+💾 **Disk Space Issue**
+
+**Solution**: Clean up before build or use larger runner
+
+**Commands**:
+```bash
+df -h                    # Check available space
+rm -rf target/           # Clean Rust builds
+rm -rf node_modules/     # Clean Node packages
+```
+
+**Required**: Minimum 20GB free space""",
+        fatal=True,
+    ),
+    ErrorPattern(
+        "rust-unwrap-none",
+        r"thread.*panicked.*unwrap.*on.*None",
+        """\
+🦀 **Rust Panic (Option::unwrap)**
+
+**Solution**: Check for None values in Rust code
+
+**Likely Causes**:
+- Missing configuration file
+- Environment variable not set
+- File path doesn't exist
+
+**Debug**: Look for `.unwrap()` calls in stack trace""",
+    ),
+    ErrorPattern(
+        "rust-trait-bound",
+        r"error\[E0277\].*trait bound",
+        """\
+🦀 **Rust Trait Bound Error**
+
+**Solution**: Type doesn't implement required trait
+
+**Check**:
+- Generic constraints
+- Trait implementations
+- `use` statements for trait imports
+
+**Common Fix**: Add trait implementation or derive macro""",
+        fatal=True,
+    ),
+    ErrorPattern(
+        "python-import",
+        r"ModuleNotFoundError.*rostoc",
+        """\
+🐍 **Python Import Error**
+
+**Solution**: Virtual environment not activated or package not installed
+
+**Fix**:
+```bash
+source .venv/bin/activate
+pip install -e .
+pip install -e shared-python
+```
+
+**CI Context**: Build script should handle this automatically""",
+    ),
+    ErrorPattern(
+        "tauri-build",
+        r"Tauri.*process.*failed|tauri_build.*failed",
+        """\
+⚡ **Tauri Build Failure**
+
+**Common Causes**:
+- Rust compilation errors (check above)
+- Missing system dependencies
+- Invalid Tauri config
+
+**Debug Steps**:
+1. Check Rust errors first
+2. Verify `tauri.conf.json` syntax
+3. Ensure all features are available
+
+**Logs**: Check both Rust and Node logs""",
+    ),
+    ErrorPattern(
+        "bundler-flake",
+        r"Peer disconnected|failed to bundle project|bundle_dmg\.sh",
+        """\
+📦 **Installer Bundler / Download Flake**
+
+**Likely Cause**: Platform installer packaging failed after compile, often during WebView2/WiX download on Windows or DMG creation on macOS.
+
+**CI Behavior**: The final build wrapper retries this class once because the compiled target can usually be reused.
+
+**Debug**: Check the full build log for the first bundler line before the wrapper error.""",
+    ),
+    ErrorPattern(
+        "node-package",
+        r"pnpm.*ERR|npm.*ERR",
+        """\
+📦 **Node Package Error**
+
+**Solution**: Dependency installation or resolution issue
+
+**Fix**:
+```bash
+rm -rf node_modules pnpm-lock.yaml
+pnpm install
+```
+
+**Check**: Node version matches requirements (check .nvmrc)""",
+    ),
+    ErrorPattern(
+        "xcode-tools",
+        r"xcrun.*error|xcode-select.*error",
+        """\
+🍎 **Xcode Tools Missing (macOS)**
+
+**Solution**: Install or configure Xcode Command Line Tools
+
+**Fix**:
+```bash
+xcode-select --install
+sudo xcode-select --switch /Applications/Xcode.app
+```
+
+**Verify**: `xcrun --show-sdk-path` should show valid path""",
+    ),
+    ErrorPattern(
+        "signing-certificate",
+        r"certificate.*not found|signing identity.*not found",
+        """\
+🔏 **Code Signing Certificate Missing**
+
+**Solution**: Certificate not imported or expired
+
+**Check**:
+1. Certificate exists: `security find-identity -v -p codesigning`
+2. Not expired: Check validity dates
+3. Correct keychain: Import to login keychain
+
+**CI Context**: Check `APPLE_CERTIFICATE` secret is set""",
+    ),
+    ErrorPattern(
+        "rust-scope",
+        r"cannot find.*in.*scope|cannot find.*in this scope",
+        """\
+🦀 **Rust Scope Error**
+
+**Solution**: Missing import or typo in identifier
+
+**Fix**:
+- Add `use` statement
+- Check for typos
+- Verify module structure
+
+**Hint**: Error shows what was being looked for""",
+        fatal=True,
+    ),
+    ErrorPattern(
+        "build-script",
+        r"failed to run custom build command",
+        """\
+🔨 **Custom Build Script Error**
+
+**Solution**: Check `build.rs` script
+
+**Common Issues**:
+- Missing system libraries
+- Invalid build script logic
+- Environment setup
+
+**Debug**: Look for build script output above this error""",
+        # Not fatal: build.rs scripts that download (e.g. on Windows) fail
+        # transiently, and execute_build.sh retries those
+    ),
+)
+
+
+@dataclass
+class PatternMatch:
+    pattern: ErrorPattern
+    count: int = 0
+    line_numbers: List[int] = field(default_factory=list)
+    example: str = ""
+
+    @property
+    def first_line(self) -> int:
+        return self.line_numbers[0]
+
+
+def _decode(line: bytes) -> str:
+    text = line.rstrip(b"\r").decode("utf-8", errors="replace")
+    return text if len(text) <= MAX_EXAMPLE_CHARS else text[: MAX_EXAMPLE_CHARS - 1] + "…"
+
+
+def required_literals(pattern: str) -> Optional[List[str]]:
+    """One literal per alternative that every matching line must contain.
+
+    Handles the `a.*b|c` shape all known patterns use; returns None for
+    anything richer, and such patterns are searched with their regex instead.
+    """
+    if "(" in pattern:
+        return None
+    literals = []
+    for alternative in pattern.split("|"):
+        best = ""
+        for segment in alternative.split(".*"):
+            if re.search(r"\\[A-Za-z0-9]", segment) or re.search(
+                r"[][(){}?+*^$.|]", re.sub(r"\\.", "", segment)
+            ):
+                continue
+            literal = re.sub(r"\\(.)", r"\1", segment)
+            if len(literal) > len(best):
+                best = literal
+        if not best:
+            return None
+        literals.append(best)
+    return literals
+
+
+class ErrorScanner:
+    """Incremental matcher: ``feed()`` log bytes in order, then ``finish()``."""
+
+    def __init__(self, patterns: Sequence[ErrorPattern] = KNOWN_ERRORS) -> None:
+        self.patterns = list(patterns)
+        # Bytes patterns, so the log never needs decoding; like grep, `.`
+        # stops at newlines and matching is case-sensitive
+        self._regexes = [re.compile(p.pattern.encode("utf-8")) for p in self.patterns]
+        self._literals: List[bytes] = []
+        self._unfiltered: List[re.Pattern[bytes]] = []
+        for pattern, regex in zip(self.patterns, self._regexes):
+            literals = required_literals(pattern.pattern)
+            if literals is None:
+                self._unfiltered.append(regex)
+            else:
+                self._literals.extend(
+                    literal.encode("utf-8")
+                    for literal in literals
+                    if literal.encode("utf-8") not in self._literals
+                )
+        # A line containing "LINK : fatal error LNK1120" also contains
+        # "LINK : fatal error LNK"; sweeping for the shorter one is enough
+        self._literals = [
+            literal
+            for literal in self._literals
+            if not any(other != literal and other in literal for other in self._literals)
+        ]
+        self.reset()
+
+    def reset(self, lines: int = 0) -> None:
+        """Forget all results; line numbers continue from ``lines``."""
+        self.matches: Dict[str, PatternMatch] = {}
+        self.fallback_lines: List[tuple[int, str]] = []
+        self.lines = lines
+        self.bytes = 0
+        self._partial = b""
+
+    @property
+    def consumed(self) -> int:
+        """Bytes fed so far that ended in a newline and have been scanned."""
+        return self.bytes - len(self._partial)
+
+    def feed(self, data: bytes) -> List[PatternMatch]:
+        """Scan complete lines in ``data``; returns patterns seen for the first time."""
+        self.bytes += len(data)
+        data = self._partial + data
+        cut = data.rfind(b"\n") + 1
+        self._partial = data[cut:]
+        return self._scan(data[:cut]) if cut else []
+
+    def finish(self) -> List[PatternMatch]:
+        """Scan a trailing line that has no newline."""
+        block, self._partial = self._partial, b""
+        new = self._scan(block) if block else []
+        if block:
+            self.lines += 1
+        return new
+
+    def _candidates(self, block: bytes) -> Dict[int, int]:
+        """Start -> end offsets of every line that could match a known pattern."""
+        candidates: Dict[int, int] = {}
+
+        def add(position: int) -> int:
+            start = block.rfind(b"\n", 0, position) + 1
+            end = block.find(b"\n", position)
+            if end == -1:
+                end = len(block)
+            candidates[start] = end
+            return end
+
+        # bytes.find runs at memchr speed, far faster than a Python regex
+        # alternation, so each literal is located with its own sweep
+        for literal in self._literals:
+            position = block.find(literal)
+            while position != -1:
+                position = block.find(literal, add(position))
+        for regex in self._unfiltered:
+            hit = regex.search(block)
+            while hit is not None:
+                hit = regex.search(block, add(hit.start()))
+        return candidates
+
+    @staticmethod
+    def _fallback_candidates(block: bytes, wanted: int) -> Dict[int, int]:
+        """The first ``wanted`` lines containing a fallback word, case-insensitively."""
+        if wanted <= 0:
+            return {}
+        lowered = block.lower()
+        lines: Dict[int, int] = {}
+        for word in FALLBACK_WORDS:
+            position = lowered.find(word)
+            found = 0
+            while position != -1 and found < wanted:
+                start = lowered.rfind(b"\n", 0, position) + 1
+                end = lowered.find(b"\n", position)
+                end = len(lowered) if end == -1 else end
+                if start not in lines:
+                    lines[start] = end
+                    found += 1
+                position = lowered.find(word, end)
+        return {start: lines[start] for start in sorted(lines)[:wanted]}
+
+    def _scan(self, block: bytes) -> List[PatternMatch]:
+        candidates = self._candidates(block)
+        wanted = FALLBACK_LINES - len(self.fallback_lines)
+        fallback = self._fallback_candidates(block, wanted)
+        for start, end in fallback.items():
+            candidates.setdefault(start, end)
+
+        new: List[PatternMatch] = []
+        line_number = self.lines
+        counted = 0
+        for start in sorted(candidates):
+            line_number += block.count(b"\n", counted, start)
+            counted = start
+            line = block[start : candidates[start]]
+            new.extend(self.classify(line, line_number + 1))
+            if start in fallback:
+                self.fallback_lines.append((line_number + 1, _decode(line)))
+        self.lines += block.count(b"\n")
+        return new
+
+    def classify(self, line: bytes, line_number: int) -> List[PatternMatch]:
+        """Count ``line`` towards every pattern it matches; returns first sightings."""
+        new = []
+        for pattern, regex in zip(self.patterns, self._regexes):
+            if not regex.search(line):
+                continue
+            match = self.matches.get(pattern.name)
+            if match is None:
+                match = PatternMatch(pattern, example=_decode(line))
+                self.matches[pattern.name] = match
+                new.append(match)
+            match.count += 1
+            if len(match.line_numbers) < MAX_LINE_NUMBERS:
+                match.line_numbers.append(line_number)
+        return new
+
+    def ordered_matches(self) -> List[PatternMatch]:
+        return sorted(self.matches.values(), key=lambda match: match.first_line)
+
+
+def scan_range(path: str, start: int, end: int) -> ErrorScanner:
+    scanner = ErrorScanner()
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = handle.read(min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            scanner.feed(data)
+    scanner.finish()
+    return scanner
+
+
+def grep_lines(grep: str, path: Path, options: Sequence[str]) -> List[tuple[int, bytes]]:
+    """Line number and text of every line ``grep -n`` prints for ``options``."""
+    result = subprocess.run(
+        [grep, "-a", "-n", *options, "--", str(path)],
+        check=False,
+        capture_output=True,
+        env=GREP_ENV,
+    )
+    # 1 only means nothing matched
+    if result.returncode > 1:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="replace").strip())
+    lines = []
+    for line in result.stdout.splitlines():
+        number, _, text = line.partition(b":")
+        lines.append((int(number), text))
+    return lines
+
+
+def scan_file(path: Path) -> ErrorScanner:
+    """One grep over the log for all patterns; only its hits are classified here."""
+    grep = shutil.which("grep")
+    if grep is None:
+        return scan_range(str(path), 0, path.stat().st_size)
+
+    scanner = ErrorScanner()
+    options = ["-E"]
+    for pattern in scanner.patterns:
+        options += ["-e", pattern.pattern]
+    try:
+        for number, line in grep_lines(grep, path, options):
+            scanner.classify(line, number)
+        # Only shown when nothing known matched, so only searched for then
+        if not scanner.matches:
+            words = "|".join(word.decode("ascii") for word in FALLBACK_WORDS)
+            fallback = ["-i", "-E", "-m", str(FALLBACK_LINES), "-e", words]
+            scanner.fallback_lines = [
+                (number, _decode(line)) for number, line in grep_lines(grep, path, fallback)
+            ]
+    except RuntimeError as err:
+        print(f"[WARN] grep failed ({err}); scanning {path} in Python", file=sys.stderr)
+        return scan_range(str(path), 0, path.stat().st_size)
+    return scanner
+
+
+def format_line_numbers(match: PatternMatch) -> str:
+    shown = ", ".join(str(number) for number in match.line_numbers)
+    if match.count > len(match.line_numbers):
+        shown += ", …"
+    return shown
+
+
+def render_markdown(scanner: ErrorScanner, log_path: Path) -> str:
+    out = [f"🔍 Analyzing error log: {log_path}", ""]
+    matches = scanner.ordered_matches()
+    for match in matches:
+        out += [
+            RULE,
+            "✅ Known Error Pattern Detected",
+            RULE,
+            "",
+            match.pattern.solution,
+            "",
+            f"**Matched**: {match.count} line(s) (line {format_line_numbers(match)})",
+            "```",
+            match.example,
+            "```",
+            "",
+        ]
+
+    if not matches:
+        out += [
+            "❓ No known error patterns detected",
+            "",
+            "**This may be a new type of failure**",
+            "",
+            "🔍 **Top error lines**:",
+            "```",
+        ]
+        if scanner.fallback_lines:
+            out += [text for _, text in scanner.fallback_lines]
+        else:
+            out.append("No obvious errors found in pattern search")
+        out += [
+            "```",
+            "",
+            "💡 **Debugging Tips**:",
+            "- Check full build log for context",
+            "- Look for the first error (subsequent errors may be cascading)",
+            "- Search GitHub issues for similar errors",
+            "- Consider adding this pattern to the knowledge base",
+        ]
+    else:
+        out += [RULE, f"✨ Found {len(matches)} known error pattern(s)", RULE]
+    return "\n".join(out)
+
+
+def render_json(scanner: ErrorScanner, log_path: Path) -> str:
+    return json.dumps(
+        {
+            "log": str(log_path),
+            "matches": [
+                {
+                    "name": match.pattern.name,
+                    "count": match.count,
+                    "line_numbers": match.line_numbers,
+                    "example": match.example,
+                }
+                for match in scanner.ordered_matches()
+            ],
+            "fallback_lines": [
+                {"line": number, "text": text} for number, text in scanner.fallback_lines
+            ],
+        },
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+class Checkpoint:
+    """Offset of the first unscanned byte of a growing log, kept between scans."""
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self.restart()
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as err:
+                print(f"[WARN] Ignoring unreadable checkpoint {path}: {err}")
+            else:
+                if data.get("version") == 1:
+                    self.offset = int(data.get("offset") or 0)
+                    self.lines = int(data.get("lines") or 0)
+                    self.reported = list(data.get("reported") or [])
+
+    def restart(self) -> None:
+        self.offset = 0
+        self.lines = 0
+        self.reported: List[str] = []
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        payload = json.dumps(
+            {
+                "version": 1,
+                "offset": self.offset,
+                "lines": self.lines,
+                "reported": self.reported,
+            },
+            indent=2,
+        )
+        # Write-then-rename so an interrupted watcher never leaves a torn file
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def scan_increment(
+    path: Path, checkpoint: Checkpoint, scanner: ErrorScanner, final: bool = False
+) -> List[PatternMatch]:
+    """Scan what was appended since the checkpoint; returns patterns not yet reported.
+
+    A trailing line without a newline is left for the next call unless
+    ``final`` is set, so a line is never matched while half written.
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return []
+    if size < checkpoint.offset:
+        print(f"[WARN] {path} is shorter than its checkpoint; rescanning from the start")
+        checkpoint.restart()
+    if size == checkpoint.offset:
+        return []
+
+    scanner.reset(lines=checkpoint.lines)
+    with path.open("rb") as handle:
+        handle.seek(checkpoint.offset)
+        remaining = size - checkpoint.offset
+        while remaining > 0:
+            data = handle.read(min(BLOCK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            scanner.feed(data)
+    if final:
+        scanner.finish()
+        checkpoint.offset += scanner.bytes
+    else:
+        checkpoint.offset += scanner.consumed
+    checkpoint.lines = scanner.lines
+
+    new = [
+        match
+        for match in scanner.ordered_matches()
+        if match.pattern.name not in checkpoint.reported
+    ]
+    checkpoint.reported.extend(match.pattern.name for match in new)
+    checkpoint.save()
+    return new
+
+
+def _escape_annotation(text: str) -> str:
+    return text.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def announce(match: PatternMatch) -> None:
+    """Print a GitHub annotation and the suggested fix for a newly seen pattern."""
+    headline = match.pattern.solution.splitlines()[0].replace("**", "")
+    command = "error" if match.pattern.fatal else "warning"
+    message = f"{headline} at log line {match.first_line}: {match.example}"
+    title = f"Known build error ({match.pattern.name})"
+    print(f"::{command} title={title}::{_escape_annotation(message)}")
+    print(match.pattern.solution)
+    print("", flush=True)
+
+
+def kill_process_tree(pid: int) -> None:
+    """Terminate ``pid`` and everything it started (cargo, rustc, bundlers)."""
+    import signal
+
+    if os.name == "nt":
+        subprocess.run(
+            ["taskkill", "/T", "/F", "/PID", str(pid)], check=False, capture_output=True
+        )
+        return
+
+    listing = subprocess.run(
+        ["ps", "-A", "-o", "pid=", "-o", "ppid="],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    children: Dict[int, List[int]] = {}
+    for line in listing.stdout.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[0].isdigit() and fields[1].isdigit():
+            children.setdefault(int(fields[1]), []).append(int(fields[0]))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        if current != os.getpid():
+            tree.append(current)
+        pending.extend(children.get(current, []))
+    for target in tree:
+        try:
+            os.kill(target, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+def watch(path: Path, args: argparse.Namespace) -> int:
+    """Incremental scan of a growing log; with --follow, poll until --stop-file appears."""
+    checkpoint = Checkpoint(args.state)
+    scanner = ErrorScanner()
+    aborted = False
+    while True:
+        final = args.stop_file is not None and args.stop_file.exists()
+        for match in scan_increment(path, checkpoint, scanner, final=final):
+            announce(match)
+            if match.pattern.fatal and not aborted and (args.abort_file or args.kill_pid):
+                aborted = True
+                print(f"[ERROR] {match.pattern.name}: this build cannot succeed; stopping it")
+                if args.abort_file:
+                    args.abort_file.write_text(f"{match.pattern.name}\n", encoding="utf-8")
+                if args.kill_pid:
+                    kill_process_tree(args.kill_pid)
+        if final or not args.follow:
+            return 0
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+SYNTHETIC_LINES = (
+    b"   Compiling serde v1.0.210\n",
+    b"   Compiling tokio v1.40.0 (features: full)\n",
+    b"warning: unused variable: `config`\n",
+    b"  --> src/main.rs:42:9\n",
+    b"[INFO] Bundling Rostoc.app (/Users/runner/work/target/release/bundle/macos)\n",
+    b"    Finished `release` profile [optimized] target(s) in 5m 32s\n",
+    b"2026-01-01T00:00:00.0000000Z vite v5.4.0 building for production...\n",
+    b"transforming (1423) src/components/Editor.tsx\n",
+)
+
+
+def write_synthetic_log(path: Path, size_mb: int) -> None:
+    """Typical build output with a keychain and a linker error near the end."""
+    chunk = b"".join(SYNTHETIC_LINES) * 2048
+    target = size_mb * 1024 * 1024
+    with path.open("wb") as handle:
+        written = 0
+        while written < target:
+            handle.write(chunk)
+            written += len(chunk)
+        handle.write(b"error: codesign failed: errSecInternalComponent\n")
+        handle.write(b"LINK : fatal error LNK1120: 1 unresolved externals\n")
+
+
+def legacy_scan_seconds(path: Path) -> Optional[float]:
+    """Time the old approach: one `grep -qE` over the whole log per pattern."""
+    if shutil.which("grep") is None:
+        return None
+    started = time.perf_counter()
+    for pattern in KNOWN_ERRORS:
+        subprocess.run(["grep", "-qE", pattern.pattern, str(path)], check=False)
+    return time.perf_counter() - started
+
+
+def python_scan_seconds(path: Path) -> float:
+    """Time ErrorScanner, the engine follow mode uses, over the whole log."""
+    started = time.perf_counter()
+    scan_range(str(path), 0, path.stat().st_size)
+    return time.perf_counter() - started
+
+
+def run_benchmark(size_mb: int) -> int:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "synthetic-build.log"
+        write_synthetic_log(path, size_mb)
+        print(f"[INFO] Synthetic log: {path.stat().st_size / 1024 / 1024:.0f} MB")
+
+        # Warm the page cache so the first timing does not pay for the disk
+        legacy_scan_seconds(path)
+        started = time.perf_counter()
+        scanner = scan_file(path)
+        single_pass = time.perf_counter() - started
+        found = ", ".join(match.pattern.name for match in scanner.ordered_matches())
+        print(
+            f"[INFO] single grep pass: {single_pass:.2f}s "
+            f"({size_mb / single_pass:.0f} MB/s), matched: {found or 'none'}"
+        )
+
+        legacy = legacy_scan_seconds(path)
+        if legacy is None:
+            print("[WARN] grep not found; skipping the per-pattern baseline")
+        else:
+            print(
+                f"[INFO] grep per pattern ({len(KNOWN_ERRORS)} scans): {legacy:.2f}s "
+                f"({legacy / single_pass:.1f}x the single pass)"
+            )
+        python = python_scan_seconds(path)
+        print(
+            f"[INFO] ErrorScanner (follow mode): {python:.2f}s "
+            f"({python / single_pass:.1f}x the single pass)"
+        )
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log_file", nargs="?", type=Path)
+    parser.add_argument("--json", action="store_true", help="Print matches as JSON")
+    parser.add_argument(
+        "--state",
+        type=Path,
+        help="Checkpoint file: scan only what was appended since the last run and "
+        "print diagnostics for newly seen patterns",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep scanning the log as it grows, until --stop-file exists",
+    )
+    parser.add_argument("--stop-file", type=Path, help="Finish following once this exists")
+    parser.add_argument("--interval", type=float, default=2.0, help="Follow poll interval")
+    parser.add_argument(
+        "--abort-file",
+        type=Path,
+        help="Written with the pattern name when a fatal pattern is seen",
+    )
+    parser.add_argument(
+        "--kill-pid",
+        type=int,
+        help="Process tree to terminate when a fatal pattern is seen",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Time the single grep pass against per-pattern grep and ErrorScanner",
+    )
+    parser.add_argument("--size-mb", type=int, default=256, help="Synthetic log size")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        return run_benchmark(args.size_mb)
+    if args.log_file is None:
+        parser.error("log_file is required")
+    if args.follow or args.state:
+        # The log may not exist yet when a watcher starts alongside the build
+        return watch(args.log_file, args)
+    if not args.log_file.is_file():
+        print(f"❌ Error log not found: {args.log_file}")
+        return 1
+
+    scanner = scan_file(args.log_file)
+    render = render_json if args.json else render_markdown
+    print(render(scanner, args.log_file))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
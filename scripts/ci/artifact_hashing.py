@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Parallel artifact hashing helpers shared by the release CI scripts."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+# 1 MiB reads keep syscall overhead negligible for multi-hundred-MB artifacts
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def default_workers() -> int:
+    """Worker count for hashing; hashlib releases the GIL so threads scale."""
+    return min(8, os.cpu_count() or 1)
+
+
+@dataclass
+class ArtifactInspection:
+    """Everything learned about an artifact from one streaming read.
+
+    ``block_hashes`` are sha256 digests of consecutive ``block_size`` slices;
+    ranged-GET verification and delta tooling can compare individual blocks
+    without re-reading the whole file.
+    """
+
+    size_bytes: int
+    digests: Dict[str, str]
+    block_size: int = 0
+    block_hashes: List[str] = field(default_factory=list)
+
+    @property
+    def sha256(self) -> str:
+        return self.digests["sha256"]
+
+    @property
+    def merkle_root(self) -> str:
+        return merkle_root(self.block_hashes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size_bytes": self.size_bytes,
+            "digests": self.digests,
+            "block_size": self.block_size,
+            "block_hashes": self.block_hashes,
+        }
+
+
+def merkle_root(block_hashes: Sequence[str]) -> str:
+    """Binary sha256 Merkle root over block digests (odd nodes are promoted)."""
+    if not block_hashes:
+        return hashlib.sha256(b"").hexdigest()
+    level = [bytes.fromhex(value) for value in block_hashes]
+    while len(level) > 1:
+        paired = [
+            hashlib.sha256(level[index] + level[index + 1]).digest()
+            for index in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def inspect_file(
+    path: Path,
+    algorithms: Sequence[str] = ("sha256",),
+    block_size: int = 0,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> ArtifactInspection:
+    """Compute digests, byte count and block hashes from a single read of ``path``.
+
+    A reusable buffer avoids per-chunk allocations; each chunk is fed to all
+    digests before the next read, so extra algorithms cost CPU but no I/O.
+    ``block_size=0`` skips block hashing.
+    """
+    digests = {name: hashlib.new(name) for name in algorithms}
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    size = 0
+    block_hashes: List[str] = []
+    block_digest = hashlib.sha256()
+    block_fill = 0
+    with path.open("rb", buffering=0) as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            chunk = view[:read]
+            size += read
+            for digest in digests.values():
+                digest.update(chunk)
+            offset = 0
+            while block_size and offset < read:
+                take = min(block_size - block_fill, read - offset)
+                block_digest.update(chunk[offset : offset + take])
+                block_fill += take
+                offset += take
+                if block_fill == block_size:
+                    block_hashes.append(block_digest.hexdigest())
+                    block_digest = hashlib.sha256()
+                    block_fill = 0
+    if block_fill:
+        block_hashes.append(block_digest.hexdigest())
+    return ArtifactInspection(
+        size_bytes=size,
+        digests={name: digest.hexdigest() for name, digest in digests.items()},
+        block_size=block_size,
+        block_hashes=block_hashes,
+    )
+
+
+def hash_file(
+    path: Path,
+    algorithms: Sequence[str] = ("sha256",),
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> Dict[str, str]:
+    return inspect_file(path, algorithms, 0, buffer_size).digests
+
+
+def sha256(path: Path, buffer_size: int = DEFAULT_BUFFER_SIZE) -> str:
+    return hash_file(path, ("sha256",), buffer_size)["sha256"]
+
+
+class ArtifactHasher:
+    """Hash artifacts on a thread pool, hashing each distinct file only once.
+
+    ``submit()`` returns a future immediately so callers can queue every file
+    before waiting on any result. Paths are keyed by their resolved location,
+    so the Windows MSI registered as both archive and installer is read once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        algorithms: Sequence[str] = ("sha256",),
+        block_size: int = 0,
+    ) -> None:
+        self.algorithms = tuple(algorithms)
+        self.block_size = block_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or default_workers(),
+            thread_name_prefix="artifact-hash",
+        )
+        self._futures: Dict[Path, Future[ArtifactInspection]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, path: Path) -> Future[ArtifactInspection]:
+        """Queue ``path`` and return a future of its inspection."""
+        key = path.resolve()
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._executor.submit(
+                    inspect_file, key, self.algorithms, self.block_size
+                )
+                self._futures[key] = future
+            return future
+
+    def digest(self, path: Path, algorithm: str = "sha256") -> str:
+        return self.submit(path).result().digests[algorithm]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ArtifactHasher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Print sha256sum-compatible lines for the given files"
+    )
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with ArtifactHasher(max_workers=args.workers) as hasher:
+        futures = [(path, hasher.submit(path)) for path in args.files]
+        for path, future in futures:
+            print(f"{future.result().sha256}  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
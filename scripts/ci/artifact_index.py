@@ -0,0 +1,54 @@
+"""Filename index of a downloaded artifact tree, shared by the release CI scripts.
+
+Kept free of the payload builder's imports so the uploader and other tools
+can look files up without loading chunking or delta tooling.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Dict
+
+
+class ArtifactIndex:
+    """Filename -> path index built from a single walk of an artifact root.
+
+    Replaces per-lookup ``rglob`` scans: every platform/arch combination
+    queries the same downloaded trees, so one ``os.scandir`` walk serves all
+    archive, installer and signature lookups for that root.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.files: Dict[str, Path] = {}
+        self.walk_seconds = 0.0
+        if root.exists():
+            self._walk()
+
+    def _walk(self) -> None:
+        started = time.perf_counter()
+        pending = [str(self.root)]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            # Keep the first match, mirroring find_first semantics
+                            self.files.setdefault(entry.name, Path(entry.path))
+            except OSError as err:
+                print(f"Warning: Failed to scan {directory}: {err}")
+        self.walk_seconds = time.perf_counter() - started
+
+    def find(self, name: str) -> Path | None:
+        return self.files.get(name)
+
+    def describe(self) -> str:
+        return (
+            f"Indexed {len(self.files)} file(s) under {self.root} "
+            f"in {self.walk_seconds * 1000:.1f} ms"
+        )
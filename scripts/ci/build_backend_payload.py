@@ -4,92 +4,29 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
+import subprocess
 import sys
+import time
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Any, Dict
 
-# Add rostoc scripts to path for runtime_config import
-ROSTOC_SCRIPTS = Path(__file__).resolve().parents[3] / "rostoc" / "scripts"
-if ROSTOC_SCRIPTS.exists():
-    sys.path.insert(0, str(ROSTOC_SCRIPTS))
-    from runtime_config import ARTIFACT_NAMING, STORAGE_PATHS
-else:
-    # Fallback for when running without rostoc repo
-    class ARTIFACT_NAMING:
-        @staticmethod
-        def get_updater_archive_name(
-            version: str, platform: str, arch: str, channel: str = "stable"
-        ) -> str:
-            variant_prefix = "Rostoc-staging" if channel == "staging" else "Rostoc"
-            if platform == "macos":
-                return f"{variant_prefix}-{version}-darwin-{arch}.app.tar.gz"
-            elif platform == "windows":
-                # Windows: MSI file is used directly as updater archive (Tauri v2)
-                norm_arch = (
-                    "x64" if arch == "x86_64" else "x86" if arch == "i686" else arch
-                )
-                return f"{variant_prefix}-{version}-windows-{norm_arch}.msi"
-            return f"{variant_prefix}-{version}-{platform}-{arch}.tar.gz"
-
-        @staticmethod
-        def get_installer_name(
-            version: str, platform: str, arch: str, channel: str = "stable"
-        ) -> str:
-            variant_prefix = "Rostoc-staging" if channel == "staging" else "Rostoc"
-            if platform == "macos":
-                return f"{variant_prefix}_{version}_{arch}.dmg"
-            elif platform == "windows":
-                norm_arch = (
-                    "x64" if arch == "x86_64" else "x86" if arch == "i686" else arch
-                )
-                return f"{variant_prefix}-{version}-windows-{norm_arch}.msi"
-            return f"{variant_prefix}-{version}-{platform}-{arch}.AppImage"
-
-        @staticmethod
-        def get_signature_name(artifact: str) -> str:
-            return f"{artifact}.sig"
-
-    class STORAGE_PATHS:
-        @staticmethod
-        def get_storage_path(
-            version: str, filename: str, channel: str = "stable"
-        ) -> str:
-            prefix = "releases/staging" if channel == "staging" else "releases"
-            return f"{prefix}/v{version}/{filename}"
-
-        @staticmethod
-        def get_cdn_url(
-            version: str, filename: str, cdn_base: str, channel: str = "stable"
-        ) -> str:
-            if not cdn_base:
-                return ""
-            storage_path = STORAGE_PATHS.get_storage_path(version, filename, channel)
-            return f"{cdn_base}/{storage_path}"
-
-        @staticmethod
-        def get_signature_path(
-            version: str, filename: str, channel: str = "stable"
-        ) -> str:
-            return STORAGE_PATHS.get_storage_path(version, f"{filename}.sig", channel)
-
-
-def sha256(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(65536), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
-def find_first(root: Path, name: str) -> Path | None:
-    if not root.exists():
-        return None
-    for candidate in root.rglob(name):
-        if candidate.is_file():
-            return candidate
-    return None
+from artifact_hashing import (
+    DEFAULT_BLOCK_SIZE,
+    ArtifactHasher,
+    ArtifactInspection,
+    inspect_file,
+)
+from artifact_index import ArtifactIndex
+from chunk_manifest import ChunkManifestBuilder
+from delta_patches import (
+    create_patch,
+    fetch_base_archive,
+    patch_name,
+    zstd_binary,
+)
+from release_naming import ARTIFACT_NAMING, STORAGE_PATHS
 
 
 def load_json(path: Path) -> Any:
@@ -108,6 +45,78 @@ def load_checksums(root: Path) -> Dict[str, str]:
     return {}
 
 
+def lookup_stored_checksum(
+    checksums: Dict[str, str], artifact_index: ArtifactIndex, name: str
+) -> str | None:
+    """The build leg's checksum for ``name``: checksums.json, else its .sha256 sidecar.
+
+    Both arches of a platform write the same checksums.json, so after the
+    artifact merge only one leg's file is left; the sidecars cover the other.
+    """
+    if checksums.get(name):
+        return checksums[name]
+    sidecar = artifact_index.find(f"{name}.sha256")
+    if sidecar is None:
+        return None
+    try:
+        fields = sidecar.read_text(encoding="utf-8").split()
+    except OSError as err:
+        print(f"Warning: Failed to read {sidecar}: {err}")
+        return None
+    return fields[0] if fields and len(fields[0]) == 64 else None
+
+
+def load_releases_history(path: Path | None) -> list[Dict[str, Any]]:
+    """Load the ``releases`` list from a releases.json file, if provided."""
+    if path is None:
+        return []
+    if not path.exists():
+        print(f"Warning: Releases history {path} not found; no delta bases")
+        return []
+    data = load_json(path)
+    return list(data.get("releases") or []) if isinstance(data, dict) else []
+
+
+def version_key(version: str) -> tuple[int, ...]:
+    parts = []
+    for part in version.split("-", 1)[0].split("."):
+        parts.append(int(part) if part.isdigit() else 0)
+    return tuple(parts)
+
+
+def release_in_channel(entry: Dict[str, Any], platform_key: str, channel: str) -> bool:
+    """True if ``entry`` was published to ``channel``.
+
+    Entries without a ``channel`` field are matched by the storage prefix in
+    the platform URL, so a staging archive never becomes a stable delta base.
+    """
+    if entry.get("channel"):
+        return entry["channel"] == channel
+    url = str(((entry.get("platforms") or {}).get(platform_key) or {}).get("url") or "")
+    version_dir = STORAGE_PATHS.get_storage_path(str(entry["version"]), "", channel)
+    return f"/{version_dir}" in url
+
+
+def previous_versions(
+    releases: list[Dict[str, Any]],
+    platform_key: str,
+    version: str,
+    limit: int,
+    channel: str = "stable",
+) -> list[str]:
+    """Newest earlier ``channel`` versions that published an archive for ``platform_key``."""
+    current = version_key(version)
+    candidates = {
+        str(entry["version"])
+        for entry in releases
+        if entry.get("version")
+        and platform_key in (entry.get("platforms") or {})
+        and version_key(str(entry["version"])) < current
+        and release_in_channel(entry, platform_key, channel)
+    }
+    return sorted(candidates, key=version_key, reverse=True)[:limit]
+
+
 def build_asset(
     *,
     source: Path | None,
@@ -121,6 +130,8 @@ def build_asset(
     mime_type: str = "",
     extra: Dict[str, Any] | None = None,
     stored_checksum: str | None = None,
+    verify_checksum: bool = False,
+    hasher: ArtifactHasher | None = None,
 ) -> Dict[str, Any] | None:
     if source is None or not source.exists():
         return None
@@ -129,12 +140,26 @@ def build_asset(
     spaces_path = STORAGE_PATHS.get_storage_path(version, source.name, channel)
     cdn_url = STORAGE_PATHS.get_cdn_url(version, source.name, cdn_base, channel)
 
-    # Use stored checksum if available, otherwise compute it
-    if stored_checksum:
+    # Use the stored checksum if available, otherwise inspect the file: one
+    # read yields the checksum, size and block hashes. With verify_checksum a
+    # stored checksum is checked against a fresh inspection instead of being
+    # trusted. With a hasher the inspection is queued on the shared pool and
+    # resolved (and checked) by resolve_checksums().
+    checksum: str | Future[ArtifactInspection]
+    size_bytes: int | None = None
+    if stored_checksum and not verify_checksum:
         checksum = stored_checksum
+        size_bytes = source.stat().st_size
         print(f"Using stored checksum for {source.name}: {checksum}")
+    elif hasher is not None:
+        checksum = hasher.submit(source)
+        print(f"Queued checksum for {source.name}")
     else:
-        checksum = sha256(source)
+        inspection = inspect_file(source, block_size=DEFAULT_BLOCK_SIZE)
+        check_stored_checksum(source.name, inspection.sha256, stored_checksum)
+        checksum = inspection.sha256
+        size_bytes = inspection.size_bytes
+        extra = {**(extra or {}), "blocks": block_summary(inspection)}
         print(f"Computed checksum for {source.name}: {checksum}")
 
     asset: Dict[str, Any] = {
@@ -143,9 +168,12 @@ def build_asset(
         "kind": kind,
         "spaces_path": spaces_path,
         "checksum_sha256": checksum,
-        "size_bytes": source.stat().st_size,
+        "size_bytes": size_bytes,
         "mime_type": mime_type,
     }
+    if stored_checksum and isinstance(checksum, Future):
+        # Popped by resolve_checksums() before the payload is written
+        asset["stored_checksum_sha256"] = stored_checksum
 
     extra_payload: Dict[str, Any] = dict(extra or {})
     if cdn_url:
@@ -165,6 +193,79 @@ def build_asset(
     return asset
 
 
+def check_stored_checksum(name: str, actual: str, stored: str | None) -> None:
+    """Refuse to publish an artifact that no longer matches checksums.json."""
+    if stored and stored != actual:
+        raise SystemExit(
+            f"Checksum mismatch for {name}: checksums.json has {stored}, "
+            f"the artifact hashes to {actual}; refusing to publish"
+        )
+
+
+def block_summary(inspection: ArtifactInspection) -> Dict[str, Any]:
+    """Compact block-hash metadata for the payload (the full list stays local)."""
+    return {
+        "algorithm": "sha256",
+        "block_size": inspection.block_size,
+        "block_count": len(inspection.block_hashes),
+        "merkle_root": inspection.merkle_root,
+    }
+
+
+def resolve_checksums(assets: list[Dict[str, Any]]) -> None:
+    """Replace queued inspection futures with their checksum, size and blocks."""
+    for asset in assets:
+        checksum = asset["checksum_sha256"]
+        stored = asset.pop("stored_checksum_sha256", None)
+        if isinstance(checksum, Future):
+            inspection = checksum.result()
+            name = asset["spaces_path"].rsplit("/", 1)[-1]
+            check_stored_checksum(name, inspection.sha256, stored)
+            asset["checksum_sha256"] = inspection.sha256
+            asset["size_bytes"] = inspection.size_bytes
+            asset.setdefault("extra", {})["blocks"] = block_summary(inspection)
+            print(
+                f"Computed checksum for {name} ({asset['kind']}): "
+                f"{asset['checksum_sha256']}"
+            )
+
+
+def resolve_chunk_manifests(
+    assets: list[Dict[str, Any]], *, version: str, channel: str, cdn_base: str
+) -> list[Dict[str, str]]:
+    """Replace queued chunk manifest futures with their published locations.
+
+    Returns upload entries for the manifest files; the publish step uploads
+    them next to the archives they describe before the payload goes out.
+    """
+    uploads: list[Dict[str, str]] = []
+    for asset in assets:
+        extra = asset.get("extra") or {}
+        manifest = extra.get("chunk_manifest")
+        if not isinstance(manifest, Future):
+            continue
+        info = manifest.result()
+        name = info["path"].name
+        spaces_path = STORAGE_PATHS.get_storage_path(version, name, channel)
+        extra["chunk_manifest"] = {
+            "spaces_path": spaces_path,
+            "checksum_sha256": info["checksum_sha256"],
+            "size_bytes": info["size_bytes"],
+            "chunk_count": info["chunk_count"],
+            "chunking": info["chunking"],
+        }
+        cdn_url = STORAGE_PATHS.get_cdn_url(version, name, cdn_base, channel)
+        if cdn_url:
+            extra["chunk_manifest"]["cdn_url"] = cdn_url
+        uploads.append(upload_entry(info["path"], spaces_path, "application/json"))
+        print(f"Chunk manifest for {asset['spaces_path']}: {info['chunk_count']} chunk(s)")
+    return uploads
+
+
+def upload_entry(path: Path, spaces_path: str, content_type: str) -> Dict[str, str]:
+    return {"path": str(path), "spaces_path": spaces_path, "content_type": content_type}
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--version", required=True)
@@ -185,7 +286,83 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--windows-root", default=Path("windows-artifacts"), type=Path)
     parser.add_argument("--linux-root", default=Path("linux-artifacts"), type=Path)
     parser.add_argument("--output", default=Path("publish-payload.json"), type=Path)
-    return parser.parse_args()
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=None,
+        help=(
+            "Threads used to hash artifacts without a stored checksum "
+            "(every artifact with --verify-checksums)"
+        ),
+    )
+    parser.add_argument(
+        "--verify-checksums",
+        action="store_true",
+        help=(
+            "Re-read artifacts that have a stored checksum and refuse to publish "
+            "on a mismatch with checksums.json (also records their block hashes)"
+        ),
+    )
+    parser.add_argument(
+        "--chunk-manifest-dir",
+        type=Path,
+        default=None,
+        help=(
+            "Write content-defined chunk manifests for updater archives here "
+            "(needs --uploads-output; the payload references them on the CDN)"
+        ),
+    )
+    parser.add_argument(
+        "--uploads-output",
+        type=Path,
+        default=None,
+        help=(
+            "Write the generated files the payload references (chunk manifests, "
+            "delta patches) as a JSON list of {path, spaces_path, content_type}; "
+            "upload them before publishing the payload"
+        ),
+    )
+    parser.add_argument(
+        "--releases-file",
+        type=Path,
+        default=None,
+        help="releases.json used to list earlier versions chunk manifests can diff against",
+    )
+    parser.add_argument(
+        "--delta-base-limit",
+        type=int,
+        default=3,
+        help="Maximum number of earlier versions advertised as delta bases",
+    )
+    parser.add_argument(
+        "--delta-dir",
+        type=Path,
+        default=None,
+        help=(
+            "Create zstd delta patches from the previous release of the channel "
+            "(needs --uploads-output and --delta-base-version or --releases-file). "
+            "Archives that are already compressed (.tar.gz, MSI) patch poorly; "
+            "patches above 80%% of the archive are dropped"
+        ),
+    )
+    parser.add_argument(
+        "--delta-base-version",
+        default=None,
+        help="Previous release of the channel to patch from (overrides --releases-file)",
+    )
+    parser.add_argument(
+        "--delta-base-dir",
+        type=Path,
+        default=None,
+        help="Local directory holding previous release archives (skips CDN download)",
+    )
+    args = parser.parse_args()
+    # Without an upload list the payload would point at files nobody uploads
+    if args.chunk_manifest_dir and not args.uploads_output:
+        parser.error("--chunk-manifest-dir requires --uploads-output")
+    if args.delta_dir and not args.uploads_output:
+        parser.error("--delta-dir requires --uploads-output")
+    return args
 
 
 def load_release_notes(args: argparse.Namespace) -> str:
@@ -221,11 +398,15 @@ def get_mime_type(platform: str, kind: str) -> str:
     
     Args:
         platform: Target platform (macos, windows, linux)
-        kind: Asset kind (archive, installer, manifest, checksum)
+        kind: Asset kind (archive, installer, delta, manifest, checksum)
         
     Returns:
         MIME type string for Content-Type header
     """
+    # Delta patches are zstd frames regardless of platform
+    if kind == "delta":
+        return "application/zstd"
+
     # Archive formats vary by platform
     if kind == "archive":
         if platform == "windows":
@@ -244,6 +425,13 @@ def get_mime_type(platform: str, kind: str) -> str:
     return "application/octet-stream"
 
 
+def get_platform_key(platform: str, arch: str) -> str:
+    """Platform key in releases.json (e.g., "darwin-aarch64", "windows-x86_64")."""
+    if platform == "macos":
+        return f"darwin-{arch}"
+    return f"{platform}-{arch}"
+
+
 def process_platform_artifacts(
     *,
     platform: str,
@@ -251,20 +439,21 @@ def process_platform_artifacts(
     version: str,
     channel: str,
     artifact_root: Path,
+    artifact_index: ArtifactIndex,
     checksums: Dict[str, str],
     cdn_base: str,
     release_entry: Dict[str, Any],
+    hasher: ArtifactHasher | None = None,
+    chunker: ChunkManifestBuilder | None = None,
+    releases_history: list[Dict[str, Any]] | None = None,
+    delta_base_limit: int = 3,
+    verify_checksums: bool = False,
 ) -> list[Dict[str, Any]]:
     """Process all artifacts for a given platform/architecture combination."""
     assets: list[Dict[str, Any]] = []
     backend_arch = get_arch_mapping(platform, arch)
 
-    # Platform key in releases.json (e.g., "darwin-aarch64", "windows-x86_64")
-    if platform == "macos":
-        platform_key = f"darwin-{arch}"
-    else:
-        platform_key = f"{platform}-{arch}"
-
+    platform_key = get_platform_key(platform, arch)
     platform_entry = (release_entry.get("platforms", {}) or {}).get(platform_key, {})
 
     print(f"\n=== Processing {platform} {arch} (channel: {channel}) ===")
@@ -274,13 +463,20 @@ def process_platform_artifacts(
         version, platform, arch, channel
     )
     print(f"Looking for updater archive: {archive_name}")
-    archive_path = find_first(artifact_root, archive_name)
-    archive_sig = find_first(
-        artifact_root, ARTIFACT_NAMING.get_signature_name(archive_name)
-    )
+    archive_path = artifact_index.find(archive_name)
+    archive_sig = artifact_index.find(ARTIFACT_NAMING.get_signature_name(archive_name))
 
     if archive_path:
         print(f"✅ Found updater archive: {archive_path.relative_to(artifact_root)}")
+        archive_extra: Dict[str, Any] = {"artifact": "updater"}
+        if chunker is not None:
+            # Resolved by resolve_chunk_manifests() once all archives are queued
+            archive_extra["chunk_manifest"] = chunker.submit(archive_path)
+            delta_bases = previous_versions(
+                releases_history or [], platform_key, version, delta_base_limit, channel
+            )
+            if delta_bases:
+                archive_extra["delta_base_versions"] = delta_bases
         asset = build_asset(
             source=archive_path,
             version=version,
@@ -291,8 +487,10 @@ def process_platform_artifacts(
             channel=channel,
             signature=archive_sig,
             mime_type=get_mime_type(platform, "archive"),
-            extra={"artifact": "updater"},
-            stored_checksum=checksums.get(archive_name),
+            extra=archive_extra,
+            stored_checksum=lookup_stored_checksum(checksums, artifact_index, archive_name),
+            verify_checksum=verify_checksums,
+            hasher=hasher,
         )
         if asset:
             assets.append(asset)
@@ -317,7 +515,9 @@ def process_platform_artifacts(
                 signature=archive_sig,
                 mime_type=get_mime_type(platform, "installer"),
                 extra={"artifact": "installer"},
-                stored_checksum=checksums.get(archive_name),
+                stored_checksum=lookup_stored_checksum(checksums, artifact_index, archive_name),
+                verify_checksum=verify_checksums,
+                hasher=hasher,
             )
             if asset:
                 assets.append(asset)
@@ -328,9 +528,9 @@ def process_platform_artifacts(
             version, platform, arch, channel
         )
         print(f"Looking for installer: {installer_name}")
-        installer_path = find_first(artifact_root, installer_name)
-        installer_sig = find_first(
-            artifact_root, ARTIFACT_NAMING.get_signature_name(installer_name)
+        installer_path = artifact_index.find(installer_name)
+        installer_sig = artifact_index.find(
+            ARTIFACT_NAMING.get_signature_name(installer_name)
         )
 
         if installer_path:
@@ -356,7 +556,9 @@ def process_platform_artifacts(
                 signature=installer_sig,
                 mime_type=get_mime_type(platform, "installer"),
                 extra=extra,
-                stored_checksum=checksums.get(installer_name),
+                stored_checksum=lookup_stored_checksum(checksums, artifact_index, installer_name),
+                verify_checksum=verify_checksums,
+                hasher=hasher,
             )
             if asset:
                 assets.append(asset)
@@ -366,6 +568,105 @@ def process_platform_artifacts(
     return assets
 
 
+def process_delta_patch(
+    *,
+    platform: str,
+    arch: str,
+    version: str,
+    channel: str,
+    artifact_index: ArtifactIndex,
+    releases_history: list[Dict[str, Any]],
+    cdn_base: str,
+    delta_dir: Path,
+    base_dir: Path | None = None,
+    base_version: str | None = None,
+    hasher: ArtifactHasher | None = None,
+    max_ratio: float = 0.8,
+) -> Dict[str, Any] | None:
+    """Create a zstd patch from the previous release's archive to this one.
+
+    The base is ``base_version`` when given, otherwise the newest earlier
+    release of the same channel in ``releases_history``. Its archive is looked
+    up in ``base_dir`` first and otherwise fetched from the CDN path
+    STORAGE_PATHS gives for that version. Patches larger than ``max_ratio`` of
+    the full archive are dropped as not worth it.
+    """
+    platform_key = get_platform_key(platform, arch)
+    archive_name = ARTIFACT_NAMING.get_updater_archive_name(
+        version, platform, arch, channel
+    )
+    archive_path = artifact_index.find(archive_name)
+    if archive_path is None:
+        return None
+
+    if base_version is None:
+        bases = previous_versions(releases_history, platform_key, version, 1, channel)
+        if not bases:
+            print(f"ℹ️  No previous {channel} {platform_key} release; skipping delta patch")
+            return None
+        base_version = bases[0]
+    elif version_key(base_version) >= version_key(version):
+        print(f"⚠️  Delta base {base_version} is not older than {version}; skipping")
+        return None
+    base_name = ARTIFACT_NAMING.get_updater_archive_name(
+        base_version, platform, arch, channel
+    )
+
+    base_path = (base_dir / base_name) if base_dir else None
+    if base_path is None or not base_path.exists():
+        base_url = STORAGE_PATHS.get_cdn_url(base_version, base_name, cdn_base, channel)
+        if not base_url:
+            print(f"⚠️  No local base {base_name} and no CDN base; skipping delta patch")
+            return None
+        base_path = delta_dir / "bases" / base_name
+        if not base_path.exists():
+            print(f"Downloading delta base {base_url}")
+            try:
+                fetch_base_archive(base_url, base_path)
+            except OSError as err:
+                print(f"⚠️  Failed to download delta base {base_name}: {err}")
+                return None
+
+    patch_path = delta_dir / patch_name(archive_name, base_version)
+    started = time.perf_counter()
+    try:
+        result = create_patch(base_path, archive_path, patch_path)
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as err:
+        print(f"⚠️  Delta patch {base_version} -> {version} failed: {err}")
+        return None
+
+    full_size = archive_path.stat().st_size
+    print(
+        f"✅ Delta patch {base_version} -> {version} for {platform_key}: "
+        f"{result.size_bytes} bytes ({result.size_bytes / max(full_size, 1):.1%} of "
+        f"archive, {time.perf_counter() - started:.1f}s)"
+    )
+    if result.size_bytes > full_size * max_ratio:
+        print(f"ℹ️  Delta patch not worth serving; dropping {patch_path.name}")
+        patch_path.unlink(missing_ok=True)
+        return None
+
+    return build_asset(
+        source=patch_path,
+        version=version,
+        platform=platform,
+        architecture=get_arch_mapping(platform, arch),
+        kind="delta",
+        cdn_base=cdn_base,
+        channel=channel,
+        mime_type=get_mime_type(platform, "delta"),
+        extra={
+            "artifact": "delta",
+            "base_version": base_version,
+            "base_archive": base_name,
+            "target_archive": archive_name,
+            "algorithm": "zstd-patch-from",
+            "window_log": result.window_log,
+        },
+        hasher=hasher,
+    )
+
+
 def main() -> None:
     args = parse_args()
     release_notes = load_release_notes(args)
@@ -408,25 +709,83 @@ def main() -> None:
         ("linux", "aarch64", args.linux_root, linux_checksums),
     ]
 
-    # Process each platform/architecture combination
-    for platform, arch, artifact_root, checksums in platform_configs:
-        if not artifact_root.exists():
-            print(
-                f"Skipping {platform} {arch}: artifact root {artifact_root} not found"
-            )
-            continue
+    # Walk each distinct artifact root once; all lookups go through the index
+    indexes: Dict[Path, ArtifactIndex] = {}
+    for _, _, artifact_root, _ in platform_configs:
+        if artifact_root.exists() and artifact_root not in indexes:
+            indexes[artifact_root] = ArtifactIndex(artifact_root)
+            print(indexes[artifact_root].describe())
+
+    # Process each platform/architecture combination. Missing checksums are
+    # queued on the hasher so large artifacts hash concurrently across cores.
+    releases_history = load_releases_history(args.releases_file)
+    if args.delta_dir and zstd_binary() is None:
+        print("Warning: zstd not installed; skipping delta patch generation")
+        args.delta_dir = None
+    chunker = (
+        ChunkManifestBuilder(args.chunk_manifest_dir, max_workers=args.hash_workers)
+        if args.chunk_manifest_dir
+        else None
+    )
+    uploads: list[Dict[str, str]] = []
+    with ArtifactHasher(
+        max_workers=args.hash_workers, block_size=DEFAULT_BLOCK_SIZE
+    ) as hasher:
+        for platform, arch, artifact_root, checksums in platform_configs:
+            if not artifact_root.exists():
+                print(
+                    f"Skipping {platform} {arch}: artifact root {artifact_root} not found"
+                )
+                continue
 
-        platform_assets = process_platform_artifacts(
-            platform=platform,
-            arch=arch,
-            version=args.version,
-            channel=args.channel,
-            artifact_root=artifact_root,
-            checksums=checksums,
-            cdn_base=args.cdn_base,
-            release_entry=release_entry,
+            platform_assets = process_platform_artifacts(
+                platform=platform,
+                arch=arch,
+                version=args.version,
+                channel=args.channel,
+                artifact_root=artifact_root,
+                artifact_index=indexes[artifact_root],
+                checksums=checksums,
+                cdn_base=args.cdn_base,
+                release_entry=release_entry,
+                hasher=hasher,
+                chunker=chunker,
+                releases_history=releases_history,
+                delta_base_limit=args.delta_base_limit,
+                verify_checksums=args.verify_checksums,
+            )
+            assets.extend(platform_assets)
+
+            if args.delta_dir and any(a["kind"] == "archive" for a in platform_assets):
+                delta_asset = process_delta_patch(
+                    platform=platform,
+                    arch=arch,
+                    version=args.version,
+                    channel=args.channel,
+                    artifact_index=indexes[artifact_root],
+                    releases_history=releases_history,
+                    cdn_base=args.cdn_base,
+                    delta_dir=args.delta_dir,
+                    base_dir=args.delta_base_dir,
+                    base_version=args.delta_base_version,
+                    hasher=hasher,
+                )
+                if delta_asset:
+                    assets.append(delta_asset)
+                    patch_file = args.delta_dir / delta_asset["spaces_path"].rsplit("/", 1)[-1]
+                    uploads.append(
+                        upload_entry(patch_file, delta_asset["spaces_path"], delta_asset["mime_type"])
+                    )
+
+        resolve_checksums(assets)
+
+    if chunker is not None:
+        manifests = resolve_chunk_manifests(
+            assets, version=args.version, channel=args.channel, cdn_base=args.cdn_base
         )
-        assets.extend(platform_assets)
+        chunker.shutdown()
+        uploads.extend(manifests)
+        print(f"Wrote {len(manifests)} chunk manifest(s) -> {args.chunk_manifest_dir}")
 
     # Allow publishing without Linux (optional platform)
     # Require at least one macOS or Windows asset
@@ -460,6 +819,10 @@ def main() -> None:
     args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
     print(f"Wrote backend payload with {len(assets)} asset(s) -> {args.output}")
 
+    if args.uploads_output:
+        args.uploads_output.write_text(json.dumps(uploads, indent=2), encoding="utf-8")
+        print(f"Wrote {len(uploads)} pending upload(s) -> {args.uploads_output}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""Cross-run build performance history and regression detection.
+
+``ingest`` stores one run's merged timeline (build_timings.py merge) in a
+SQLite database: per-leg wall time, step durations, cache hits and sizes,
+and artifact sizes. Re-ingesting a run replaces it. Span files or directories
+are merged on the fly, so a downloaded build-timings artifact works too.
+
+``report`` compares, for every leg of .github/config/build-matrix.json, the
+most recent runs against the runs before them:
+- Percentiles (p50/p90) of leg wall time and of each step's duration.
+- Slowdowns are flagged when a one-sided Mann-Whitney U test (normal
+  approximation, tie-corrected) says the recent durations are larger with
+  p < --alpha and the median grew by at least --min-change. Cache and
+  artifact sizes use the same test.
+- Cache hit rates are flagged when a one-sided two-proportion z-test says
+  the recent rate dropped.
+Failed legs are left out of duration statistics; a failure ends early and
+would read as a speed-up. Likewise cache misses (and caches with no size)
+are left out of cache size statistics.
+
+In CI the database lives in the Actions cache, so concurrent runs can fork
+the history; the later save wins and loses the other run, which only costs
+one sample.
+
+Usage:
+    python build_history.py ingest <db> <timeline.json | spans dir | .ndjson> [...]
+    python build_history.py report <db> [--variant production] [--recent 5] [--baseline 20]
+                                   [--json] [--markdown FILE] [--fail-on-regression]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from build_timings import build_timeline, read_spans, span_files
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MATRIX = REPO_ROOT / ".github" / "config" / "build-matrix.json"
+DEFAULT_RECENT = 5
+DEFAULT_BASELINE = 20
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_CHANGE = 0.10
+MIN_RECENT = 3
+MIN_BASELINE = 5
+# Step durations below this are noise, whatever the test says
+MIN_STEP_SECONDS = 5.0
+# Artifact names carry the version; history is tracked per kind of artifact
+VERSION_IN_NAME = re.compile(r"\d+\.\d+\.\d+(?:-(?:alpha|beta|rc|dev)[0-9.]*)?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    run_number INTEGER,
+    commit_sha TEXT,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS legs (
+    run TEXT NOT NULL REFERENCES runs(run) ON DELETE CASCADE,
+    leg TEXT NOT NULL,
+    variant TEXT,
+    platform TEXT,
+    arch TEXT,
+    status TEXT NOT NULL,
+    wall_seconds REAL,
+    step_seconds REAL,
+    PRIMARY KEY (run, leg)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run TEXT NOT NULL REFERENCES runs(run) ON DELETE CASCADE,
+    leg TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS caches (
+    run TEXT NOT NULL REFERENCES runs(run) ON DELETE CASCADE,
+    leg TEXT NOT NULL,
+    name TEXT NOT NULL,
+    hit TEXT,
+    size_bytes INTEGER
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run TEXT NOT NULL REFERENCES runs(run) ON DELETE CASCADE,
+    leg TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_by_leg ON steps (leg, name);
+CREATE INDEX IF NOT EXISTS caches_by_leg ON caches (leg, name);
+CREATE INDEX IF NOT EXISTS artifacts_by_leg ON artifacts (leg, kind);
+"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def artifact_kind(name: str) -> str:
+    return VERSION_IN_NAME.sub("<version>", name)
+
+
+def load_timeline(path: Path) -> Dict[str, Any]:
+    if path.is_file() and path.suffix == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    return build_timeline(read_spans(span_files([path])))
+
+
+def ingest(db: sqlite3.Connection, timeline: Dict[str, Any]) -> str:
+    run = str(timeline.get("run") or "unknown")
+    with db:
+        db.execute("DELETE FROM runs WHERE run = ?", (run,))
+        db.execute(
+            "INSERT INTO runs (run, run_number, commit_sha, ingested_at) VALUES (?, ?, ?, ?)",
+            (
+                run,
+                int(run) if run.isdigit() else None,
+                timeline.get("commit"),
+                time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            ),
+        )
+        for leg in timeline.get("legs", []):
+            steps = leg.get("steps", [])
+            failed = any(step.get("status") != "success" for step in steps)
+            db.execute(
+                "INSERT INTO legs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run,
+                    leg["leg"],
+                    leg.get("variant"),
+                    leg.get("platform"),
+                    leg.get("arch"),
+                    "failure" if failed else "success",
+                    leg.get("wall_seconds"),
+                    leg.get("step_seconds"),
+                ),
+            )
+            db.executemany(
+                "INSERT INTO steps VALUES (?, ?, ?, ?, ?)",
+                [(run, leg["leg"], step["name"], step.get("status"), step["duration"]) for step in steps],
+            )
+            db.executemany(
+                "INSERT INTO caches VALUES (?, ?, ?, ?, ?)",
+                [
+                    (run, leg["leg"], cache.get("name"), cache.get("hit"), cache.get("size_bytes"))
+                    for cache in leg.get("caches", [])
+                ],
+            )
+            db.executemany(
+                "INSERT INTO artifacts VALUES (?, ?, ?, ?)",
+                [
+                    (run, leg["leg"], artifact_kind(artifact["name"]), artifact["size_bytes"])
+                    for artifact in leg.get("artifacts", [])
+                    if artifact.get("name") and isinstance(artifact.get("size_bytes"), int)
+                ],
+            )
+    return run
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear interpolation between closest ranks, like numpy's default."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def mann_whitney_greater(recent: Sequence[float], baseline: Sequence[float]) -> float:
+    """One-sided p-value for ``recent`` tending to be larger than ``baseline``."""
+    n1, n2 = len(recent), len(baseline)
+    combined = sorted([(value, 0) for value in recent] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(combined)
+    ties = 0.0
+    index = 0
+    while index < len(combined):
+        end = index
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        average = (index + end) / 2 + 1
+        for position in range(index, end + 1):
+            ranks[position] = average
+        count = end - index + 1
+        ties += count**3 - count
+        index = end + 1
+    total = n1 + n2
+    u_recent = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0) - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((total + 1) - ties / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_recent - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def proportion_drop(recent_hits: int, recent_total: int, base_hits: int, base_total: int) -> float:
+    """One-sided p-value for the recent hit rate being lower than the baseline's."""
+    pooled = (recent_hits + base_hits) / (recent_total + base_total)
+    variance = pooled * (1 - pooled) * (1 / recent_total + 1 / base_total)
+    if variance <= 0:
+        return 1.0
+    z = (base_hits / base_total - recent_hits / recent_total) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+@dataclass
+class Finding:
+    leg: str
+    metric: str
+    baseline: float
+    recent: float
+    change: float
+    p_value: float
+    unit: str
+
+
+@dataclass
+class LegSummary:
+    leg: str
+    name: str
+    runs: int
+    recent_p50: Optional[float]
+    recent_p90: Optional[float]
+    baseline_p50: Optional[float]
+    baseline_p90: Optional[float]
+
+
+def matrix_legs(path: Path, variant: str) -> List[Tuple[str, str]]:
+    matrix = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        (f"{entry['variant']}-{entry['platform']}-{entry['arch']}", entry.get("name", ""))
+        for entry in matrix.get(variant, [])
+    ]
+
+
+def recent_runs(db: sqlite3.Connection, leg: str, limit: int) -> List[str]:
+    rows = db.execute(
+        """
+        SELECT legs.run FROM legs JOIN runs USING (run)
+        WHERE legs.leg = ?
+        ORDER BY runs.run_number DESC, runs.ingested_at DESC
+        LIMIT ?
+        """,
+        (leg, limit),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _series(
+    db: sqlite3.Connection, query: str, leg: str, runs: Sequence[str]
+) -> Dict[str, Dict[str, float]]:
+    """{metric name: {run: value}} for ``runs`` of ``leg``."""
+    placeholders = ",".join("?" * len(runs))
+    series: Dict[str, Dict[str, float]] = {}
+    for name, run, value in db.execute(query.format(runs=placeholders), (leg, *runs)):
+        if value is not None:
+            # A step that ran twice in one leg (e.g. runtime staging) counts once, summed
+            series.setdefault(name, {}).setdefault(run, 0.0)
+            series[name][run] += value
+    return series
+
+
+DURATION_QUERIES = {
+    "wall time": """
+        SELECT 'wall time', run, wall_seconds FROM legs
+        WHERE leg = ? AND status = 'success' AND run IN ({runs})
+    """,
+    "step": """
+        SELECT 'step: ' || steps.name, steps.run, steps.duration FROM steps
+        JOIN legs ON legs.run = steps.run AND legs.leg = steps.leg
+        WHERE steps.leg = ? AND legs.status = 'success' AND steps.run IN ({runs})
+    """,
+}
+SIZE_QUERIES = {
+    # A miss restores nothing, so its 0 or null size would read as a shrink
+    "cache": """
+        SELECT 'cache size: ' || name, run, size_bytes FROM caches
+        WHERE leg = ? AND run IN ({runs}) AND size_bytes > 0 AND hit IS NOT 'false'
+    """,
+    "artifact": """
+        SELECT 'artifact size: ' || kind, run, size_bytes FROM artifacts
+        WHERE leg = ? AND run IN ({runs})
+    """,
+}
+
+
+def compare(
+    leg: str,
+    series: Dict[str, Dict[str, float]],
+    recent: Sequence[str],
+    baseline: Sequence[str],
+    args: argparse.Namespace,
+    unit: str,
+) -> List[Finding]:
+    findings = []
+    for metric, by_run in sorted(series.items()):
+        recent_values = [by_run[run] for run in recent if run in by_run]
+        baseline_values = [by_run[run] for run in baseline if run in by_run]
+        if len(recent_values) < MIN_RECENT or len(baseline_values) < MIN_BASELINE:
+            continue
+        before = percentile(baseline_values, 0.5)
+        after = percentile(recent_values, 0.5)
+        if unit == "s" and after < MIN_STEP_SECONDS:
+            continue
+        change = (after - before) / before if before else math.inf if after else 0.0
+        if change < args.min_change:
+            continue
+        p_value = mann_whitney_greater(recent_values, baseline_values)
+        if p_value < args.alpha:
+            findings.append(Finding(leg, metric, before, after, change, p_value, unit))
+    return findings
+
+
+def cache_hit_findings(
+    db: sqlite3.Connection, leg: str, recent: Sequence[str], baseline: Sequence[str], alpha: float
+) -> Tuple[List[Finding], Dict[str, Tuple[str, str]]]:
+    rates: Dict[str, Dict[str, List[int]]] = {}
+    placeholders = ",".join("?" * (len(recent) + len(baseline)))
+    rows = db.execute(
+        f"SELECT name, run, hit FROM caches WHERE leg = ? AND run IN ({placeholders})",
+        (leg, *recent, *baseline),
+    )
+    for name, run, hit in rows:
+        if hit not in ("true", "false"):
+            continue
+        window = "recent" if run in recent else "baseline"
+        counts = rates.setdefault(name, {"recent": [0, 0], "baseline": [0, 0]})[window]
+        counts[0] += hit == "true"
+        counts[1] += 1
+
+    findings = []
+    shown: Dict[str, Tuple[str, str]] = {}
+    for name, windows in sorted(rates.items()):
+        (recent_hits, recent_total), (base_hits, base_total) = windows["recent"], windows["baseline"]
+        shown[name] = (
+            f"{recent_hits}/{recent_total}" if recent_total else "n/a",
+            f"{base_hits}/{base_total}" if base_total else "n/a",
+        )
+        if recent_total < MIN_RECENT or base_total < MIN_BASELINE:
+            continue
+        p_value = proportion_drop(recent_hits, recent_total, base_hits, base_total)
+        if p_value < alpha:
+            findings.append(
+                Finding(
+                    leg,
+                    f"cache hit rate: {name}",
+                    base_hits / base_total,
+                    recent_hits / recent_total,
+                    recent_hits / recent_total - base_hits / base_total,
+                    p_value,
+                    "rate",
+                )
+            )
+    return findings, shown
+
+
+def analyze(db: sqlite3.Connection, legs: Iterable[Tuple[str, str]], args: argparse.Namespace) -> Dict[str, Any]:
+    summaries: List[LegSummary] = []
+    findings: List[Finding] = []
+    cache_rates: Dict[str, Dict[str, Tuple[str, str]]] = {}
+    for leg, name in legs:
+        runs = recent_runs(db, leg, args.recent + args.baseline)
+        recent, baseline = runs[: args.recent], runs[args.recent :]
+        walls = _series(db, DURATION_QUERIES["wall time"], leg, runs).get("wall time", {}) if runs else {}
+        recent_walls = [walls[run] for run in recent if run in walls]
+        baseline_walls = [walls[run] for run in baseline if run in walls]
+        summaries.append(
+            LegSummary(
+                leg,
+                name,
+                len(runs),
+                percentile(recent_walls, 0.5) if recent_walls else None,
+                percentile(recent_walls, 0.9) if recent_walls else None,
+                percentile(baseline_walls, 0.5) if baseline_walls else None,
+                percentile(baseline_walls, 0.9) if baseline_walls else None,
+            )
+        )
+        if not runs:
+            continue
+        for query in DURATION_QUERIES.values():
+            findings += compare(leg, _series(db, query, leg, runs), recent, baseline, args, "s")
+        for query in SIZE_QUERIES.values():
+            findings += compare(leg, _series(db, query, leg, runs), recent, baseline, args, "bytes")
+        hit_findings, cache_rates[leg] = cache_hit_findings(db, leg, recent, baseline, args.alpha)
+        findings += hit_findings
+    return {
+        "variant": args.variant,
+        "recent_runs": args.recent,
+        "baseline_runs": args.baseline,
+        "legs": [asdict(summary) for summary in summaries],
+        "cache_hits": {
+            leg: {name: {"recent": rate[0], "baseline": rate[1]} for name, rate in rates.items()}
+            for leg, rates in cache_rates.items()
+        },
+        "regressions": [asdict(finding) for finding in findings],
+    }
+
+
+def _value(value: Optional[float], unit: str) -> str:
+    if value is None:
+        return "n/a"
+    if unit == "bytes":
+        return f"{value / 1024 / 1024:.1f} MB"
+    if unit == "rate":
+        return f"{value:.0%}"
+    return f"{int(value // 60)}m {value % 60:04.1f}s" if value >= 60 else f"{value:.1f}s"
+
+
+def render_markdown(report: Dict[str, Any]) -> str:
+    out = [
+        f"## Build Performance History ({report['variant']})",
+        "",
+        f"Last {report['recent_runs']} runs against the {report['baseline_runs']} before them.",
+        "",
+        "| Leg | Runs | Wall p50 | Wall p90 | Baseline p50 | Baseline p90 |",
+        "| --- | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for leg in report["legs"]:
+        out.append(
+            f"| {leg['name'] or leg['leg']} | {leg['runs']} | {_value(leg['recent_p50'], 's')} | "
+            f"{_value(leg['recent_p90'], 's')} | {_value(leg['baseline_p50'], 's')} | "
+            f"{_value(leg['baseline_p90'], 's')} |"
+        )
+
+    rows = [
+        f"| {leg} | {name} | {rate['recent']} | {rate['baseline']} |"
+        for leg, rates in report["cache_hits"].items()
+        for name, rate in rates.items()
+    ]
+    if rows:
+        out += ["", "### Cache hits", "", "| Leg | Cache | Recent | Baseline |", "| --- | --- | ---: | ---: |"]
+        out += rows
+
+    out += ["", "### Regressions", ""]
+    if not report["regressions"]:
+        out.append("✅ No significant slowdowns, size growth, or cache hit drops.")
+        return "\n".join(out)
+    out += ["| Leg | Metric | Baseline | Recent | Change | p |", "| --- | --- | ---: | ---: | ---: | ---: |"]
+    for finding in report["regressions"]:
+        change = (
+            f"{finding['change'] * 100:+.0f} pts" if finding["unit"] == "rate" else f"{finding['change']:+.0%}"
+        )
+        out.append(
+            f"| {finding['leg']} | {finding['metric']} | {_value(finding['baseline'], finding['unit'])} | "
+            f"{_value(finding['recent'], finding['unit'])} | {change} | {finding['p_value']:.3f} |"
+        )
+    return "\n".join(out)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Store merged run timelines")
+    ingest_parser.add_argument("db", type=Path)
+    ingest_parser.add_argument("inputs", nargs="+", type=Path)
+
+    report = subparsers.add_parser("report", help="Percentile trends and regressions per matrix leg")
+    report.add_argument("db", type=Path)
+    report.add_argument("--matrix", type=Path, default=DEFAULT_MATRIX)
+    report.add_argument("--variant", default="production")
+    report.add_argument("--recent", type=int, default=DEFAULT_RECENT, help="Runs in the recent window")
+    report.add_argument("--baseline", type=int, default=DEFAULT_BASELINE, help="Runs before it to compare with")
+    report.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Significance level")
+    report.add_argument(
+        "--min-change", type=float, default=DEFAULT_MIN_CHANGE, help="Smallest median change to flag (0.10 = 10%%)"
+    )
+    report.add_argument("--json", action="store_true", help="Print the report as JSON")
+    report.add_argument("--markdown", type=Path, help="Append the Markdown report here, e.g. $GITHUB_STEP_SUMMARY")
+    report.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when anything is flagged")
+
+    args = parser.parse_args(argv)
+    db = connect(args.db)
+
+    if args.command == "ingest":
+        for path in args.inputs:
+            if not path.exists():
+                print(f"[WARN] {path} not found, skipped")
+                continue
+            timeline = load_timeline(path)
+            if not timeline.get("legs"):
+                print(f"[WARN] {path} has no legs, skipped")
+                continue
+            run = ingest(db, timeline)
+            print(f"[INFO] Ingested run {run}: {len(timeline['legs'])} leg(s) from {path}")
+        return 0
+
+    result = analyze(db, matrix_legs(args.matrix, args.variant), args)
+    markdown = render_markdown(result)
+    print(json.dumps(result, indent=2) if args.json else markdown)
+    if args.markdown:
+        with args.markdown.open("a", encoding="utf-8") as handle:
+            handle.write(markdown + "\n")
+    for finding in result["regressions"]:
+        print(
+            f"::warning title=Build regression ({finding['leg']})::{finding['metric']} "
+            f"{_value(finding['baseline'], finding['unit'])} -> {_value(finding['recent'], finding['unit'])} "
+            f"(p={finding['p_value']:.3f})",
+            file=sys.stderr,
+        )
+    return 1 if args.fail_on_regression and result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Single-pass structure extraction for CI build logs.
+
+Recognises the markers our build scripts already print and tags each line
+with the build step it belongs to, its severity and any timing it reports:
+
+    ::group::Title / ::endgroup::       GitHub log groups (nested)
+    ==== / [INFO] Title / ====          banner sections from execute_build.sh
+                                        (the title must carry a [LEVEL] prefix)
+    === Title === / === END ... ===     inline banners (error summaries)
+    [ERROR] [WARN] [INFO] [DEBUG]       script prefixes, plus ::error::,
+    ::warning::, ❌, ⚠️, error:, ...     workflow commands and compiler output
+    Finished ... in 5m 32s, Done in 4s  cargo/pnpm timings
+
+Severity is a small closed set, so ship_logs_to_loki.py can use it as a
+stream label; step names and durations are unbounded and go into Loki
+structured metadata instead.
+
+Usage (prints one JSON object per line, for inspection):
+    python build_log_parser.py <log_file>
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MAX_STEP_LENGTH = 100
+
+RULE = re.compile(r"^\s*={20,}\s*$")
+INLINE_BANNER = re.compile(r"^\s*={3}\s*(?P<title>[^=].*?)\s*={3}\s*$")
+GROUP_START = re.compile(r"^\s*::group::\s*(?P<title>.*)$")
+GROUP_END = re.compile(r"^\s*::endgroup::")
+LEVEL_PREFIX = re.compile(r"^\s*\[(?:ERROR|WARN(?:ING)?|INFO|DEBUG)\]\s*")
+
+ERROR_PATTERN = re.compile(
+    r"::error\b|\[ERROR\]|❌|^\s*error(?:\[E\d+\])?:|\bERROR\b|\bERR!|Traceback \(most recent",
+)
+WARN_PATTERN = re.compile(r"::warning\b|\[WARN(?:ING)?\]|⚠️|^\s*warning:|\bWARN\b")
+DEBUG_PATTERN = re.compile(r"\[DEBUG\]|::debug::")
+
+DURATION_PATTERNS = (
+    # cargo: "Finished `release` profile [optimized] target(s) in 5m 32s"
+    re.compile(r"\bFinished\b.*\bin (?:(?P<minutes>\d+)m )?(?P<seconds>\d+(?:\.\d+)?)s\b"),
+    # pnpm/yarn: "Done in 12.3s"
+    re.compile(r"\bDone in (?:(?P<minutes>\d+)m )?(?P<seconds>\d+(?:\.\d+)?)s\b"),
+    re.compile(
+        r"\b(?:took|elapsed|duration)[:=]?\s*(?:(?P<minutes>\d+)m\s*)?"
+        r"(?P<seconds>\d+(?:\.\d+)?)\s*s\b",
+        re.IGNORECASE,
+    ),
+)
+
+
+@dataclass
+class ParsedLine:
+    text: str
+    level: str
+    step: str = ""
+    metadata: Dict[str, str] = field(default_factory=dict)
+
+
+def classify_level(line: str) -> str:
+    if ERROR_PATTERN.search(line):
+        return "error"
+    if WARN_PATTERN.search(line):
+        return "warn"
+    if DEBUG_PATTERN.search(line):
+        return "debug"
+    return "info"
+
+
+def parse_duration(line: str) -> Optional[float]:
+    for pattern in DURATION_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            minutes = int(match.group("minutes") or 0)
+            return minutes * 60 + float(match.group("seconds"))
+    return None
+
+
+def clean_title(title: str) -> str:
+    return LEVEL_PREFIX.sub("", title).strip()[:MAX_STEP_LENGTH]
+
+
+class BuildLogParser:
+    """Stateful line parser; feed lines in order with ``parse()``."""
+
+    def __init__(self) -> None:
+        self.base_step = ""
+        self.stack: List[str] = []
+        # Banner detection: RULE, title, RULE
+        self._after_rule = False
+        self._candidate: Optional[str] = None
+
+    @property
+    def step(self) -> str:
+        return self.stack[-1] if self.stack else self.base_step
+
+    def parse(self, line: str) -> ParsedLine:
+        self._track_banner(line)
+
+        group = GROUP_START.match(line)
+        if group:
+            self.stack.append(clean_title(group.group("title")))
+        elif GROUP_END.match(line):
+            if self.stack:
+                self.stack.pop()
+        else:
+            inline = INLINE_BANNER.match(line)
+            if inline:
+                title = clean_title(inline.group("title"))
+                if title.upper().startswith("END"):
+                    if self.stack:
+                        self.stack.pop()
+                else:
+                    self.stack.append(title)
+
+        parsed = ParsedLine(text=line, level=classify_level(line), step=self.step)
+        if parsed.step:
+            parsed.metadata["step"] = parsed.step
+        duration = parse_duration(line)
+        if duration is not None:
+            parsed.metadata["duration_seconds"] = f"{duration:g}"
+        return parsed
+
+    def _track_banner(self, line: str) -> None:
+        if RULE.match(line):
+            if self._candidate:
+                # A banner title replaces the top-level step and closes any
+                # inline sections left open by a truncated log
+                self.base_step = clean_title(self._candidate)
+                self.stack.clear()
+            self._after_rule = True
+            self._candidate = None
+        elif self._after_rule and self._candidate is None and LEVEL_PREFIX.match(line):
+            # Banner titles always carry a [LEVEL] prefix; this keeps a
+            # one-line section body from being mistaken for the next title
+            self._candidate = line
+        else:
+            self._after_rule = False
+            self._candidate = None
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 1:
+        print("Usage: python build_log_parser.py <log_file>", file=sys.stderr)
+        return 1
+    parser = BuildLogParser()
+    with Path(argv[0]).open("r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            parsed = parser.parse(line.rstrip("\r\n"))
+            print(
+                json.dumps(
+                    {"level": parsed.level, **parsed.metadata, "line": parsed.text},
+                    ensure_ascii=False,
+                )
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Emit compact and pre-compressed variants of the static update manifests.
+
+Reads updates/latest.json and updates/releases.json and writes, next to them:
+
+    latest.min.json, releases.min.json   minified JSON
+    *.min.json.gz, *.min.json.br         pre-compressed copies (brotli optional)
+    latest/<platform-key>.json           single-platform updater manifests
+                                         (plus .gz/.br), e.g. latest/darwin-aarch64.json
+    releases/index.json                  small index of the release history pages
+    releases/page-NNNN.json              fixed-size pages of releases.json
+    <manifest>.json.etag                 quoted sha256 ETag of each uncompressed
+                                         latest manifest (latest.json included)
+    latest.version                       the current version string, one line
+
+The .etag sidecars let edge caches and the backend answer If-None-Match
+without hashing the manifest on every request; latest.version lets polling
+clients skip the manifest download entirely when the version is unchanged.
+
+History pages are numbered from the newest release, so page 1, the one the
+downloads page renders first, is always full. Publishing a release shifts
+every entry by one, so each page is rewritten; the pages are small and
+regenerated with the index on every publish. The index lists pages in order,
+newest first.
+
+The pretty-printed originals are left untouched for legacy clients.
+
+Usage:
+    python build_manifest_variants.py [--updates-dir updates] [--output-dir DIR]
+                                      [--page-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import brotli
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    brotli = None
+
+HISTORY_INDEX_VERSION = 1
+DEFAULT_PAGE_SIZE = 20
+
+
+def minify(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_variants(target: Path, encoded: bytes) -> list[Path]:
+    """Write ``encoded`` plus gzip/brotli copies; returns every file written."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(encoded)
+    written = [target]
+
+    gz_path = target.with_name(f"{target.name}.gz")
+    # mtime=0 keeps the gzip bytes reproducible across runs
+    gz_path.write_bytes(gzip.compress(encoded, compresslevel=9, mtime=0))
+    written.append(gz_path)
+
+    if brotli is not None:
+        br_path = target.with_name(f"{target.name}.br")
+        br_path.write_bytes(brotli.compress(encoded, quality=11))
+        written.append(br_path)
+    return written
+
+
+def etag_for(encoded: bytes) -> str:
+    return f'"sha256-{hashlib.sha256(encoded).hexdigest()}"'
+
+
+def write_etag(target: Path, encoded: bytes) -> Path:
+    etag_path = target.with_name(f"{target.name}.etag")
+    etag_path.write_text(etag_for(encoded) + "\n", encoding="utf-8")
+    return etag_path
+
+
+def platform_slices(latest: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Split latest.json into one updater manifest per platform key."""
+    base = {key: value for key, value in latest.items() if key != "platforms"}
+    return {
+        platform_key: {**base, "platforms": {platform_key: entry}}
+        for platform_key, entry in (latest.get("platforms") or {}).items()
+    }
+
+
+def newest_first(releases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # ISO-8601 pub_date strings sort chronologically; stable for equal dates
+    return sorted(releases, key=lambda release: release.get("pub_date") or "", reverse=True)
+
+
+def paginate_releases(
+    releases: List[Dict[str, Any]], page_size: int
+) -> List[List[Dict[str, Any]]]:
+    """Split releases into pages numbered from the newest; each page is newest-first."""
+    ordered = newest_first(releases)
+    return [ordered[start : start + page_size] for start in range(0, len(ordered), page_size)]
+
+
+def page_name(number: int) -> str:
+    return f"page-{number:04d}.json"
+
+
+def write_release_history(
+    releases: List[Dict[str, Any]], output_dir: Path, page_size: int
+) -> list[Path]:
+    history_dir = output_dir / "releases"
+    pages = paginate_releases(releases, page_size)
+    written: list[Path] = []
+    index_pages = []
+    for number, page in enumerate(pages, start=1):
+        target = history_dir / page_name(number)
+        written += write_variants(target, minify({"page": number, "releases": page}))
+        index_pages.append(
+            {
+                "page": number,
+                "path": f"releases/{target.name}",
+                "count": len(page),
+                "newest_version": page[0].get("version"),
+                "oldest_version": page[-1].get("version"),
+            }
+        )
+
+    index = {
+        "version": HISTORY_INDEX_VERSION,
+        "page_size": page_size,
+        "total_releases": len(releases),
+        "pages": index_pages,
+    }
+    written += write_variants(history_dir / "index.json", minify(index))
+    return written
+
+
+def load_manifest(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def report(paths: list[Path], root: Path) -> None:
+    for path in paths:
+        print(f"  {path.relative_to(root)} ({path.stat().st_size} bytes)")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates-dir", type=Path, default=Path("updates"))
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Where to write variants (defaults to --updates-dir)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Releases per history page (default: {DEFAULT_PAGE_SIZE})",
+    )
+    args = parser.parse_args(argv)
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+
+    updates_dir: Path = args.updates_dir
+    output_dir: Path = args.output_dir or updates_dir
+    latest_path = updates_dir / "latest.json"
+    releases_path = updates_dir / "releases.json"
+
+    if not latest_path.exists():
+        print(f"[ERROR] {latest_path} not found", file=sys.stderr)
+        return 1
+
+    if brotli is None:
+        print("[WARN] brotli not installed; skipping .br variants")
+
+    latest = load_manifest(latest_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # The pretty original is served as-is, so its ETag covers the raw bytes
+    written = [write_etag(output_dir / latest_path.name, latest_path.read_bytes())]
+    latest_min = minify(latest)
+    written += write_variants(output_dir / "latest.min.json", latest_min)
+    written.append(write_etag(output_dir / "latest.min.json", latest_min))
+    for platform_key, manifest in platform_slices(latest).items():
+        target = output_dir / "latest" / f"{platform_key}.json"
+        encoded = minify(manifest)
+        written += write_variants(target, encoded)
+        written.append(write_etag(target, encoded))
+
+    version = latest.get("version")
+    if version:
+        version_path = output_dir / "latest.version"
+        version_path.write_text(f"{version}\n", encoding="utf-8")
+        written.append(version_path)
+    else:
+        print(f"[WARN] {latest_path} has no version; skipping latest.version")
+
+    if releases_path.exists():
+        releases = load_manifest(releases_path)
+        written += write_variants(output_dir / "releases.min.json", minify(releases))
+        written += write_release_history(
+            releases.get("releases") or [], output_dir, args.page_size
+        )
+
+    print(
+        f"[INFO] Wrote {len(written)} manifest variant(s) "
+        f"(latest.json is {latest_path.stat().st_size} bytes):"
+    )
+    report(written, output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -5,6 +5,26 @@ set -euo pipefail
 COMMAND=${1:?usage: build_metrics.sh <command> ...}
 shift
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PYTHON_BIN="$(command -v python3 || command -v python || true)"
+
+# Structured spans and sizes; see build_timings.py
+timings() {
+  if [[ -z "$PYTHON_BIN" ]]; then
+    return 1
+  fi
+  "$PYTHON_BIN" "$SCRIPT_DIR/build_timings.py" "$@"
+}
+
+# Epoch seconds, sub-second where bash 5 provides EPOCHREALTIME
+now_epoch() {
+  if [[ -n "${EPOCHREALTIME:-}" ]]; then
+    echo "${EPOCHREALTIME/,/.}"
+  else
+    date +%s
+  fi
+}
+
 report_run_number() {
   echo "${GITHUB_RUN_NUMBER:-local}"
 }
@@ -25,6 +45,19 @@ report_file_name() {
   echo "$(report_stem "$variant" "$platform" "$arch").md"
 }
 
+report_spans_file_name() {
+  local variant platform arch
+  variant=${1:?variant is required}
+  platform=${2:?platform is required}
+  arch=${3:?arch is required}
+  echo "$(report_stem "$variant" "$platform" "$arch").ndjson"
+}
+
+# The NDJSON spans file that sits next to a Markdown report
+spans_path() {
+  echo "${1%.md}.ndjson"
+}
+
 report_artifact_name() {
   local variant platform arch
   variant=${1:?variant is required}
@@ -51,18 +84,6 @@ escape_cell() {
   echo "$value"
 }
 
-path_size() {
-  local path
-  path=${1:-}
-
-  if [[ -z "$path" || ! -e "$path" ]]; then
-    echo "n/a"
-    return
-  fi
-
-  du -sh "$path" 2>/dev/null | awk '{print $1}' || echo "n/a"
-}
-
 emit_two_path_sizes() {
   local first_label first_path second_label second_path
   first_label=${1:?first label is required}
@@ -70,8 +91,15 @@ emit_two_path_sizes() {
   second_label=${3:?second label is required}
   second_path=${4:-}
 
-  printf '%s=%s\n' "$first_label" "$(path_size "$first_path")"
-  printf '%s=%s\n' "$second_label" "$(path_size "$second_path")"
+  local sizes=()
+  local size
+  # One walk for both paths
+  while IFS= read -r size; do
+    sizes+=("$size")
+  done < <(timings size "$first_path" "$second_path" 2>/dev/null)
+
+  printf '%s=%s\n' "$first_label" "${sizes[0]:-n/a}"
+  printf '%s=%s\n' "$second_label" "${sizes[1]:-n/a}"
 }
 
 format_windows_cargo_sizes() {
@@ -82,33 +110,6 @@ format_windows_cargo_sizes() {
   printf 'registry=%s<br>git=%s' "$registry_size" "$git_size"
 }
 
-multi_path_size() {
-  local paths line sizes
-  paths=${1:-}
-  sizes=()
-
-  while IFS= read -r line; do
-    if [[ -n "$line" && -e "$line" ]]; then
-      sizes+=("$line: $(path_size "$line")")
-    fi
-  done <<< "$paths"
-
-  if [[ ${#sizes[@]} -eq 0 ]]; then
-    echo "n/a"
-    return
-  fi
-
-  local joined=""
-  local item
-  for item in "${sizes[@]}"; do
-    if [[ -n "$joined" ]]; then
-      joined+="<br>"
-    fi
-    joined+="$(escape_cell "$item")"
-  done
-  echo "$joined"
-}
-
 ensure_report() {
   local report_dir variant platform arch report_file
   report_dir=${1:?report_dir is required}
@@ -142,18 +143,30 @@ ensure_report() {
       echo "| Step | Status | Duration (s) |"
       echo "| --- | --- | ---: |"
     } > "$report_file"
+    timings leg "$(spans_path "$report_file")" --variant "$variant" --platform "$platform" --arch "$arch" \
+      || echo "[WARN] Could not start timing spans for $report_file" >&2
   fi
 
   echo "$report_file"
 }
 
+# Usage: append_cache_row <report_file> <cache> <hit> <details> (--size <text> | [--labels <label>...] --path <path>...)
+# Records the signal as a cache span too; paths are measured in one walk.
 append_cache_row() {
   local report_file cache_name hit details size
   report_file=${1:?report_file is required}
   cache_name=${2:?cache_name is required}
   hit=${3:-unknown}
   details=${4:-n/a}
-  size=${5:-n/a}
+  shift 4
+
+  if ! size=$(timings cache "$(spans_path "$report_file")" \
+    --name "$cache_name" --hit "$hit" --details "$details" "$@"); then
+    size="n/a"
+    if [[ ${1:-} == "--size" ]]; then
+      size=${2:-n/a}
+    fi
+  fi
 
   printf '| %s | %s | %s | %s |\n' \
     "$(escape_cell "$cache_name")" \
@@ -174,7 +187,7 @@ append_cache_row_command() {
   size=${8:-n/a}
   report_file=$(ensure_report "$report_dir" "$variant" "$platform" "$arch")
 
-  append_cache_row "$report_file" "$cache_name" "$hit" "$details" "$size"
+  append_cache_row "$report_file" "$cache_name" "$hit" "$details" --size "$size"
 }
 
 append_timing_row() {
@@ -201,7 +214,7 @@ init_report_command() {
 }
 
 append_cache_report_command() {
-  local report_dir variant platform arch report_file rust_detail windows_detail python_paths python_detail pnpm_detail
+  local report_dir variant platform arch report_file rust_detail windows_detail python_detail pnpm_detail
   report_dir=${1:?report_dir is required}
   variant=${2:?variant is required}
   platform=${3:?platform is required}
@@ -214,20 +227,18 @@ append_cache_report_command() {
     "pnpm store" \
     "${PNPM_CACHE_HIT:-unknown}" \
     "$pnpm_detail" \
-    "$(path_size "${PNPM_STORE_PATH:-}")"
+    --path "${PNPM_STORE_PATH:-}"
 
-  python_paths=$(printf '%s\n%s\n%s\n%s\n' \
-    "$HOME/.cache/pip" \
-    "$HOME/Library/Caches/pip" \
-    "$HOME/.cache/uv" \
-    "$HOME/Library/Caches/uv")
   python_detail=$(printf 'pip+uv caches on %s' "${RUNNER_OS:-unknown}")
   append_cache_row \
     "$report_file" \
     "python wheels" \
     "${PYTHON_CACHE_HIT:-unknown}" \
     "$python_detail" \
-    "$(multi_path_size "$python_paths")"
+    --path "$HOME/.cache/pip" \
+    --path "$HOME/Library/Caches/pip" \
+    --path "$HOME/.cache/uv" \
+    --path "$HOME/Library/Caches/uv"
 
   if [[ "$platform" == "windows" ]]; then
     windows_detail=$(printf 'lookup-only-hit=%s<br>expected-key=%s<br>matched-key=%s<br>restore-hit=%s<br>restore-state=%s<br>api-exact-visible=%s<br>api-exact-id=%s<br>api-exact-ref=%s<br>api-exact-version=%s<br>workflow-ref=%s<br>runner-os=%s<br>runner-arch=%s<br>msystem=%s<br>cache-restore-action=%s<br>cache-save-action=%s<br>compression-candidate=%s<br>tar-kind=%s<br>tar-path=%s<br>tar-version=%s<br>tar-candidates=%s<br>bsdtar-path=%s<br>bsdtar-version=%s<br>bsdtar-candidates=%s<br>zstd-path=%s<br>zstd-version=%s<br>zstd-candidates=%s<br>restore-path-fingerprint=%s<br>restore-paths-raw=%s<br>restore-paths-normalized=%s<br>api-exact-size-bytes=%s<br>api-exact-last-accessed=%s<br>api-exact-created=%s<br>pre-restore-sizes=%s<br>post-restore-sizes=%s<br>cargo-home=%s' \
@@ -271,7 +282,7 @@ append_cache_report_command() {
       "windows cargo restore" \
       "${WINDOWS_CARGO_CACHE_HIT:-unknown}" \
       "$windows_detail" \
-      "$(format_windows_cargo_sizes "${WINDOWS_CARGO_REGISTRY_SIZE_AFTER_RESTORE:-n/a}" "${WINDOWS_CARGO_GIT_SIZE_AFTER_RESTORE:-n/a}")"
+      --size "$(format_windows_cargo_sizes "${WINDOWS_CARGO_REGISTRY_SIZE_AFTER_RESTORE:-n/a}" "${WINDOWS_CARGO_GIT_SIZE_AFTER_RESTORE:-n/a}")"
   else
     rust_detail=$(printf 'target=%s' "${RUST_TARGET_DIR:-target}")
     append_cache_row \
@@ -279,7 +290,7 @@ append_cache_report_command() {
       "rust target" \
       "${RUST_CACHE_HIT:-unknown}" \
       "$rust_detail" \
-      "$(path_size "${RUST_TARGET_DIR:-target}")"
+      --path "${RUST_TARGET_DIR:-target}"
   fi
 }
 
@@ -298,11 +309,51 @@ append_windows_post_build_row_command() {
     "windows cargo post-build" \
     "n/a" \
     "registry-path=$(escape_cell "$registry_path")<br>git-path=$(escape_cell "$git_path")" \
-    "$(format_windows_cargo_sizes "$(path_size "$registry_path")" "$(path_size "$git_path")")"
+    --labels registry git \
+    --path "$registry_path" \
+    --path "$git_path"
+}
+
+record_step_span() {
+  local report_file step_name status exit_code start_epoch end_epoch
+  report_file=${1:?report_file is required}
+  step_name=${2:?step_name is required}
+  status=${3:?status is required}
+  exit_code=${4:?exit_code is required}
+  start_epoch=${5:?start_epoch is required}
+  end_epoch=${6:?end_epoch is required}
+
+  timings step "$(spans_path "$report_file")" \
+    --name "$step_name" --status "$status" --exit-code "$exit_code" \
+    --start "$start_epoch" --end "$end_epoch" \
+    || echo "[WARN] Could not record timing span for $step_name" >&2
+}
+
+append_artifact_sizes_command() {
+  local report_dir variant platform arch report_file name size
+  report_dir=${1:?report_dir is required}
+  variant=${2:?variant is required}
+  platform=${3:?platform is required}
+  arch=${4:?arch is required}
+  shift 4
+  report_file=$(ensure_report "$report_dir" "$variant" "$platform" "$arch")
+
+  {
+    echo
+    echo "## Artifact Sizes"
+    echo
+    echo "| Artifact | Size |"
+    echo "| --- | ---: |"
+  } >> "$report_file"
+
+  while IFS=$'\t' read -r name size; do
+    printf '| %s | %s |\n' "$(escape_cell "$name")" "$(escape_cell "$size")" >> "$report_file"
+  done < <(timings artifact "$(spans_path "$report_file")" "$@" \
+    || echo "[WARN] Could not record artifact sizes" >&2)
 }
 
 run_timed_command() {
-  local report_dir variant platform arch step_name report_file start_ts end_ts duration status exit_code
+  local report_dir variant platform arch step_name report_file start_ts end_ts duration status exit_code start_epoch
   report_dir=${1:?report_dir is required}
   variant=${2:?variant is required}
   platform=${3:?platform is required}
@@ -318,18 +369,21 @@ run_timed_command() {
 
   report_file=$(ensure_report "$report_dir" "$variant" "$platform" "$arch")
   start_ts=${SECONDS}
+  start_epoch=$(now_epoch)
   status="success"
 
   if "$@"; then
     end_ts=${SECONDS}
     duration=$((end_ts - start_ts))
     append_timing_row "$report_file" "$step_name" "$status" "$duration"
+    record_step_span "$report_file" "$step_name" "$status" 0 "$start_epoch" "$(now_epoch)"
     return
   else
     exit_code=$?
     end_ts=${SECONDS}
     duration=$((end_ts - start_ts))
     append_timing_row "$report_file" "$step_name" "failure ($exit_code)" "$duration"
+    record_step_span "$report_file" "$step_name" "failure" "$exit_code" "$start_epoch" "$(now_epoch)"
     exit "$exit_code"
   fi
 }
@@ -344,6 +398,9 @@ case "$COMMAND" in
   append-cache-row)
     append_cache_row_command "$@"
     ;;
+  append-artifact-sizes)
+    append_artifact_sizes_command "$@"
+    ;;
   append-windows-post-build-row)
     append_windows_post_build_row_command "$@"
     ;;
@@ -359,6 +416,9 @@ case "$COMMAND" in
   report-file-name)
     report_file_name "$@"
     ;;
+  report-spans-file-name)
+    report_spans_file_name "$@"
+    ;;
   report-path)
     report_path "$@"
     ;;
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""Structured build timings: NDJSON spans per matrix leg, merged per run.
+
+build_metrics.sh still writes the Markdown report each leg shows in its job
+summary. Every row also becomes one JSON line in the leg's
+build-timings-<variant>-<platform>-<arch>-<run>.ndjson:
+
+    {"version": 1, "type": "leg", "leg": ..., "variant": ..., "run": ...}
+    {"version": 1, "type": "step", "name": ..., "status": "success",
+     "exit_code": 0, "start": <epoch s>, "end": <epoch s>, "duration": 12.4}
+    {"version": 1, "type": "cache", "name": ..., "hit": "true",
+     "details": {...}, "size_bytes": 123, "paths": {"<path>": 123}}
+    {"version": 1, "type": "artifact", "name": "Rostoc-1.2.3-windows-x64.msi",
+     "size_bytes": 123}
+
+One file holds one leg, so only the leg line names it. A path that does not
+exist has a null size, and so does a cache none of whose paths exist (a miss
+is not 0 bytes).
+
+``merge`` combines every leg of a run into one timeline JSON and a Markdown
+summary of where the time goes: the slowest steps across legs, each leg's
+wall time and critical steps, cache hits with sizes, and artifact sizes.
+build_history.py ingests the merged timelines across runs.
+
+Sizes come from one os.scandir walk over all requested paths, counting
+allocated blocks and each hard link once like ``du -s``, instead of one
+``du -sh`` process per path.
+
+Usage:
+    python build_timings.py leg FILE --variant V --platform P --arch A
+    python build_timings.py step FILE --name N --status S --start T --end T [--exit-code C]
+    python build_timings.py cache FILE --name N [--hit H] [--details D]
+                                  [--size TEXT | [--labels L ...] --path P [--path P ...]]
+    python build_timings.py artifact FILE PATH [PATH ...]
+    python build_timings.py size PATH [PATH ...]
+    python build_timings.py merge DIR [DIR ...] [--output timeline.json] [--markdown summary.md]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+VERSION = 1
+SPANS_GLOB = "build-timings-*.ndjson"
+TOP_STEPS = 15
+
+
+def now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def append_record(path: Path, record: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps({"version": VERSION, **record}, separators=(",", ":")) + "\n"
+    # One write per record, so a line is never interleaved with another
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(line)
+
+
+def _allocated(info: os.stat_result, seen: Set[Tuple[int, int]]) -> int:
+    if info.st_nlink > 1 and not stat.S_ISDIR(info.st_mode):
+        key = (info.st_dev, info.st_ino)
+        if key in seen:
+            return 0
+        seen.add(key)
+    blocks = getattr(info, "st_blocks", None)
+    # Windows has no st_blocks; the apparent size is the best estimate there
+    return blocks * 512 if blocks is not None else info.st_size
+
+
+def disk_usage(paths: Iterable[str]) -> List[Optional[int]]:
+    """Bytes used under each path (None when missing), in one walk without following links.
+
+    Sizes are in input order; a path given twice gets the same size twice.
+    """
+    seen: Set[Tuple[int, int]] = set()
+    measured: Dict[str, Optional[int]] = {}
+    usage: List[Optional[int]] = []
+    for root in paths:
+        if root in measured:
+            usage.append(measured[root])
+            continue
+        try:
+            info = os.lstat(root) if root else None
+        except OSError:
+            info = None
+        if info is None:
+            measured[root] = None
+            usage.append(None)
+            continue
+        total = _allocated(info, seen)
+        pending = [root] if stat.S_ISDIR(info.st_mode) else []
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        total += _allocated(entry.stat(follow_symlinks=False), seen)
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                    except OSError:
+                        continue
+        measured[root] = total
+        usage.append(total)
+    return usage
+
+
+def human_size(size: Optional[int]) -> str:
+    """``du -h`` style: 4.0K, 12M, 1.5G, rounded up."""
+    if size is None:
+        return "n/a"
+    if size < 1024:
+        return f"{size}B" if size else "0"
+    value = float(size)
+    for unit in "KMGTP":
+        value /= 1024
+        if value < 1024 or unit == "P":
+            break
+    if value < 10:
+        return f"{math.ceil(value * 10) / 10:.1f}{unit}"
+    return f"{math.ceil(value)}{unit}"
+
+
+def parse_details(details: str) -> Any:
+    """Turn "key=value<br>key=value" report cells into a dict; other text is kept as-is."""
+    parts = [part for part in details.split("<br>") if part]
+    if parts and all("=" in part for part in parts):
+        return dict(part.split("=", 1) for part in parts)
+    return details
+
+
+def size_cell(
+    paths: List[str], usage: List[Optional[int]], labels: Optional[List[str]] = None
+) -> str:
+    """The Markdown report's size column: one size, "label=size" per path, or "path: size"."""
+    if labels:
+        return "<br>".join(f"{label}={human_size(size)}" for label, size in zip(labels, usage))
+    if len(usage) == 1:
+        return human_size(usage[0])
+    present = [
+        f"{path}: {human_size(size)}" for path, size in zip(paths, usage) if size is not None
+    ]
+    return "<br>".join(present) or "n/a"
+
+
+def artifact_sizes(paths: Iterable[str]) -> List[Tuple[str, int]]:
+    """Apparent size of every file under ``paths``, named relative to the path given."""
+    sizes: List[Tuple[str, int]] = []
+    for root in paths:
+        if os.path.isfile(root):
+            sizes.append((os.path.basename(root), os.path.getsize(root)))
+            continue
+        pending = [root] if os.path.isdir(root) else []
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        name = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                        sizes.append((name, entry.stat(follow_symlinks=False).st_size))
+    return sorted(sizes)
+
+
+def env(name: str) -> str:
+    return os.environ.get(name) or "unknown"
+
+
+def read_spans(paths: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+    """Records grouped by leg, one span file per leg; unreadable lines are skipped with a warning."""
+    legs: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        leg = {
+            "leg": path.stem.replace("build-timings-", "", 1),
+            "steps": [],
+            "caches": [],
+            "artifacts": [],
+        }
+        with path.open(encoding="utf-8") as handle:
+            for number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"[WARN] {path}:{number}: not JSON, skipped", file=sys.stderr)
+                    continue
+                if not isinstance(record, dict) or record.get("version") != VERSION:
+                    print(f"[WARN] {path}:{number}: unknown record, skipped", file=sys.stderr)
+                    continue
+                kind = record.get("type")
+                if kind == "leg":
+                    leg.update({k: v for k, v in record.items() if k not in ("version", "type")})
+                elif kind == "step":
+                    if not isinstance(record.get("name"), str) or not all(
+                        isinstance(record.get(key), (int, float)) for key in ("start", "end", "duration")
+                    ):
+                        print(f"[WARN] {path}:{number}: incomplete step, skipped", file=sys.stderr)
+                        continue
+                    leg["steps"].append(record)
+                elif kind == "cache":
+                    leg["caches"].append(record)
+                elif kind == "artifact":
+                    leg["artifacts"].append(record)
+        if leg["leg"] in legs:
+            print(f"[WARN] {path}: leg {leg['leg']} seen twice, keeping the first", file=sys.stderr)
+            continue
+        legs[leg["leg"]] = leg
+    return legs
+
+
+def build_timeline(legs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    starts = [step["start"] for leg in legs.values() for step in leg["steps"]]
+    origin = min(starts) if starts else 0.0
+    per_step: Dict[str, Dict[str, Any]] = {}
+    timeline_legs = []
+    run = commit = None
+    for leg_id in sorted(legs):
+        leg = legs[leg_id]
+        run = run or leg.get("run")
+        commit = commit or leg.get("commit")
+        steps = sorted(leg["steps"], key=lambda step: step["start"])
+        for step in steps:
+            step["offset"] = round(step["start"] - origin, 3)
+            entry = per_step.setdefault(
+                step["name"],
+                {"name": step["name"], "legs": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                 "slowest_leg": None, "failures": 0},
+            )
+            entry["legs"] += 1
+            entry["total_seconds"] = round(entry["total_seconds"] + step["duration"], 3)
+            if step["duration"] >= entry["max_seconds"]:
+                entry["max_seconds"] = step["duration"]
+                entry["slowest_leg"] = leg_id
+            if step.get("status") != "success":
+                entry["failures"] += 1
+        wall = (steps[-1]["end"] - steps[0]["start"]) if steps else 0.0
+        timeline_legs.append(
+            {
+                **{k: v for k, v in leg.items() if k not in ("steps", "caches", "artifacts")},
+                "wall_seconds": round(wall, 3),
+                "step_seconds": round(sum(step["duration"] for step in steps), 3),
+                "steps": [
+                    {k: step[k] for k in ("name", "status", "exit_code", "offset", "duration") if k in step}
+                    for step in steps
+                ],
+                "caches": [
+                    {k: v for k, v in cache.items() if k not in ("version", "type")}
+                    for cache in leg["caches"]
+                ],
+                "artifacts": [
+                    {"name": artifact.get("name"), "size_bytes": artifact.get("size_bytes")}
+                    for artifact in leg["artifacts"]
+                ],
+            }
+        )
+    return {
+        "version": VERSION,
+        "run": run,
+        "commit": commit,
+        "generated_at": now_iso(),
+        "legs": timeline_legs,
+        "steps": sorted(per_step.values(), key=lambda entry: entry["total_seconds"], reverse=True),
+    }
+
+
+def _minutes(seconds: float) -> str:
+    return f"{int(seconds // 60)}m {seconds % 60:04.1f}s" if seconds >= 60 else f"{seconds:.1f}s"
+
+
+def render_markdown(timeline: Dict[str, Any]) -> str:
+    out = [f"## Build Timeline (run {timeline.get('run') or 'unknown'})", ""]
+    if not timeline["legs"]:
+        return "\n".join(out + ["No build timing spans were found."])
+
+    out += ["### Where the time goes", "", "| Step | Legs | Total | Slowest leg | Max | Failures |",
+            "| --- | ---: | ---: | --- | ---: | ---: |"]
+    for entry in timeline["steps"][:TOP_STEPS]:
+        out.append(
+            f"| {entry['name']} | {entry['legs']} | {_minutes(entry['total_seconds'])} | "
+            f"{entry['slowest_leg']} | {_minutes(entry['max_seconds'])} | {entry['failures']} |"
+        )
+
+    out += ["", "### Legs", "", "| Leg | Wall time | Timed steps | Longest step |",
+            "| --- | ---: | ---: | --- |"]
+    for leg in sorted(timeline["legs"], key=lambda leg: leg["wall_seconds"], reverse=True):
+        longest = max(leg["steps"], key=lambda step: step["duration"], default=None)
+        longest_text = f"{longest['name']} ({_minutes(longest['duration'])})" if longest else "n/a"
+        out.append(
+            f"| {leg['leg']} | {_minutes(leg['wall_seconds'])} | "
+            f"{_minutes(leg['step_seconds'])} | {longest_text} |"
+        )
+
+    cache_rows = [
+        f"| {leg['leg']} | {cache.get('name')} | {cache.get('hit')} | {human_size(cache.get('size_bytes'))} |"
+        for leg in timeline["legs"]
+        for cache in leg["caches"]
+    ]
+    if cache_rows:
+        out += ["", "### Caches", "", "| Leg | Cache | Hit | Size |", "| --- | --- | --- | ---: |"]
+        out += cache_rows
+
+    artifact_rows = [
+        f"| {leg['leg']} | {artifact['name']} | {human_size(artifact['size_bytes'])} |"
+        for leg in timeline["legs"]
+        for artifact in leg["artifacts"]
+    ]
+    if artifact_rows:
+        out += ["", "### Artifacts", "", "| Leg | Artifact | Size |", "| --- | --- | ---: |"]
+        out += artifact_rows
+    return "\n".join(out)
+
+
+def span_files(directories: Iterable[Path]) -> List[Path]:
+    files: List[Path] = []
+    for directory in directories:
+        if directory.is_file():
+            files.append(directory)
+        elif directory.is_dir():
+            files.extend(sorted(directory.rglob(SPANS_GLOB)))
+        else:
+            print(f"[WARN] {directory} not found", file=sys.stderr)
+    return files
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    leg = subparsers.add_parser("leg", help="Record the leg metadata line")
+    leg.add_argument("file", type=Path)
+    leg.add_argument("--variant", required=True)
+    leg.add_argument("--platform", required=True)
+    leg.add_argument("--arch", required=True)
+
+    step = subparsers.add_parser("step", help="Record a timed step")
+    step.add_argument("file", type=Path)
+    step.add_argument("--name", required=True)
+    step.add_argument("--status", required=True)
+    step.add_argument("--exit-code", type=int, default=0)
+    step.add_argument("--start", type=float, required=True, help="Epoch seconds")
+    step.add_argument("--end", type=float, required=True, help="Epoch seconds")
+
+    cache = subparsers.add_parser("cache", help="Record a cache signal; prints the size cell")
+    cache.add_argument("file", type=Path)
+    cache.add_argument("--name", required=True)
+    cache.add_argument("--hit", default="unknown")
+    cache.add_argument("--details", default="n/a")
+    cache.add_argument("--size", help="Size text measured elsewhere, instead of --path")
+    cache.add_argument("--labels", nargs="+", help='Show the size cell as "label=size" per path')
+    cache.add_argument("--path", dest="paths", action="append", default=[], help="Path to measure")
+
+    artifact = subparsers.add_parser(
+        "artifact", help="Record the size of every file under PATHs; prints name<TAB>size lines"
+    )
+    artifact.add_argument("file", type=Path)
+    artifact.add_argument("paths", nargs="+")
+
+    size = subparsers.add_parser("size", help="Print du -sh style sizes, one line per path")
+    size.add_argument("paths", nargs="+")
+
+    merge = subparsers.add_parser("merge", help="Merge every leg's spans into one run timeline")
+    merge.add_argument("inputs", nargs="+", type=Path, help="Span files or directories")
+    merge.add_argument("--output", type=Path, help="Timeline JSON (default: stdout)")
+    merge.add_argument("--markdown", type=Path, help="Append the summary here, e.g. $GITHUB_STEP_SUMMARY")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "leg":
+        append_record(
+            args.file,
+            {
+                "type": "leg",
+                "leg": f"{args.variant}-{args.platform}-{args.arch}",
+                "variant": args.variant,
+                "platform": args.platform,
+                "arch": args.arch,
+                "run": os.environ.get("GITHUB_RUN_NUMBER") or "local",
+                "workflow": env("GITHUB_WORKFLOW"),
+                "job": env("GITHUB_JOB"),
+                "commit": env("GITHUB_SHA"),
+                "runner_os": env("RUNNER_OS"),
+                "generated_at": now_iso(),
+            },
+        )
+        return 0
+
+    if args.command == "step":
+        append_record(
+            args.file,
+            {
+                "type": "step",
+                "name": args.name,
+                "status": args.status,
+                "exit_code": args.exit_code,
+                "start": args.start,
+                "end": args.end,
+                "duration": round(max(0.0, args.end - args.start), 3),
+            },
+        )
+        return 0
+
+    if args.command == "cache":
+        usage = disk_usage(args.paths) if args.paths else []
+        record: Dict[str, Any] = {
+            "type": "cache",
+            "name": args.name,
+            "hit": args.hit,
+            "details": parse_details(args.details),
+        }
+        if usage:
+            sizes = dict(zip(args.paths, usage))
+            present = [size for size in sizes.values() if size is not None]
+            # null, not 0, when nothing was there to measure (e.g. a cache miss)
+            record["size_bytes"] = sum(present) if present else None
+            record["paths"] = sizes
+            cell = size_cell(args.paths, usage, args.labels)
+        else:
+            record["size"] = args.size or "n/a"
+            cell = record["size"]
+        append_record(args.file, record)
+        print(cell)
+        return 0
+
+    if args.command == "artifact":
+        for name, size_bytes in artifact_sizes(args.paths):
+            append_record(args.file, {"type": "artifact", "name": name, "size_bytes": size_bytes})
+            print(f"{name}\t{human_size(size_bytes)}")
+        return 0
+
+    if args.command == "size":
+        for size_bytes in disk_usage(args.paths):
+            print(human_size(size_bytes))
+        return 0
+
+    files = span_files(args.inputs)
+    timeline = build_timeline(read_spans(files))
+    print(f"[INFO] Merged {len(files)} span file(s) into {len(timeline['legs'])} leg(s)", file=sys.stderr)
+    rendered = json.dumps(timeline, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    else:
+        print(rendered)
+    if args.markdown:
+        with args.markdown.open("a", encoding="utf-8") as handle:
+            handle.write(render_markdown(timeline) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Content-defined chunk manifests for delta updater downloads.
+
+Each updater archive is split into variable-size chunks whose boundaries
+depend only on nearby content, so an insertion early in the file shifts
+offsets without changing the hashes of later chunks. Given the manifests of
+two versions, the backend can serve only the chunks a client is missing.
+
+Boundaries are anchor-based: a chunk ends right after the first occurrence
+of ``ANCHOR`` at least ``min_size`` bytes into the chunk, or at ``max_size``
+if no anchor appears. Anchor search runs in C via ``bytearray.find``, which
+keeps chunking multi-hundred-MB archives fast without a per-byte Python
+rolling hash.
+
+Usage:
+    python chunk_manifest.py build <file> [-o manifest.json]
+    python chunk_manifest.py compare <old-manifest.json> <new-manifest.json>
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+from artifact_hashing import default_workers
+
+MANIFEST_VERSION = 1
+# Two bytes -> on average one anchor per 64 KiB of high-entropy data
+ANCHOR = b"\x8f\x3b"
+DEFAULT_MIN_CHUNK = 256 * 1024
+DEFAULT_MAX_CHUNK = 4 * 1024 * 1024
+READ_SIZE = 8 * 1024 * 1024
+
+
+def iter_chunks(
+    path: Path,
+    min_size: int = DEFAULT_MIN_CHUNK,
+    max_size: int = DEFAULT_MAX_CHUNK,
+) -> Iterator[Tuple[int, int, str]]:
+    """Yield ``(offset, length, sha256)`` for each content-defined chunk."""
+    buffer = bytearray()
+    start = 0  # start of the current chunk within ``buffer``
+    offset = 0  # absolute file offset of ``buffer[start]``
+    eof = False
+    with path.open("rb") as handle:
+        while not eof:
+            data = handle.read(READ_SIZE)
+            eof = not data
+            # Compact once per read instead of after every chunk
+            del buffer[:start]
+            start = 0
+            buffer += data
+
+            while start < len(buffer):
+                available = len(buffer) - start
+                anchor = buffer.find(ANCHOR, start + min_size, start + max_size)
+                if anchor != -1:
+                    length = anchor + len(ANCHOR) - start
+                elif available >= max_size:
+                    length = max_size
+                elif eof:
+                    length = available
+                else:
+                    break  # need more data to place the next boundary
+
+                view = memoryview(buffer)[start : start + length]
+                digest = hashlib.sha256(view).hexdigest()
+                view.release()
+                yield offset, length, digest
+                offset += length
+                start += length
+
+
+def build_chunk_manifest(
+    path: Path,
+    min_size: int = DEFAULT_MIN_CHUNK,
+    max_size: int = DEFAULT_MAX_CHUNK,
+) -> Dict[str, Any]:
+    chunks = [list(chunk) for chunk in iter_chunks(path, min_size, max_size)]
+    # Digest of the ordered chunk hashes doubles as a whole-file fingerprint
+    file_digest = hashlib.sha256()
+    for _, _, digest in chunks:
+        file_digest.update(bytes.fromhex(digest))
+    size = chunks[-1][0] + chunks[-1][1] if chunks else 0
+    return {
+        "version": MANIFEST_VERSION,
+        "file": path.name,
+        "size_bytes": size,
+        "chunk_list_sha256": file_digest.hexdigest(),
+        "chunking": {
+            "algorithm": "anchor-cdc",
+            "anchor": ANCHOR.hex(),
+            "min_size": min_size,
+            "max_size": max_size,
+            "hash": "sha256",
+        },
+        # [offset, length, sha256] triples keep the manifest compact
+        "chunks": chunks,
+    }
+
+
+def compare_manifests(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, int]:
+    """Bytes of ``new`` that a client holding ``old`` can reuse vs must download."""
+    known = {digest for _, _, digest in old.get("chunks", [])}
+    reused = sum(length for _, length, digest in new["chunks"] if digest in known)
+    return {
+        "size_bytes": new["size_bytes"],
+        "reused_bytes": reused,
+        "download_bytes": new["size_bytes"] - reused,
+    }
+
+
+def manifest_name(artifact_name: str) -> str:
+    return f"{artifact_name}.chunks.json"
+
+
+class ChunkManifestBuilder:
+    """Build and write chunk manifests for updater archives on a thread pool."""
+
+    def __init__(self, output_dir: Path, max_workers: int | None = None) -> None:
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or default_workers(),
+            thread_name_prefix="chunk-manifest",
+        )
+        self._futures: Dict[Path, Future[Dict[str, Any]]] = {}
+
+    def _build_and_write(self, source: Path) -> Dict[str, Any]:
+        manifest = build_chunk_manifest(source)
+        target = self.output_dir / manifest_name(source.name)
+        encoded = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        target.write_bytes(encoded)
+        return {
+            "path": target,
+            "chunk_count": len(manifest["chunks"]),
+            "size_bytes": len(encoded),
+            "checksum_sha256": hashlib.sha256(encoded).hexdigest(),
+            "chunking": manifest["chunking"],
+        }
+
+    def submit(self, source: Path) -> Future[Dict[str, Any]]:
+        key = source.resolve()
+        if key not in self._futures:
+            self._futures[key] = self._executor.submit(self._build_and_write, key)
+        return self._futures[key]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ChunkManifestBuilder":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Write a chunk manifest for a file")
+    build.add_argument("file", type=Path)
+    build.add_argument("-o", "--output", type=Path)
+    build.add_argument("--min-size", type=int, default=DEFAULT_MIN_CHUNK)
+    build.add_argument("--max-size", type=int, default=DEFAULT_MAX_CHUNK)
+
+    compare = subparsers.add_parser(
+        "compare", help="Report reusable bytes between two manifests"
+    )
+    compare.add_argument("old", type=Path)
+    compare.add_argument("new", type=Path)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        manifest = build_chunk_manifest(args.file, args.min_size, args.max_size)
+        output = args.output or args.file.with_name(manifest_name(args.file.name))
+        output.write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+        print(f"[INFO] Wrote {len(manifest['chunks'])} chunk(s) -> {output}")
+        return 0
+
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    print(json.dumps(compare_manifests(old, new), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Binary delta patches between consecutive updater archives.
+
+Patches are produced with ``zstd --patch-from``, which uses the previous
+archive as a dictionary for the new one. Most clients update one version at
+a time, so a small patch can replace a multi-hundred-MB download, but only
+when the archive's bytes are stable between versions. Today's updater
+archives (.app.tar.gz, .tar.gz, MSI) are already compressed: a small change
+to the app reshuffles the whole compressed stream, and patches typically
+come out at a large fraction of the archive. build_backend_payload.py drops
+patches above 80% of the archive; expect the few-MB case only once the
+archives are stored uncompressed (or with rsyncable compression).
+
+Applying a patch on the client (or to verify it here):
+    zstd -d --long=<window_log> --patch-from=<base> <patch> -o <archive>
+
+Usage:
+    python delta_patches.py create <base> <target> <patch>
+    python delta_patches.py apply <base> <patch> <output> --window-log N
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import shutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from artifact_hashing import sha256
+
+ZSTD_BINARY = "zstd"
+# zstd accepts window logs between 10 and 31 on 64-bit builds; 27 is its default
+MIN_WINDOW_LOG = 27
+MAX_WINDOW_LOG = 31
+DEFAULT_LEVEL = 19
+DOWNLOAD_CHUNK = 1024 * 1024
+
+
+@dataclass
+class PatchResult:
+    path: Path
+    size_bytes: int
+    window_log: int
+
+
+def zstd_binary() -> str | None:
+    return shutil.which(ZSTD_BINARY)
+
+
+def window_log_for(*paths: Path) -> int:
+    """Smallest window covering the largest input, so the base stays referenceable."""
+    largest = max(path.stat().st_size for path in paths)
+    needed = math.ceil(math.log2(max(largest, 2)))
+    return min(MAX_WINDOW_LOG, max(MIN_WINDOW_LOG, needed))
+
+
+def fetch_base_archive(url: str, target: Path, timeout_seconds: float = 60.0) -> Path:
+    """Download ``url`` to ``target`` (write-then-rename, so partial files never linger)."""
+    # Deferred: urllib.request (http.client, email) dominates this module's
+    # import time and only the delta stage ever downloads anything
+    import urllib.request
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.part")
+    request = urllib.request.Request(url, headers={"User-Agent": "rostoc-ci"})
+    with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
+        with tmp_path.open("wb") as handle:
+            shutil.copyfileobj(response, handle, DOWNLOAD_CHUNK)
+    tmp_path.replace(target)
+    return target
+
+
+def apply_patch(base: Path, patch: Path, output: Path, window_log: int) -> Path:
+    binary = zstd_binary()
+    if binary is None:
+        raise RuntimeError("zstd is not installed")
+    subprocess.run(
+        [
+            binary,
+            "-d",
+            "-q",
+            "-f",
+            f"--long={window_log}",
+            f"--patch-from={base}",
+            str(patch),
+            "-o",
+            str(output),
+        ],
+        check=True,
+    )
+    return output
+
+
+def create_patch(
+    base: Path,
+    target: Path,
+    output: Path,
+    *,
+    level: int = DEFAULT_LEVEL,
+    verify: bool = True,
+) -> PatchResult:
+    """Create a zstd patch turning ``base`` into ``target``.
+
+    With ``verify`` the patch is applied to a temporary file and compared to
+    ``target`` byte-for-byte (via sha256) before it is returned.
+    """
+    binary = zstd_binary()
+    if binary is None:
+        raise RuntimeError("zstd is not installed")
+
+    window_log = window_log_for(base, target)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [
+            binary,
+            f"-{level}",
+            "-q",
+            "-f",
+            "-T0",
+            f"--long={window_log}",
+            f"--patch-from={base}",
+            str(target),
+            "-o",
+            str(output),
+        ],
+        check=True,
+    )
+
+    if verify:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            restored = apply_patch(base, output, Path(tmp_dir) / target.name, window_log)
+            if sha256(restored) != sha256(target):
+                output.unlink(missing_ok=True)
+                raise RuntimeError(f"Patch {output.name} does not reproduce {target.name}")
+
+    return PatchResult(path=output, size_bytes=output.stat().st_size, window_log=window_log)
+
+
+def patch_name(archive_name: str, base_version: str) -> str:
+    return f"{archive_name}.from-{base_version}.zstpatch"
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create = subparsers.add_parser("create", help="Create a patch from base to target")
+    create.add_argument("base", type=Path)
+    create.add_argument("target", type=Path)
+    create.add_argument("patch", type=Path)
+    create.add_argument("--level", type=int, default=DEFAULT_LEVEL)
+    create.add_argument("--no-verify", action="store_true")
+
+    apply = subparsers.add_parser("apply", help="Rebuild target from base and patch")
+    apply.add_argument("base", type=Path)
+    apply.add_argument("patch", type=Path)
+    apply.add_argument("output", type=Path)
+    apply.add_argument("--window-log", type=int, required=True)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "create":
+            result = create_patch(
+                args.base, args.target, args.patch, level=args.level, verify=not args.no_verify
+            )
+            print(
+                f"[INFO] Wrote {result.path} ({result.size_bytes} bytes, "
+                f"window_log={result.window_log})"
+            )
+        else:
+            apply_patch(args.base, args.patch, args.output, args.window_log)
+            print(f"[INFO] Rebuilt {args.output}")
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
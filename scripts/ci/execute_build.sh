@@ -55,6 +55,11 @@ is_retryable_build_failure() {
   esac
 }
 
+# Native Windows Python needs the Windows PID behind a Git Bash PID
+native_pid() {
+  cat "/proc/$1/winpid" 2>/dev/null || echo "$1"
+}
+
 cleanup_retry_artifacts() {
   local platform="$1"
 
@@ -80,6 +85,17 @@ BUILD_COMMAND="${3:?Build command required}"
 
 LOG_FILE="build-${PLATFORM}-${ARCH}.log"
 
+# Error watcher: scans the log while the build runs and stops it as soon as a
+# known fatal error (keychain, linker, disk space, Rust compile error) appears.
+# A stopped build is still retried when its log shows a transient failure
+# (is_retryable_build_failure). Set ROSTOC_EARLY_ABORT=0 to only annotate.
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ERROR_ANALYZER="${SCRIPT_DIR}/analyze_build_errors.py"
+ERROR_WATCH_PYTHON="$(command -v python3 || command -v python || true)"
+ERROR_WATCH_STATE="${LOG_FILE}.scan.json"
+ERROR_WATCH_STOP="${LOG_FILE}.done"
+BUILD_ABORT_FILE="${LOG_FILE}.abort"
+
 # Debug variant configuration (all platforms)
 echo "============================================================"
 echo "[DEBUG] Variant Configuration"
@@ -118,6 +134,7 @@ BUILD_EXIT_CODE=0
 BUILD_ATTEMPT=1
 
 : > "${LOG_FILE}"
+rm -f "${ERROR_WATCH_STATE}" "${ERROR_WATCH_STOP}" "${BUILD_ABORT_FILE}"
 
 while [[ ${BUILD_ATTEMPT} -le ${MAX_ATTEMPTS} ]]; do
   {
@@ -127,16 +144,47 @@ while [[ ${BUILD_ATTEMPT} -le ${MAX_ATTEMPTS} ]]; do
   } | tee -a "${LOG_FILE}"
 
   set +e
-  # shellcheck disable=SC2086
-  ${BUILD_COMMAND} 2>&1 | tee -a "${LOG_FILE}"
-  # CRITICAL: Use PIPESTATUS[0] to get build command exit code, not tee's exit code
-  BUILD_EXIT_CODE=${PIPESTATUS[0]}
+  rm -f "${ERROR_WATCH_STOP}"
+  # Run in the background so the error watcher can stop a doomed build
+  (
+    set +e
+    # shellcheck disable=SC2086
+    ${BUILD_COMMAND} 2>&1 | tee -a "${LOG_FILE}"
+    # CRITICAL: Use PIPESTATUS[0] to get build command exit code, not tee's exit code
+    exit "${PIPESTATUS[0]}"
+  ) &
+  BUILD_PID=$!
+
+  WATCH_PID=""
+  if [[ -n "${ERROR_WATCH_PYTHON}" && -f "${ERROR_ANALYZER}" ]]; then
+    WATCH_ARGS=(--follow --state "${ERROR_WATCH_STATE}" --stop-file "${ERROR_WATCH_STOP}")
+    if [[ "${ROSTOC_EARLY_ABORT:-1}" != "0" ]]; then
+      WATCH_ARGS+=(--abort-file "${BUILD_ABORT_FILE}" --kill-pid "$(native_pid "${BUILD_PID}")")
+    fi
+    "${ERROR_WATCH_PYTHON}" "${ERROR_ANALYZER}" "${LOG_FILE}" "${WATCH_ARGS[@]}" &
+    WATCH_PID=$!
+  fi
+
+  wait "${BUILD_PID}"
+  BUILD_EXIT_CODE=$?
+  # The watcher makes a final pass over the log, then exits
+  touch "${ERROR_WATCH_STOP}"
+  if [[ -n "${WATCH_PID}" ]]; then
+    wait "${WATCH_PID}"
+  fi
   set -e
 
   if [[ ${BUILD_EXIT_CODE} -eq 0 ]]; then
     break
   fi
 
+  # A transient failure (e.g. a build.rs download) can print a fatal pattern
+  # too; retrying takes precedence over the watcher's verdict
+  if [[ -f "${BUILD_ABORT_FILE}" ]] && ! is_retryable_build_failure "${LOG_FILE}" "${PLATFORM}"; then
+    echo "[ERROR] Build stopped early: $(cat "${BUILD_ABORT_FILE}") cannot be fixed by retrying" | tee -a "${LOG_FILE}"
+    break
+  fi
+
   if [[ ${BUILD_ATTEMPT} -ge ${MAX_ATTEMPTS} ]]; then
     break
   fi
@@ -147,6 +195,7 @@ while [[ ${BUILD_ATTEMPT} -le ${MAX_ATTEMPTS} ]]; do
 
   echo "::warning::Retrying transient ${PLATFORM} build failure after exit code ${BUILD_EXIT_CODE}" | tee -a "${LOG_FILE}"
   cleanup_retry_artifacts "${PLATFORM}"
+  rm -f "${BUILD_ABORT_FILE}"
   BUILD_ATTEMPT=$((BUILD_ATTEMPT + 1))
   sleep 15
 done
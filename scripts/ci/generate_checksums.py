@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Generate checksums.txt and checksums.json for release artifacts in a directory.
+
+Replaces the sha256sum/awk pipeline in .github/scripts/generate-checksums.sh.
+Every artifact kind produced by ARTIFACT_NAMING is hashed concurrently, and
+optional extra digests (sha512, blake2b) come from the same read of each file.
+Outputs are written only once every hash has completed, each to a temporary
+file renamed into place, so a failed run never leaves a truncated
+checksums.json for later stages to trust. They are deliberately not streamed
+while hashes resolve: the JSON is a few hundred bytes per artifact, so
+buffering it costs nothing next to hashing, and a stream cut short by an
+error is exactly the partial file this guards against.
+
+These files are the checksum cache for the publish job: build_backend_payload.py
+trusts them instead of re-reading multi-hundred-MB artifacts on every
+publish run and rerun. Both arches of a platform write the same
+checksums.json, so when the publish job merges their artifacts one file
+replaces the other. The per-artifact ``<name>.sha256`` sidecars survive the
+merge and cover the rest.
+
+Usage:
+    python generate_checksums.py <artifacts_dir> [--digest sha512] [--digest blake2b]
+
+Outputs (written into <artifacts_dir>):
+    checksums.txt           - sha256sum-compatible lines (``<sha256>  ./<name>``)
+    checksums.json          - {"<name>": "<sha256>"} consumed by build_backend_payload.py
+    <name>.sha256           - the artifact's sha256sum line, read when checksums.json
+                              lacks the name
+    checksums-extended.json - {"<name>": {"size_bytes": ..., "<algo>": ...}}
+                              (only when --digest is given)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+from artifact_hashing import ArtifactHasher, ArtifactInspection
+from release_naming import ARTIFACT_NAMING
+
+EXTRA_DIGESTS = ("sha512", "blake2b")
+# Every target the build matrix and build_backend_payload.py know about
+PLATFORM_ARCHES = (
+    ("macos", "aarch64"),
+    ("macos", "x86_64"),
+    ("windows", "x86_64"),
+    ("windows", "i686"),
+    ("linux", "x86_64"),
+    ("linux", "aarch64"),
+)
+CHANNELS = ("stable", "staging")
+SAMPLE_VERSION = "0.0.0"
+
+
+@lru_cache(maxsize=None)
+def artifact_suffixes() -> tuple[str, ...]:
+    """Extensions of every updater archive and installer ARTIFACT_NAMING produces.
+
+    The suffix is everything from the first dot of the last ``-``/``_``
+    separated token, so ``Rostoc-1.2.3-darwin-aarch64.app.tar.gz`` gives
+    ``.app.tar.gz``.
+    """
+    suffixes = set()
+    for platform, arch in PLATFORM_ARCHES:
+        for channel in CHANNELS:
+            for name in (
+                ARTIFACT_NAMING.get_updater_archive_name(SAMPLE_VERSION, platform, arch, channel),
+                ARTIFACT_NAMING.get_installer_name(SAMPLE_VERSION, platform, arch, channel),
+            ):
+                last_token = re.split(r"[-_]", name)[-1]
+                if "." in last_token:
+                    suffixes.add(last_token[last_token.index(".") :])
+    return tuple(sorted(suffixes))
+
+
+def discover_artifacts(root: Path) -> list[Path]:
+    suffixes = artifact_suffixes()
+    return sorted(
+        path
+        for path in root.iterdir()
+        if path.is_file() and path.name.endswith(suffixes)
+    )
+
+
+def write_atomically(path: Path, text: str) -> None:
+    # Write-then-rename so readers only ever see a complete file
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("artifacts_dir", type=Path)
+    parser.add_argument(
+        "--digest",
+        action="append",
+        choices=EXTRA_DIGESTS,
+        default=[],
+        help="Extra digest to compute in the same read pass (repeatable)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    root: Path = args.artifacts_dir
+
+    if not root.is_dir():
+        print(f"[ERROR] Directory not found: {root}", file=sys.stderr)
+        return 1
+
+    print(f"[INFO] Computing SHA256 checksums for all artifacts in {root}")
+    artifacts = discover_artifacts(root)
+    if not artifacts:
+        print("[WARN] No artifacts found to checksum", file=sys.stderr)
+        return 0
+
+    algorithms = ("sha256", *dict.fromkeys(args.digest))
+    with ArtifactHasher(max_workers=args.workers, algorithms=algorithms) as hasher:
+        futures: Dict[str, Future[ArtifactInspection]] = {
+            path.name: hasher.submit(path) for path in artifacts
+        }
+        # Any hashing error raises here, before a single output is touched
+        results = {name: future.result() for name, future in futures.items()}
+
+    write_atomically(
+        root / "checksums.json",
+        json.dumps({name: result.sha256 for name, result in results.items()}, indent=2) + "\n",
+    )
+    lines = [f"{result.sha256}  ./{name}" for name, result in results.items()]
+    write_atomically(root / "checksums.txt", "\n".join(lines) + "\n")
+    for name, result in results.items():
+        write_atomically(root / f"{name}.sha256", f"{result.sha256}  {name}\n")
+    print("[INFO] Generated checksums.txt:")
+    print("\n".join(lines))
+    print("[INFO] Generated checksums.json")
+
+    if args.digest:
+        extended = {
+            name: {"size_bytes": result.size_bytes, **result.digests}
+            for name, result in results.items()
+        }
+        write_atomically(root / "checksums-extended.json", json.dumps(extended, indent=2) + "\n")
+        print(f"[INFO] Generated checksums-extended.json ({', '.join(algorithms)})")
+
+    print("[INFO] ✅ Checksum generation complete")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
-"""CLI wrapper for STORAGE_PATHS helpers from runtime_config.
+"""CLI wrapper for STORAGE_PATHS helpers from runtime_config (via release_naming).
 
 This allows shell scripts to use the centralized path generation without hardcoding.
 
 Usage:
     python get_storage_path.py <type> <version> <filename> [channel]
+    python get_storage_path.py batch [--json] [requests-file]
+    python get_storage_path.py table <version> <channel> <filename>... [--output FILE]
 
 Types:
     path      - Get storage path for artifact
@@ -20,62 +22,202 @@ Examples:
 
     SPACES_CDN_BASE=https://cdn.example.com python get_storage_path.py url 0.2.143 file.dmg stable
     # Output: https://cdn.example.com/releases/v0.2.143/file.dmg
+
+Batch mode resolves many requests in one process instead of paying interpreter
+startup and the runtime_config import per lookup. Requests come from the file
+argument or stdin, either one ``<type> <version> <filename> [channel]`` per line
+(blank lines and ``#`` comments are skipped) or a JSON list of objects with
+``type``/``version``/``filename``/``channel`` keys. Results are printed one per
+line in request order, or as a JSON list with ``--json``:
+
+    printf 'path 0.2.143 a.dmg\nsignature 0.2.143 a.tar.gz\n' | \
+        python get_storage_path.py batch
+    # Output: releases/v0.2.143/a.dmg
+    #         releases/v0.2.143/a.tar.gz.sig
+
+Table mode writes a static JSON lookup table mapping every filename to its
+path, signature path and (when SPACES_CDN_BASE is set) CDN URL, so a publish
+step can resolve everything once and read the rest with jq:
+
+    python get_storage_path.py table 0.2.143 stable a.dmg a.msi --output paths.json
+    jq -r '."a.dmg".path' paths.json
 """
 
+import json
 import os
 import sys
 from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from release_naming import STORAGE_PATHS
+
+PATH_TYPES = ("path", "url", "signature")
+
+
+def resolve(
+    path_type: str,
+    version: str,
+    filename: str,
+    channel: str = "stable",
+    cdn_base: Optional[str] = None,
+) -> str:
+    """Resolve one lookup; raises ValueError for unusable requests."""
+    if path_type == "path":
+        return STORAGE_PATHS.get_storage_path(version, filename, channel)
+    if path_type == "url":
+        if cdn_base is None:
+            cdn_base = os.environ.get("SPACES_CDN_BASE", "")
+        if not cdn_base:
+            raise ValueError("SPACES_CDN_BASE environment variable not set")
+        return STORAGE_PATHS.get_cdn_url(version, filename, cdn_base, channel)
+    if path_type == "signature":
+        return STORAGE_PATHS.get_signature_path(version, filename, channel)
+    raise ValueError(
+        f"Unknown type '{path_type}' (valid types: {', '.join(PATH_TYPES)})"
+    )
+
+
+def parse_requests(handle: TextIO) -> List[Dict[str, str]]:
+    """Parse batch requests from whitespace-separated lines or a JSON list."""
+    text = handle.read()
+    if text.lstrip().startswith("["):
+        requests = []
+        for index, item in enumerate(json.loads(text), start=1):
+            if isinstance(item, list):
+                item = dict(zip(("type", "version", "filename", "channel"), item))
+            if not isinstance(item, dict) or not all(
+                item.get(key) for key in ("type", "version", "filename")
+            ):
+                raise ValueError(f"request {index}: need type, version and filename")
+            requests.append({**item, "channel": item.get("channel") or "stable"})
+        return requests
+
+    requests = []
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        fields = line.split("#", 1)[0].split()
+        if not fields:
+            continue
+        if len(fields) not in (3, 4):
+            raise ValueError(
+                f"line {lineno}: expected '<type> <version> <filename> [channel]'"
+            )
+        path_type, version, filename = fields[:3]
+        channel = fields[3] if len(fields) == 4 else "stable"
+        requests.append(
+            {
+                "type": path_type,
+                "version": version,
+                "filename": filename,
+                "channel": channel,
+            }
+        )
+    return requests
+
 
-# Add rostoc scripts to path for runtime_config import
-# Try CI path first (private-src/), then local dev path (sibling repo)
-SCRIPT_DIR = Path(__file__).resolve().parent
-ROSTOC_SCRIPTS_CI = (
-    SCRIPT_DIR.parents[1] / "private-src" / "scripts"
-)  # rostoc-updates/scripts/ci -> rostoc-updates/ -> private-src/scripts
-ROSTOC_SCRIPTS_LOCAL = (
-    SCRIPT_DIR.parents[3] / "rostoc" / "scripts"
-)  # For local development
-
-if ROSTOC_SCRIPTS_CI.exists():
-    sys.path.insert(0, str(ROSTOC_SCRIPTS_CI))
-    from runtime_config import STORAGE_PATHS
-elif ROSTOC_SCRIPTS_LOCAL.exists():
-    sys.path.insert(0, str(ROSTOC_SCRIPTS_LOCAL))
-    from runtime_config import STORAGE_PATHS
-else:
-    # Fallback for when running without rostoc repo
-    class STORAGE_PATHS:
-        CHANNEL_PREFIXES = {
-            "stable": "releases",
-            "staging": "releases/staging",
-            "beta": "releases/beta",
-            "dev": "releases/dev",
+def run_batch(args: List[str]) -> int:
+    as_json = "--json" in args
+    paths = [arg for arg in args if arg != "--json"]
+    if len(paths) > 1:
+        print(
+            "Usage: python get_storage_path.py batch [--json] [requests-file]",
+            file=sys.stderr,
+        )
+        return 1
+
+    try:
+        if paths and paths[0] != "-":
+            with open(paths[0], "r", encoding="utf-8") as handle:
+                requests = parse_requests(handle)
+        else:
+            requests = parse_requests(sys.stdin)
+        cdn_base = os.environ.get("SPACES_CDN_BASE", "")
+        results = []
+        for index, request in enumerate(requests, start=1):
+            try:
+                result = resolve(
+                    request["type"],
+                    request["version"],
+                    request["filename"],
+                    request["channel"],
+                    cdn_base,
+                )
+            except ValueError as e:
+                raise ValueError(f"request {index}: {e}") from e
+            results.append(result)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if as_json:
+        payload = [
+            {**request, "result": result}
+            for request, result in zip(requests, results)
+        ]
+        print(json.dumps(payload, indent=2))
+    else:
+        for result in results:
+            print(result)
+    return 0
+
+
+def build_table(
+    version: str, channel: str, filenames: List[str], cdn_base: str
+) -> Dict[str, Dict[str, Any]]:
+    table: Dict[str, Dict[str, Any]] = {}
+    for filename in filenames:
+        entry = {
+            "path": resolve("path", version, filename, channel),
+            "signature": resolve("signature", version, filename, channel),
         }
+        if cdn_base:
+            entry["url"] = resolve("url", version, filename, channel, cdn_base)
+        table[filename] = entry
+    return table
+
+
+def run_table(args: List[str]) -> int:
+    output = None
+    if "--output" in args:
+        position = args.index("--output")
+        if position + 1 >= len(args):
+            print("Error: --output requires a file path", file=sys.stderr)
+            return 1
+        output = args[position + 1]
+        args = args[:position] + args[position + 2 :]
+
+    if len(args) < 3:
+        print(
+            "Usage: python get_storage_path.py table <version> <channel> "
+            "<filename>... [--output FILE]",
+            file=sys.stderr,
+        )
+        return 1
+
+    version, channel, filenames = args[0], args[1], args[2:]
+    try:
+        table = build_table(
+            version, channel, filenames, os.environ.get("SPACES_CDN_BASE", "")
+        )
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
 
-        @staticmethod
-        def get_storage_path(
-            version: str, filename: str, channel: str = "stable"
-        ) -> str:
-            prefix = STORAGE_PATHS.CHANNEL_PREFIXES.get(channel, "releases")
-            return f"{prefix}/v{version}/{filename}"
-
-        @staticmethod
-        def get_cdn_url(
-            version: str, filename: str, cdn_base: str, channel: str = "stable"
-        ) -> str:
-            if not cdn_base:
-                return ""
-            storage_path = STORAGE_PATHS.get_storage_path(version, filename, channel)
-            return f"{cdn_base}/{storage_path}"
-
-        @staticmethod
-        def get_signature_path(
-            version: str, filename: str, channel: str = "stable"
-        ) -> str:
-            return STORAGE_PATHS.get_storage_path(version, f"{filename}.sig", channel)
+    encoded = json.dumps(
+        {"version": version, "channel": channel, "files": table}, indent=2
+    )
+    if output:
+        Path(output).write_text(encoded + "\n", encoding="utf-8")
+    else:
+        print(encoded)
+    return 0
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.exit(run_batch(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "table":
+        sys.exit(run_table(sys.argv[2:]))
+
     if len(sys.argv) < 4:
         print(
             "Usage: python get_storage_path.py <type> <version> <filename> [channel]",
@@ -90,27 +232,7 @@ def main():
     channel = sys.argv[4] if len(sys.argv) > 4 else "stable"
 
     try:
-        if path_type == "path":
-            print(STORAGE_PATHS.get_storage_path(version, filename, channel))
-
-        elif path_type == "url":
-            cdn_base = os.environ.get("SPACES_CDN_BASE", "")
-            if not cdn_base:
-                print(
-                    "Error: SPACES_CDN_BASE environment variable not set",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
-            print(STORAGE_PATHS.get_cdn_url(version, filename, cdn_base, channel))
-
-        elif path_type == "signature":
-            print(STORAGE_PATHS.get_signature_path(version, filename, channel))
-
-        else:
-            print(f"Error: Unknown type '{path_type}'", file=sys.stderr)
-            print("Valid types: path, url, signature", file=sys.stderr)
-            sys.exit(1)
-
+        print(resolve(path_type, version, filename, channel))
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,7 +1,50 @@
 #!/usr/bin/env bash
+# Report failed build legs to Discord.
+# Usage: notify_build_failure_discord.sh           (in a failed matrix leg)
+#        notify_build_failure_discord.sh flush DIR (once per run)
+#
+# With DISCORD_QUEUE_DIR set, a failed leg queues its notification there (the
+# workflow uploads it as an artifact) and the flush call posts every queued
+# leg as a single embed, so a release failing on several platforms sends one
+# message instead of racing Discord's rate limit. Without it the leg posts
+# directly.
+
 set -euo pipefail
 
-python scripts/ci/send_discord_webhook.py \
+PYTHON_BIN="$(command -v python3 || command -v python)"
+RUN_URL="https://github.com/${GITHUB_REPOSITORY}/actions/runs/${GITHUB_RUN_ID}"
+COMMIT_URL="https://github.com/${GITHUB_REPOSITORY}/commit/${GITHUB_SHA}"
+
+if [[ "${1:-}" == "flush" ]]; then
+  QUEUE_DIR="${2:?Queue directory required}"
+  exec "$PYTHON_BIN" scripts/ci/send_discord_webhook.py \
+    --skip-missing \
+    --label "build failure summary" \
+    --flush "$QUEUE_DIR" \
+    --content "Build failed on {count} matrix leg(s): ${GITHUB_REF_NAME}" \
+    --title "Build Failed: {count} matrix leg(s)" \
+    --color "15158332" \
+    --field "Author=${GITHUB_ACTOR}" \
+    --field "Logs=[View Logs](${RUN_URL})" \
+    --field "Commit=[${GITHUB_SHA}](${COMMIT_URL})" \
+    --field "Branch=${GITHUB_REF_NAME}"
+fi
+
+if [[ -n "${DISCORD_QUEUE_DIR:-}" ]]; then
+  # Run-wide fields (author, commit, logs link) are added once by the flush
+  exec "$PYTHON_BIN" scripts/ci/send_discord_webhook.py \
+    --label "build failure" \
+    --queue-dir "$DISCORD_QUEUE_DIR" \
+    --title "${MATRIX_NAME}" \
+    --color "15158332" \
+    --field "Platform=${MATRIX_PLATFORM} ${MATRIX_ARCH}" \
+    --field "Variant=${MATRIX_VARIANT}" \
+    --field "Version=${BUILD_VERSION:-unknown}" \
+    --field "Build logs=build-logs-${MATRIX_VARIANT}-${MATRIX_PLATFORM}-${MATRIX_ARCH}-${GITHUB_RUN_NUMBER}" \
+    --field "Diagnostics=diagnostics-${MATRIX_PLATFORM}-${MATRIX_ARCH}-${GITHUB_RUN_NUMBER}"
+fi
+
+exec "$PYTHON_BIN" scripts/ci/send_discord_webhook.py \
   --skip-missing \
   --label "build failure" \
   --content "Build failed: ${MATRIX_NAME}" \
@@ -11,8 +54,8 @@ python scripts/ci/send_discord_webhook.py \
   --field "Variant=${MATRIX_VARIANT}" \
   --field "Version=${BUILD_VERSION:-unknown}" \
   --field "Author=${GITHUB_ACTOR}" \
-  --field "Logs=[View Logs](https://github.com/${GITHUB_REPOSITORY}/actions/runs/${GITHUB_RUN_ID})" \
+  --field "Logs=[View Logs](${RUN_URL})" \
   --field "Build logs=build-logs-${MATRIX_VARIANT}-${MATRIX_PLATFORM}-${MATRIX_ARCH}-${GITHUB_RUN_NUMBER}" \
   --field "Diagnostics=diagnostics-${MATRIX_PLATFORM}-${MATRIX_ARCH}-${GITHUB_RUN_NUMBER}" \
-  --field "Commit=[${GITHUB_SHA}](https://github.com/${GITHUB_REPOSITORY}/commit/${GITHUB_SHA})" \
+  --field "Commit=[${GITHUB_SHA}](${COMMIT_URL})" \
   --field "Branch=${GITHUB_REF_NAME}"
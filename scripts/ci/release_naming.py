@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Lazily loaded, memoized ARTIFACT_NAMING/STORAGE_PATHS for the CI tools.
+
+runtime_config lives in the rostoc checkout (private-src/scripts in CI, the
+sibling rostoc repo locally) and is only imported on the first naming or path
+lookup, so entry points that never need it pay nothing at startup. When no
+checkout is available the built-in fallback below mirrors its rules.
+
+Every lookup is cached with functools.lru_cache: payload generation asks for
+the same archive names and storage paths once per platform, arch and stage.
+
+Import-time budget check (also run by ``scripts/ai-test full``):
+    python release_naming.py --check-import-time [--budget-ms N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+# rostoc-updates/scripts/ci -> rostoc-updates/private-src/scripts
+ROSTOC_SCRIPTS_CI = SCRIPT_DIR.parents[1] / "private-src" / "scripts"
+# For local development: a rostoc checkout next to rostoc-updates
+ROSTOC_SCRIPTS_LOCAL = SCRIPT_DIR.parents[3] / "rostoc" / "scripts"
+
+# Entry points whose import cost is budgeted; none of them may pull in
+# runtime_config (or anything else heavy) at import time.
+ENTRY_POINTS = (
+    "release_naming",
+    "get_storage_path",
+    "build_backend_payload",
+    "generate_checksums",
+    "build_manifest_variants",
+)
+DEFAULT_IMPORT_BUDGET_MS = 150.0
+
+
+class _FallbackArtifactNaming:
+    @staticmethod
+    def get_updater_archive_name(
+        version: str, platform: str, arch: str, channel: str = "stable"
+    ) -> str:
+        variant_prefix = "Rostoc-staging" if channel == "staging" else "Rostoc"
+        if platform == "macos":
+            return f"{variant_prefix}-{version}-darwin-{arch}.app.tar.gz"
+        elif platform == "windows":
+            # Windows: MSI file is used directly as updater archive (Tauri v2)
+            return f"{variant_prefix}-{version}-windows-{_windows_arch(arch)}.msi"
+        return f"{variant_prefix}-{version}-{platform}-{arch}.tar.gz"
+
+    @staticmethod
+    def get_installer_name(
+        version: str, platform: str, arch: str, channel: str = "stable"
+    ) -> str:
+        variant_prefix = "Rostoc-staging" if channel == "staging" else "Rostoc"
+        if platform == "macos":
+            return f"{variant_prefix}_{version}_{arch}.dmg"
+        elif platform == "windows":
+            return f"{variant_prefix}-{version}-windows-{_windows_arch(arch)}.msi"
+        return f"{variant_prefix}-{version}-{platform}-{arch}.AppImage"
+
+    @staticmethod
+    def get_signature_name(artifact: str) -> str:
+        return f"{artifact}.sig"
+
+
+class _FallbackStoragePaths:
+    CHANNEL_PREFIXES = {
+        "stable": "releases",
+        "staging": "releases/staging",
+        "beta": "releases/beta",
+        "dev": "releases/dev",
+    }
+
+    @staticmethod
+    def get_storage_path(version: str, filename: str, channel: str = "stable") -> str:
+        prefix = _FallbackStoragePaths.CHANNEL_PREFIXES.get(channel, "releases")
+        return f"{prefix}/v{version}/{filename}"
+
+    @staticmethod
+    def get_cdn_url(
+        version: str, filename: str, cdn_base: str, channel: str = "stable"
+    ) -> str:
+        if not cdn_base:
+            return ""
+        storage_path = _FallbackStoragePaths.get_storage_path(version, filename, channel)
+        return f"{cdn_base}/{storage_path}"
+
+    @staticmethod
+    def get_signature_path(version: str, filename: str, channel: str = "stable") -> str:
+        return _FallbackStoragePaths.get_storage_path(
+            version, f"{filename}.sig", channel
+        )
+
+
+def _windows_arch(arch: str) -> str:
+    return "x64" if arch == "x86_64" else "x86" if arch == "i686" else arch
+
+
+@lru_cache(maxsize=None)
+def _backends() -> tuple[Any, Any]:
+    """Import runtime_config on first use; fall back when no checkout exists."""
+    for scripts_dir in (ROSTOC_SCRIPTS_CI, ROSTOC_SCRIPTS_LOCAL):
+        if scripts_dir.exists():
+            if str(scripts_dir) not in sys.path:
+                sys.path.insert(0, str(scripts_dir))
+            runtime_config = importlib.import_module("runtime_config")
+            return runtime_config.ARTIFACT_NAMING, runtime_config.STORAGE_PATHS
+    return _FallbackArtifactNaming, _FallbackStoragePaths
+
+
+def using_fallback() -> bool:
+    return _backends()[0] is _FallbackArtifactNaming
+
+
+@lru_cache(maxsize=None)
+def updater_archive_name(
+    version: str, platform: str, arch: str, channel: str = "stable"
+) -> str:
+    return _backends()[0].get_updater_archive_name(version, platform, arch, channel)
+
+
+@lru_cache(maxsize=None)
+def installer_name(
+    version: str, platform: str, arch: str, channel: str = "stable"
+) -> str:
+    return _backends()[0].get_installer_name(version, platform, arch, channel)
+
+
+@lru_cache(maxsize=None)
+def signature_name(artifact: str) -> str:
+    return _backends()[0].get_signature_name(artifact)
+
+
+@lru_cache(maxsize=None)
+def storage_path(version: str, filename: str, channel: str = "stable") -> str:
+    return _backends()[1].get_storage_path(version, filename, channel)
+
+
+@lru_cache(maxsize=None)
+def cdn_url(version: str, filename: str, cdn_base: str, channel: str = "stable") -> str:
+    return _backends()[1].get_cdn_url(version, filename, cdn_base, channel)
+
+
+@lru_cache(maxsize=None)
+def signature_path(version: str, filename: str, channel: str = "stable") -> str:
+    return _backends()[1].get_signature_path(version, filename, channel)
+
+
+class ARTIFACT_NAMING:
+    """Drop-in for runtime_config.ARTIFACT_NAMING backed by cached lookups."""
+
+    get_updater_archive_name = staticmethod(updater_archive_name)
+    get_installer_name = staticmethod(installer_name)
+    get_signature_name = staticmethod(signature_name)
+
+
+class STORAGE_PATHS:
+    """Drop-in for runtime_config.STORAGE_PATHS backed by cached lookups."""
+
+    get_storage_path = staticmethod(storage_path)
+    get_cdn_url = staticmethod(cdn_url)
+    get_signature_path = staticmethod(signature_path)
+
+
+def measure_import_ms(module: str) -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter, via -X importtime."""
+    # Deferred so importing this module for naming lookups stays cheap
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def check_import_budget(modules: List[str], budget_ms: float) -> Dict[str, float]:
+    timings = {module: measure_import_ms(module) for module in modules}
+    for module, elapsed in timings.items():
+        status = "OK" if elapsed <= budget_ms else "OVER"
+        print(f"[{status}] import {module}: {elapsed:.1f} ms (budget {budget_ms:.0f} ms)")
+    return timings
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check-import-time",
+        action="store_true",
+        help="Measure each CI entry point's import time against the budget",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_IMPORT_BUDGET_MS,
+        help=f"Per-module import budget (default: {DEFAULT_IMPORT_BUDGET_MS:.0f} ms)",
+    )
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=list(ENTRY_POINTS),
+        help="Modules to measure (default: every CI entry point)",
+    )
+    args = parser.parse_args(argv)
+    if not args.check_import_time:
+        parser.print_help()
+        return 1
+
+    timings = check_import_budget(args.modules, args.budget_ms)
+    over = [module for module, elapsed in timings.items() if elapsed > args.budget_ms]
+    if over:
+        print(f"[ERROR] Over import budget: {', '.join(over)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
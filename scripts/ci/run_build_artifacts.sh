@@ -140,7 +140,7 @@ prepare_macos() {
     echo "variant=${variant}"
   } > "../updates/version.txt"
 
-  bash ../.github/scripts/generate-checksums.sh "../updates/macos"
+  python ../scripts/ci/generate_checksums.py "../updates/macos"
 
   {
     echo "tarball_name=$tarball_name"
@@ -192,9 +192,7 @@ upload_macos() {
 
 generate_windows_checksums() {
   echo "[INFO] Generating checksums for Windows MSI files"
-  (cd "../updates/windows" && sha256sum ./*.msi > checksums.txt)
-  echo "[INFO] Checksums generated:"
-  cat "../updates/windows/checksums.txt"
+  python ../scripts/ci/generate_checksums.py "../updates/windows"
 }
 
 upload_windows() {
@@ -295,7 +293,7 @@ prepare_linux() {
   appimage_name="${product_name}-${version}-x86_64.AppImage"
   cp "$appimage" "../updates/linux/$appimage_name"
   cp "$appimage" "../updates/linux/${product_name}-x86_64.AppImage"
-  (cd "../updates/linux" && sha256sum ./*.AppImage > checksums.txt)
+  python ../scripts/ci/generate_checksums.py "../updates/linux"
 
   echo "[INFO] Linux artifacts staged: $appimage_name"
   echo "[INFO] Variant: ${variant}, Product name: ${product_name}"
@@ -1,15 +1,46 @@
 #!/usr/bin/env python3
-"""Send a Discord webhook message for CI notifications."""
+"""Send a Discord webhook message for CI notifications.
+
+Notifications can be sent immediately or queued and coalesced:
+
+    # send one message now
+    send_discord_webhook.py --title "..." --field Name=Value
+
+    # matrix legs: write the payload to a queue directory instead of posting
+    send_discord_webhook.py --queue-dir DIR --title "..." --field Name=Value
+
+    # once per run: merge every queued payload into a single embed and post it
+    send_discord_webhook.py --flush DIR --title "Build failed on {count} legs"
+
+All requests for a run share one keep-alive connection. HTTP 429 responses are
+retried after Discord's Retry-After, the X-RateLimit-* headers are honoured
+before the bucket runs dry, and transient errors back off exponentially.
+"""
 
 from __future__ import annotations
 
 import argparse
+import http.client
 import json
 import os
 import sys
-import urllib.error
-import urllib.request
-from typing import Any
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_ATTEMPTS = 5
+MAX_BACKOFF_SECONDS = 30.0
+MAX_RETRY_AFTER_SECONDS = 120.0
+
+# Discord embed limits: https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+MAX_CONTENT_CHARS = 2000
+MAX_TITLE_CHARS = 256
+MAX_DESCRIPTION_CHARS = 4096
+MAX_FIELDS_PER_EMBED = 25
+MAX_FIELD_NAME_CHARS = 256
+MAX_FIELD_VALUE_CHARS = 1024
+MAX_EMBED_CHARS = 6000
 
 
 def parse_field(value: str) -> dict[str, Any]:
@@ -64,22 +95,246 @@ def build_payload(args: argparse.Namespace) -> dict[str, Any]:
     return payload
 
 
-def post_payload(webhook_url: str, payload: dict[str, Any], timeout_seconds: float) -> None:
-    request = urllib.request.Request(
-        webhook_url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Content-Type": "application/json",
-            "User-Agent": "rostoc-ci",
-        },
-        method="POST",
+def truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+class WebhookError(Exception):
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(f"HTTP {status}: {detail}")
+        self.status = status
+        self.detail = detail
+
+
+class DiscordWebhookClient:
+    """POSTs webhook payloads over one keep-alive connection, honouring rate limits."""
+
+    def __init__(
+        self,
+        webhook_url: str,
+        timeout_seconds: float = 10.0,
+        attempts: int = DEFAULT_ATTEMPTS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        parsed = urllib.parse.urlsplit(webhook_url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("Discord webhook URL must be an http(s) URL")
+        self.scheme = parsed.scheme
+        self.netloc = parsed.netloc
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path += f"?{parsed.query}"
+        self.timeout_seconds = timeout_seconds
+        self.attempts = attempts
+        self.sleep = sleep
+        self.requests = 0
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._bucket_reset_at = 0.0
+
+    def __enter__(self) -> "DiscordWebhookClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            factory = (
+                http.client.HTTPSConnection
+                if self.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            self._connection = factory(self.netloc, timeout=self.timeout_seconds)
+        return self._connection
+
+    def _request(self, body: bytes) -> tuple[int, http.client.HTTPMessage, str]:
+        connection = self._connect()
+        self.requests += 1
+        try:
+            connection.request(
+                "POST",
+                self.path,
+                body=body,
+                headers={"Content-Type": "application/json", "User-Agent": "rostoc-ci"},
+            )
+            response = connection.getresponse()
+            # Read the whole body so the connection can be reused
+            text = response.read().decode("utf-8", errors="replace")
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, response.headers, text
+
+    def _wait_for_bucket(self) -> None:
+        delay = self._bucket_reset_at - time.monotonic()
+        if delay > 0:
+            print(f"[INFO] Discord rate limit bucket empty; waiting {delay:.1f}s")
+            self.sleep(delay)
+
+    def _track_bucket(self, headers: http.client.HTTPMessage) -> None:
+        if headers.get("X-RateLimit-Remaining") == "0":
+            reset_after = _seconds(headers.get("X-RateLimit-Reset-After"))
+            if reset_after is not None:
+                self._bucket_reset_at = time.monotonic() + reset_after
+
+    def post(self, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        for attempt in range(1, self.attempts + 1):
+            self._wait_for_bucket()
+            try:
+                status, headers, text = self._request(body)
+            except (OSError, http.client.HTTPException) as exc:
+                if attempt == self.attempts:
+                    raise
+                delay = backoff_seconds(attempt)
+                print(f"[WARN] Discord webhook failed ({exc}); retrying in {delay:.1f}s")
+                self.sleep(delay)
+                continue
+
+            self._track_bucket(headers)
+            if status < 300:
+                return
+            if status == 429:
+                delay = retry_after_seconds(headers, text, attempt)
+            elif status >= 500:
+                delay = backoff_seconds(attempt)
+            else:
+                raise WebhookError(status, text[:500])
+            if attempt == self.attempts:
+                raise WebhookError(status, text[:500])
+            print(f"[WARN] Discord webhook returned HTTP {status}; retrying in {delay:.1f}s")
+            self.sleep(delay)
+
+
+def _seconds(value: Any) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(attempt: int) -> float:
+    return min(2.0 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+
+
+def retry_after_seconds(headers: http.client.HTTPMessage, text: str, attempt: int) -> float:
+    """Delay for a 429: the JSON body's retry_after is the most precise, then headers."""
+    delay: Optional[float] = None
+    try:
+        body = json.loads(text)
+    except ValueError:
+        body = None
+    if isinstance(body, dict):
+        delay = _seconds(body.get("retry_after"))
+    if delay is None:
+        delay = _seconds(headers.get("Retry-After"))
+    if delay is None:
+        delay = _seconds(headers.get("X-RateLimit-Reset-After"))
+    if delay is None:
+        delay = backoff_seconds(attempt)
+    return min(delay, MAX_RETRY_AFTER_SECONDS)
+
+
+def enqueue_payload(queue_dir: Path, payload: Dict[str, Any]) -> Path:
+    """Write a payload to the queue; the name sorts by time and is unique per process."""
+    queue_dir.mkdir(parents=True, exist_ok=True)
+    path = queue_dir / f"{time.time_ns()}-{os.getpid()}.json"
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(temp_path, path)
+    return path
+
+
+def load_queue(queue_dir: Path) -> List[Dict[str, Any]]:
+    payloads = []
+    for path in sorted(queue_dir.rglob("*.json")):
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            print(f"[WARN] Skipping unreadable queued notification {path}: {exc}")
+            continue
+        if isinstance(payload, dict):
+            payloads.append(payload)
+    return payloads
+
+
+def payload_to_field(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Render one queued notification as a field of the coalesced embed."""
+    embeds = payload.get("embeds") or [{}]
+    embed = embeds[0]
+    name = embed.get("title") or payload.get("content") or "Notification"
+    lines = []
+    if embed.get("description"):
+        lines.append(embed["description"])
+    for field in embed.get("fields") or []:
+        lines.append(f"**{field['name']}**: {field['value']}")
+    return {
+        "name": truncate(name, MAX_FIELD_NAME_CHARS),
+        "value": truncate("\n".join(lines) or "n/a", MAX_FIELD_VALUE_CHARS),
+        "inline": False,
+    }
+
+
+def coalesce(payloads: List[Dict[str, Any]], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Merge queued payloads into one embed, split only where Discord's limits force it."""
+    count = str(len(payloads))
+    title = truncate((args.title or "{count} notifications").replace("{count}", count), 200)
+    description = truncate(
+        (args.description or "").replace("{count}", count), MAX_DESCRIPTION_CHARS
     )
-    with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
-        response.read()
+    color = args.color
+    if color is None:
+        color = next(
+            (e["color"] for p in payloads for e in p.get("embeds") or [] if "color" in e),
+            None,
+        )
 
+    fields = list(args.field or []) + [payload_to_field(p) for p in payloads]
+    chunks: List[List[Dict[str, Any]]] = [[]]
+    size = len(title) + len(description)
+    for field in fields:
+        field_size = len(field["name"]) + len(field["value"])
+        if chunks[-1] and (
+            len(chunks[-1]) == MAX_FIELDS_PER_EMBED or size + field_size > MAX_EMBED_CHARS
+        ):
+            chunks.append([])
+            size = len(title) + len(description)
+        chunks[-1].append(field)
+        size += field_size
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description=__doc__)
+    messages = []
+    for index, chunk in enumerate(chunks):
+        embed: Dict[str, Any] = {
+            "title": title if len(chunks) == 1 else f"{title} ({index + 1}/{len(chunks)})"
+        }
+        if description:
+            embed["description"] = description
+        if color is not None:
+            embed["color"] = color
+        if chunk:
+            embed["fields"] = chunk
+        message: Dict[str, Any] = {"embeds": [embed]}
+        if index == 0 and args.content:
+            message["content"] = truncate(
+                args.content.replace("{count}", count), MAX_CONTENT_CHARS
+            )
+        if args.username:
+            message["username"] = args.username
+        if args.avatar_url:
+            message["avatar_url"] = args.avatar_url
+        messages.append(message)
+    return messages
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
     parser.add_argument("--webhook-url-env", default="DISCORD_WEBHOOK_URL")
     parser.add_argument("--skip-missing", action="store_true")
     parser.add_argument("--label", default="Discord notification")
@@ -91,7 +346,36 @@ def main() -> int:
     parser.add_argument("--username", default="Rostoc CI")
     parser.add_argument("--avatar-url")
     parser.add_argument("--timeout-seconds", type=float, default=10.0)
-    args = parser.parse_args()
+    parser.add_argument("--attempts", type=int, default=DEFAULT_ATTEMPTS)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--queue-dir",
+        type=Path,
+        help="Write the payload to this directory instead of posting it",
+    )
+    mode.add_argument(
+        "--flush",
+        type=Path,
+        metavar="QUEUE_DIR",
+        help="Post every queued payload as one coalesced embed; {count} in "
+        "--title/--content/--description expands to the number queued",
+    )
+    args = parser.parse_args(argv)
+
+    if args.queue_dir:
+        try:
+            path = enqueue_payload(args.queue_dir, build_payload(args))
+        except (OSError, ValueError) as exc:
+            print(f"[ERROR] Could not queue {args.label}: {exc}", file=sys.stderr)
+            return 1
+        print(f"[INFO] Queued {args.label} at {path}")
+        return 0
+
+    if args.flush:
+        payloads = load_queue(args.flush) if args.flush.is_dir() else []
+        if not payloads:
+            print(f"[INFO] No queued notifications in {args.flush}; nothing to send")
+            return 0
 
     webhook_url = os.environ.get(args.webhook_url_env, "").strip()
     if not webhook_url:
@@ -103,22 +387,31 @@ def main() -> int:
         return 1
 
     try:
-        payload = build_payload(args)
-        post_payload(webhook_url, payload, args.timeout_seconds)
-    except urllib.error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")[:500]
+        messages = coalesce(payloads, args) if args.flush else [build_payload(args)]
+        with DiscordWebhookClient(
+            webhook_url, args.timeout_seconds, attempts=args.attempts
+        ) as client:
+            for message in messages:
+                client.post(message)
+    except WebhookError as exc:
         print(
-            f"[ERROR] Discord webhook failed with HTTP {exc.code}: {detail}",
+            f"[ERROR] Discord webhook failed with HTTP {exc.status}: {exc.detail}",
             file=sys.stderr,
         )
         return 1
-    except (OSError, ValueError) as exc:
+    except (OSError, ValueError, http.client.HTTPException) as exc:
         print(f"[ERROR] Discord webhook failed: {exc}", file=sys.stderr)
         return 1
 
-    print(f"[INFO] Sent {args.label}")
+    if args.flush:
+        print(
+            f"[INFO] Sent {args.label}: {len(payloads)} queued notification(s) "
+            f"in {len(messages)} message(s), {client.requests} request(s)"
+        )
+    else:
+        print(f"[INFO] Sent {args.label}")
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main(sys.argv[1:]))
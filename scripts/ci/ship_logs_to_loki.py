@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Stream a build log to Grafana Loki in gzip-compressed, concurrent batches.
+
+The log is read lazily, one line at a time, and cut into batches of at most
+--max-batch-lines lines or --max-batch-bytes bytes of log text. Each batch is
+JSON-encoded with json.dumps (so every line is escaped correctly),
+gzip-compressed and POSTed with ``Content-Encoding: gzip``. Up to --in-flight
+batches are sent at once, each worker reusing its own keep-alive connection.
+
+Lines are run through build_log_parser.BuildLogParser first. Each severity
+(error/warn/info/debug) becomes its own stream via a ``level`` label, a small
+bounded set. The build step and any reported duration are attached as Loki
+structured metadata, so ``{job="build", level="error"} | step="..."`` reads
+only the matching stream. If Loki rejects structured metadata (it is off by
+default before Loki 3.0), the shipper drops it and keeps the level streams.
+--no-structured-metadata skips it up front; --no-structure ships one plain
+stream as before.
+
+Shipping never fails the build: a missing or empty log exits 0, and failed
+batches are retried with backoff, then reported and skipped.
+
+Usage:
+    LOKI_URL=... LOKI_USERNAME=... LOKI_PASSWORD=... \\
+        python ship_logs_to_loki.py <log_file> <labels_json>
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from build_log_parser import BuildLogParser
+
+DEFAULT_MAX_BATCH_LINES = 1000
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024
+DEFAULT_MAX_LINE_LENGTH = 32000
+DEFAULT_IN_FLIGHT = 4
+DEFAULT_ATTEMPTS = 3
+# Other 4xx answers (bad labels, body over the push limit) are permanent
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class Batch:
+    number: int
+    # Stream key (the level, or "" when unstructured) -> Loki value entries
+    streams: Dict[str, List[List[Any]]]
+    lines: int
+    raw_bytes: int
+
+
+@dataclass
+class ShipStats:
+    lines: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    raw_bytes: int = 0
+    sent_bytes: int = 0
+    seconds: float = 0.0
+    levels: Counter = field(default_factory=Counter)
+
+    def describe(self) -> str:
+        rate = self.lines / self.seconds if self.seconds else 0.0
+        mib = self.raw_bytes / (1024 * 1024)
+        ratio = self.raw_bytes / self.sent_bytes if self.sent_bytes else 0.0
+        return (
+            f"{self.lines} line(s) in {self.batches} batch(es) "
+            f"({self.failed_batches} failed), {mib:.1f} MiB in {self.seconds:.1f}s "
+            f"= {rate:.0f} lines/s, {mib / self.seconds if self.seconds else 0:.2f} MiB/s, "
+            f"gzip {ratio:.1f}x"
+            + (
+                " ["
+                + ", ".join(f"{level}: {count}" for level, count in self.levels.items())
+                + "]"
+                if self.levels
+                else ""
+            )
+        )
+
+
+def read_lines(path: Path, max_line_length: int) -> Iterator[str]:
+    with path.open("r", encoding="utf-8", errors="replace", newline="") as handle:
+        for line in handle:
+            line = line.rstrip("\r\n")
+            if len(line) > max_line_length:
+                line = f"{line[:max_line_length]}... [truncated]"
+            yield line
+
+
+def batches(
+    lines: Iterable[str],
+    base_ns: int,
+    max_lines: int,
+    max_bytes: int,
+    parser: BuildLogParser | None = None,
+) -> Iterator[Batch]:
+    """Group lines into batches; timestamps step by 1ns to keep log order."""
+    streams: Dict[str, List[List[Any]]] = {}
+    count = 0
+    size = 0
+    number = 0
+    for offset, line in enumerate(lines):
+        encoded = len(line.encode("utf-8"))
+        if count and (count >= max_lines or size + encoded > max_bytes):
+            number += 1
+            yield Batch(number, streams, count, size)
+            streams, count, size = {}, 0, 0
+        entry: List[Any] = [str(base_ns + offset), line]
+        key = ""
+        if parser is not None:
+            parsed = parser.parse(line)
+            key = parsed.level
+            if parsed.metadata:
+                entry.append(parsed.metadata)
+        streams.setdefault(key, []).append(entry)
+        count += 1
+        size += encoded
+    if count:
+        yield Batch(number + 1, streams, count, size)
+
+
+def encode_push(
+    labels: Dict[str, str],
+    streams: Dict[str, List[List[Any]]],
+    structured_metadata: bool = True,
+) -> bytes:
+    payload = {
+        "streams": [
+            {
+                "stream": {**labels, "level": key} if key else labels,
+                "values": values if structured_metadata else [v[:2] for v in values],
+            }
+            for key, values in streams.items()
+        ]
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    # Level 6 keeps compression off the critical path for multi-MB batches
+    return gzip.compress(body.encode("utf-8"), compresslevel=6)
+
+
+class LokiClient:
+    """POSTs push requests over per-thread keep-alive connections."""
+
+    def __init__(
+        self, url: str, username: str, password: str, timeout_seconds: float = 30.0
+    ) -> None:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"LOKI_URL must be an http(s) URL, got {url!r}")
+        self.scheme = parsed.scheme
+        self.netloc = parsed.netloc.rsplit("@", 1)[-1]
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path += f"?{parsed.query}"
+        self.timeout_seconds = timeout_seconds
+        token = base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")
+        self.headers = {
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+            "Authorization": f"Basic {token}",
+            "User-Agent": "rostoc-ci",
+        }
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            factory = (
+                http.client.HTTPSConnection
+                if self.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            connection = factory(self.netloc, timeout=self.timeout_seconds)
+            self._local.connection = connection
+        return connection
+
+    def push(self, body: bytes) -> tuple[int, str]:
+        """POST one push request; returns the status and (truncated) response body."""
+        connection = self._connection()
+        try:
+            connection.request("POST", self.path, body=body, headers=self.headers)
+            response = connection.getresponse()
+            text = response.read(4096).decode("utf-8", errors="replace")
+        except (OSError, http.client.HTTPException):
+            # Drop the broken connection; the next attempt reconnects
+            connection.close()
+            self._local.connection = None
+            raise
+        if response.will_close:
+            connection.close()
+            self._local.connection = None
+        return response.status, text
+
+
+class LokiShipper:
+    def __init__(
+        self,
+        client: LokiClient,
+        labels: Dict[str, str],
+        in_flight: int = DEFAULT_IN_FLIGHT,
+        attempts: int = DEFAULT_ATTEMPTS,
+        structured_metadata: bool = True,
+    ) -> None:
+        self.client = client
+        self.labels = labels
+        self.structured_metadata = structured_metadata
+        self.in_flight = max(1, in_flight)
+        self.attempts = attempts
+        self.stats = ShipStats()
+        self._lock = threading.Lock()
+
+    def _send(self, batch: Batch) -> bool:
+        error = ""
+        attempt = 0
+        while attempt < self.attempts:
+            attempt += 1
+            with_metadata = self.structured_metadata
+            body = encode_push(self.labels, batch.streams, with_metadata)
+            try:
+                status, text = self.client.push(body)
+            except (OSError, http.client.HTTPException) as err:
+                error = str(err)
+            else:
+                if 200 <= status < 300:
+                    with self._lock:
+                        self.stats.batches += 1
+                        self.stats.sent_bytes += len(body)
+                    return True
+                error = f"HTTP {status}: {text.strip()[:200]}"
+                if with_metadata and status == 400 and "structured metadata" in text:
+                    self._disable_structured_metadata()
+                    attempt -= 1  # Not the batch's fault; resend right away
+                    continue
+                if status not in RETRYABLE_STATUS:
+                    break
+            if attempt < self.attempts:
+                time.sleep(min(2 ** (attempt - 1), 10))
+        print(f"  ❌ Batch {batch.number} failed (non-fatal): {error}", file=sys.stderr)
+        with self._lock:
+            self.stats.failed_batches += 1
+        return False
+
+    def _disable_structured_metadata(self) -> None:
+        with self._lock:
+            if self.structured_metadata:
+                self.structured_metadata = False
+                print(
+                    "  ⚠️  Loki rejected structured metadata; "
+                    "shipping level streams without it",
+                    file=sys.stderr,
+                )
+
+    def ship(self, pending: Iterable[Batch]) -> ShipStats:
+        """Send batches with at most ``in_flight`` outstanding, keeping memory bounded."""
+        started = time.perf_counter()
+        slots = threading.BoundedSemaphore(self.in_flight)
+        with ThreadPoolExecutor(
+            max_workers=self.in_flight, thread_name_prefix="loki-push"
+        ) as executor:
+            for batch in pending:
+                slots.acquire()
+                self.stats.lines += batch.lines
+                self.stats.raw_bytes += batch.raw_bytes
+                for level, values in batch.streams.items():
+                    if level:
+                        self.stats.levels[level] += len(values)
+                future = executor.submit(self._send, batch)
+                future.add_done_callback(lambda _: slots.release())
+        self.stats.seconds = time.perf_counter() - started
+        return self.stats
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log_file", type=Path)
+    parser.add_argument("labels_json", help="Loki stream labels as a JSON object")
+    parser.add_argument(
+        "--max-batch-lines",
+        type=int,
+        default=int(os.environ.get("MAX_BATCH_LINES", DEFAULT_MAX_BATCH_LINES)),
+    )
+    parser.add_argument(
+        "--max-batch-bytes",
+        type=int,
+        default=int(os.environ.get("MAX_BATCH_BYTES", DEFAULT_MAX_BATCH_BYTES)),
+    )
+    parser.add_argument(
+        "--max-line-length",
+        type=int,
+        default=int(os.environ.get("MAX_LINE_LENGTH", DEFAULT_MAX_LINE_LENGTH)),
+    )
+    parser.add_argument(
+        "--in-flight",
+        type=int,
+        default=int(os.environ.get("LOKI_IN_FLIGHT", DEFAULT_IN_FLIGHT)),
+        help="Concurrent push requests",
+    )
+    parser.add_argument(
+        "--no-structure",
+        action="store_true",
+        help="Ship one plain stream without level streams or metadata",
+    )
+    parser.add_argument(
+        "--no-structured-metadata",
+        action="store_true",
+        default=os.environ.get("LOKI_STRUCTURED_METADATA", "1") == "0",
+        help="Keep level streams but omit step/duration metadata",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+
+    missing = [
+        name
+        for name in ("LOKI_URL", "LOKI_USERNAME", "LOKI_PASSWORD")
+        if not os.environ.get(name)
+    ]
+    if missing:
+        print(f"[ERROR] {', '.join(missing)} must be set", file=sys.stderr)
+        return 1
+    try:
+        labels = json.loads(args.labels_json)
+    except json.JSONDecodeError as err:
+        print(f"[ERROR] Labels must be a JSON object: {err}", file=sys.stderr)
+        return 1
+    if not isinstance(labels, dict):
+        print("[ERROR] Labels must be a JSON object", file=sys.stderr)
+        return 1
+    labels = {str(key): str(value) for key, value in labels.items()}
+
+    if not args.log_file.is_file():
+        print(f"⚠️  Log file not found: {args.log_file}", file=sys.stderr)
+        return 0  # Don't fail the build for missing logs
+    if args.log_file.stat().st_size == 0:
+        print(f"⚠️  Log file is empty: {args.log_file}", file=sys.stderr)
+        return 0
+
+    client = LokiClient(
+        os.environ["LOKI_URL"], os.environ["LOKI_USERNAME"], os.environ["LOKI_PASSWORD"]
+    )
+    shipper = LokiShipper(
+        client,
+        labels,
+        in_flight=args.in_flight,
+        structured_metadata=not args.no_structured_metadata,
+    )
+    print(f"📤 Shipping {args.log_file} to Loki ({shipper.in_flight} request(s) in flight)...")
+    stats = shipper.ship(
+        batches(
+            read_lines(args.log_file, args.max_line_length),
+            base_ns=time.time_ns(),
+            max_lines=max(1, args.max_batch_lines),
+            max_bytes=max(1, args.max_batch_bytes),
+            parser=None if args.no_structure else BuildLogParser(),
+        )
+    )
+    print(f"✅ Logs shipped to Loki: {stats.describe()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
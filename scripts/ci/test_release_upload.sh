@@ -0,0 +1,219 @@
+#!/usr/bin/env bash
+# Test upload_release_assets.py against a local S3 stand-in (moto server)
+# Usage: ./scripts/ci/test_release_upload.sh
+#
+# Covers single PUTs, parallel multipart parts, --checksums, resuming a
+# recorded upload and aborting one that can no longer be resumed. Nothing
+# talks to Spaces. Needs botocore and moto[server]; when the current Python
+# lacks them they are installed into a throwaway venv under $TEST_WORKSPACE.
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TEST_WORKSPACE="${TEST_WORKSPACE:-/tmp/ci-test-workspace}/release-upload"
+MOTO_PORT="${MOTO_PORT:-5123}"
+PYTHON_BIN="$(command -v python3 || command -v python)"
+
+echo "🧪 Testing upload_release_assets.py against moto..."
+
+mkdir -p "$TEST_WORKSPACE"
+if ! "$PYTHON_BIN" -c "import botocore, moto.server" >/dev/null 2>&1; then
+  echo "ℹ️  Installing botocore and moto[server] into ${TEST_WORKSPACE}/venv"
+  "$PYTHON_BIN" -m venv "${TEST_WORKSPACE}/venv"
+  "${TEST_WORKSPACE}/venv/bin/python" -m pip install --quiet botocore "moto[server]"
+  PYTHON_BIN="${TEST_WORKSPACE}/venv/bin/python"
+fi
+
+WORK_DIR="${TEST_WORKSPACE}/work"
+rm -rf "$WORK_DIR"
+mkdir -p "$WORK_DIR"
+
+"$PYTHON_BIN" -m moto.server -p "$MOTO_PORT" > "${WORK_DIR}/moto.log" 2>&1 &
+MOTO_PID=$!
+trap 'kill "$MOTO_PID" 2>/dev/null || true' EXIT
+
+export AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test AWS_DEFAULT_REGION=us-east-1
+export AWS_ENDPOINT_URL="http://127.0.0.1:${MOTO_PORT}"
+unset SPACES_ENDPOINT
+
+"$PYTHON_BIN" - "$SCRIPT_DIR" "$WORK_DIR" <<'EOF'
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[1])
+import upload_release_assets as uploader  # noqa: E402
+
+work = Path(sys.argv[2])
+endpoint = os.environ["AWS_ENDPOINT_URL"]
+bucket = "rostoc-release-test"
+MiB = 1024 * 1024
+small_args = ["--multipart-threshold-mb", "8", "--part-size-mb", "5"]
+
+for _ in range(50):
+    try:
+        urllib.request.urlopen(endpoint, timeout=1)
+        break
+    except OSError:
+        time.sleep(0.2)
+else:
+    raise SystemExit(f"❌ moto server did not start at {endpoint}")
+
+client = uploader.create_client(endpoint, "us-east-1", 4)
+client.create_bucket(Bucket=bucket)
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise SystemExit(f"❌ {message}")
+    print(f"✅ {message}")
+
+
+def stored(key: str) -> bytes:
+    return client.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+
+def run(*args: str) -> int:
+    print(f"ℹ️  upload_release_assets.py {' '.join(args)}")
+    return uploader.main([*args, "--bucket", bucket, "--endpoint-url", endpoint, *small_args])
+
+
+def open_uploads(key: str) -> list:
+    listing = client.list_multipart_uploads(Bucket=bucket)
+    return [upload for upload in listing.get("Uploads", []) if upload["Key"] == key]
+
+
+artifacts = work / "artifacts"
+artifacts.mkdir()
+(artifacts / "manifest.json").write_bytes(b'{"chunks": []}\n' * 100)
+(artifacts / "Rostoc.app.tar.gz").write_bytes(os.urandom(13 * MiB))
+(artifacts / "Rostoc.dmg").write_bytes(os.urandom(11 * MiB))
+(artifacts / "Rostoc.dmg.sig").write_text("signature\n", encoding="utf-8")
+
+# --uploads: the list build_backend_payload.py --uploads-output writes
+uploads = work / "publish-uploads.json"
+uploads.write_text(
+    json.dumps(
+        [
+            {
+                "path": str(artifacts / "manifest.json"),
+                "spaces_path": "releases/v1.2.3/manifest.json",
+                "content_type": "application/json",
+            },
+            {
+                "path": str(artifacts / "Rostoc.app.tar.gz"),
+                "spaces_path": "releases/v1.2.3/Rostoc.app.tar.gz",
+                "content_type": "application/gzip",
+            },
+        ]
+    ),
+    encoding="utf-8",
+)
+check(run("--uploads", str(uploads)) == 0, "--uploads run succeeded")
+for entry in json.loads(uploads.read_text(encoding="utf-8")):
+    check(
+        stored(entry["spaces_path"]) == Path(entry["path"]).read_bytes(),
+        f"{entry['spaces_path']} matches its source",
+    )
+head = client.head_object(Bucket=bucket, Key="releases/v1.2.3/manifest.json")
+check(head["ContentType"] == "application/json", "content type is kept")
+
+# --payload with --checksums: SHA256 checksum headers, multipart included
+dmg = artifacts / "Rostoc.dmg"
+payload = work / "publish-payload.json"
+payload.write_text(
+    json.dumps(
+        {
+            "assets": [
+                {
+                    "spaces_path": "releases/v1.2.3/Rostoc.dmg",
+                    "signature_path": "releases/v1.2.3/Rostoc.dmg.sig",
+                    "checksum_sha256": hashlib.sha256(dmg.read_bytes()).hexdigest(),
+                    "mime_type": "application/x-apple-diskimage",
+                }
+            ]
+        }
+    ),
+    encoding="utf-8",
+)
+check(
+    run("--payload", str(payload), "--root", str(artifacts), "--checksums") == 0,
+    "--payload --checksums run succeeded",
+)
+check(stored("releases/v1.2.3/Rostoc.dmg") == dmg.read_bytes(), "multipart DMG matches")
+check(stored("releases/v1.2.3/Rostoc.dmg.sig") == b"signature\n", "signature uploaded")
+
+# Resume: a recorded upload with one part done is completed, not restarted
+archive = artifacts / "Rostoc.app.tar.gz"
+data = archive.read_bytes()
+checksum = hashlib.sha256(data).hexdigest()
+key = "releases/v1.2.4/Rostoc.app.tar.gz"
+upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+part = client.upload_part(
+    Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=1, Body=data[: 5 * MiB]
+)
+state = work / "upload-state.json"
+state.write_text(
+    json.dumps(
+        {
+            "version": 1,
+            "objects": {},
+            "multipart": {
+                key: {
+                    "upload_id": upload_id,
+                    "checksum_sha256": checksum,
+                    "part_size": 5 * MiB,
+                    "parts": {"1": {"ETag": part["ETag"]}},
+                }
+            },
+        }
+    ),
+    encoding="utf-8",
+)
+resume_uploads = work / "resume-uploads.json"
+resume_uploads.write_text(
+    json.dumps([{"path": str(archive), "spaces_path": key, "content_type": ""}]),
+    encoding="utf-8",
+)
+check(run("--uploads", str(resume_uploads), "--state", str(state)) == 0, "resumed run succeeded")
+check(stored(key) == data, "resumed object matches its source")
+check(not open_uploads(key), "resumed upload is closed")
+
+# A recorded upload for another part size cannot be resumed and is aborted
+key = "releases/v1.2.5/Rostoc.app.tar.gz"
+stale_id = client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+state.write_text(
+    json.dumps(
+        {
+            "version": 1,
+            "objects": {},
+            "multipart": {
+                key: {
+                    "upload_id": stale_id,
+                    "checksum_sha256": checksum,
+                    "part_size": 6 * MiB,
+                    "parts": {},
+                }
+            },
+        }
+    ),
+    encoding="utf-8",
+)
+resume_uploads.write_text(
+    json.dumps([{"path": str(archive), "spaces_path": key, "content_type": ""}]),
+    encoding="utf-8",
+)
+check(run("--uploads", str(resume_uploads), "--state", str(state)) == 0, "restarted run succeeded")
+check(stored(key) == data, "restarted object matches its source")
+check(not open_uploads(key), "stale upload was aborted")
+
+# Rerun: finished objects are skipped
+check(run("--uploads", str(resume_uploads), "--state", str(state)) == 0, "rerun succeeded")
+EOF
+
+echo ""
+echo "✅ upload_release_assets.py works against the S3 stand-in"
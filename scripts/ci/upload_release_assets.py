@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""Upload every asset in publish-payload.json to S3-compatible storage in parallel.
+
+Objects go to the keys the payload already carries (each asset's spaces_path,
+its signature_path and any chunk manifest), so naming stays with
+STORAGE_PATHS. Local files are found by name under the --root directories.
+--uploads takes the list build_backend_payload.py --uploads-output writes
+instead (the chunk manifests and delta patches publish.yml uploads).
+
+    small files   one PUT with Content-MD5, so the server rejects corrupted
+                  bodies
+    large files   multipart upload; parts are read at their own offsets and
+                  sent concurrently, each with its own Content-MD5
+
+Content-MD5 is the default because DigitalOcean Spaces, the store these
+releases go to, does not document support for the x-amz-checksum-* headers.
+--checksums sends x-amz-checksum-sha256 (whole object for single PUTs, per
+part for multipart) instead, on stores known to accept them; the stored
+checksum then lets verify_s3_upload.py compare without downloading.
+
+All PUTs and parts of all files share one worker pool, so a large DMG never
+blocks the MSI or AppImage behind it. Failed requests are retried with
+exponential backoff on top of botocore's own retries. With --state, completed
+parts and objects are recorded as they finish; rerunning after an
+interruption reuses the open multipart uploads and skips finished objects.
+A recorded upload that can no longer be resumed (the file or part size
+changed) is aborted, as is any failed upload when there is no --state to
+resume it from, so no orphaned parts are left behind.
+
+scripts/ci/test_release_upload.sh runs this against a local moto server.
+
+Usage:
+    python upload_release_assets.py --payload publish-payload.json --bucket BUCKET \\
+        --root macos-artifacts --root windows-artifacts [--state upload-state.json]
+    python upload_release_assets.py --uploads publish-uploads.json --bucket BUCKET
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, TypeVar
+
+from artifact_hashing import inspect_file
+from artifact_index import ArtifactIndex
+
+try:
+    import botocore.session
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    botocore = None
+
+MiB = 1024 * 1024
+DEFAULT_MULTIPART_THRESHOLD = 32 * MiB
+DEFAULT_PART_SIZE = 16 * MiB
+# S3 minimum part size (all but the last part) and maximum part count
+MIN_PART_SIZE = 5 * MiB
+MAX_PARTS = 10_000
+# Network-bound, so more workers than cores pays off
+DEFAULT_WORKERS = 8
+DEFAULT_ATTEMPTS = 4
+
+T = TypeVar("T")
+
+
+@dataclass
+class UploadTarget:
+    key: str
+    source: Path
+    size_bytes: int
+    checksum_sha256: str = ""
+    content_type: str = ""
+
+
+def b64_digest(algorithm: str, data: bytes) -> str:
+    return base64.b64encode(hashlib.new(algorithm, data).digest()).decode("ascii")
+
+
+def hex_to_b64(digest: str) -> str:
+    return base64.b64encode(bytes.fromhex(digest)).decode("ascii")
+
+
+def part_size_for(size: int, preferred: int) -> int:
+    """Smallest part size >= ``preferred`` that keeps the part count under S3's cap."""
+    part_size = max(preferred, MIN_PART_SIZE)
+    while -(-size // part_size) > MAX_PARTS:
+        part_size *= 2
+    return part_size
+
+
+def with_retries(
+    action: Callable[[], T], label: str, attempts: int = DEFAULT_ATTEMPTS
+) -> T:
+    for attempt in range(1, attempts + 1):
+        try:
+            return action()
+        except (BotoCoreError, ClientError, OSError) as err:
+            if attempt == attempts:
+                raise
+            delay = min(2 ** (attempt - 1), 30)
+            print(f"[WARN] {label} failed ({err}); retry {attempt}/{attempts - 1} in {delay}s")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def targets_from_payload(
+    payload: Dict[str, Any], roots: List[ArtifactIndex]
+) -> tuple[List[UploadTarget], List[str]]:
+    """Map every key in the payload to a local file; returns (targets, missing keys)."""
+    wanted: Dict[str, Dict[str, str]] = {}
+    for asset in payload.get("assets") or []:
+        if asset.get("spaces_path"):
+            checksum = asset.get("checksum_sha256")
+            wanted.setdefault(
+                asset["spaces_path"],
+                {
+                    "checksum_sha256": checksum if isinstance(checksum, str) else "",
+                    "content_type": asset.get("mime_type") or "",
+                },
+            )
+        if asset.get("signature_path"):
+            wanted.setdefault(asset["signature_path"], {})
+        manifest = (asset.get("extra") or {}).get("chunk_manifest")
+        if isinstance(manifest, dict) and manifest.get("spaces_path"):
+            wanted.setdefault(
+                manifest["spaces_path"],
+                {
+                    "checksum_sha256": manifest.get("checksum_sha256") or "",
+                    "content_type": "application/json",
+                },
+            )
+
+    targets: List[UploadTarget] = []
+    missing: List[str] = []
+    for key, info in wanted.items():
+        name = key.rsplit("/", 1)[-1]
+        source = next(
+            (found for index in roots if (found := index.find(name)) is not None), None
+        )
+        if source is None:
+            missing.append(key)
+            continue
+        targets.append(
+            UploadTarget(
+                key=key,
+                source=source,
+                size_bytes=source.stat().st_size,
+                checksum_sha256=info.get("checksum_sha256", ""),
+                content_type=info.get("content_type", ""),
+            )
+        )
+    return targets, missing
+
+
+def targets_from_uploads(entries: List[Dict[str, str]]) -> tuple[List[UploadTarget], List[str]]:
+    """Targets for an --uploads-output list; returns (targets, missing paths)."""
+    targets: List[UploadTarget] = []
+    missing: List[str] = []
+    for entry in entries:
+        source = Path(entry["path"])
+        if not source.is_file():
+            missing.append(entry["path"])
+            continue
+        targets.append(
+            UploadTarget(
+                key=entry["spaces_path"],
+                source=source,
+                size_bytes=source.stat().st_size,
+                content_type=entry.get("content_type") or "",
+            )
+        )
+    return targets, missing
+
+
+class UploadState:
+    """Resume file: open multipart uploads with their finished parts, and done objects."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.data: Dict[str, Any] = {"version": 1, "objects": {}, "multipart": {}}
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as err:
+                print(f"[WARN] Ignoring unreadable state file {path}: {err}")
+            else:
+                if loaded.get("version") == 1:
+                    self.data = loaded
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def completed(self, target: UploadTarget) -> bool:
+        with self._lock:
+            return self.data["objects"].get(target.key) == target.checksum_sha256
+
+    def recorded_multipart(self, target: UploadTarget) -> Dict[str, Any] | None:
+        with self._lock:
+            return self.data["multipart"].get(target.key)
+
+    def multipart(self, target: UploadTarget, part_size: int) -> Dict[str, Any] | None:
+        """The recorded upload for ``target`` if it can be resumed with ``part_size``."""
+        entry = self.recorded_multipart(target)
+        if (
+            entry
+            and entry.get("checksum_sha256") == target.checksum_sha256
+            and entry.get("part_size") == part_size
+        ):
+            return entry
+        return None
+
+    def start_multipart(
+        self, target: UploadTarget, upload_id: str, part_size: int
+    ) -> Dict[str, Any]:
+        entry = {
+            "upload_id": upload_id,
+            "checksum_sha256": target.checksum_sha256,
+            "part_size": part_size,
+            "parts": {},
+        }
+        with self._lock:
+            self.data["multipart"][target.key] = entry
+            self._save()
+        return entry
+
+    def record_part(self, target: UploadTarget, number: int, part: Dict[str, str]) -> None:
+        with self._lock:
+            self.data["multipart"][target.key]["parts"][str(number)] = part
+            self._save()
+
+    def drop_multipart(self, target: UploadTarget) -> None:
+        with self._lock:
+            if self.data["multipart"].pop(target.key, None) is not None:
+                self._save()
+
+    def finish(self, target: UploadTarget) -> None:
+        with self._lock:
+            self.data["multipart"].pop(target.key, None)
+            self.data["objects"][target.key] = target.checksum_sha256
+            self._save()
+
+
+class ReleaseUploader:
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        part_size: int = DEFAULT_PART_SIZE,
+        acl: str = "",
+        checksums: bool = False,
+        state: UploadState | None = None,
+    ) -> None:
+        self.client = client
+        self.checksums = checksums
+        self.bucket = bucket
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.acl = acl
+        self.state = state or UploadState(None)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="release-upload"
+        )
+
+    def upload_all(self, targets: List[UploadTarget]) -> List[str]:
+        """Upload every target; returns the keys that failed."""
+        pending: List[tuple[UploadTarget, Callable[[], None]]] = []
+        for target in targets:
+            if not target.checksum_sha256:
+                target.checksum_sha256 = inspect_file(target.source).sha256
+            if self.state.completed(target):
+                print(f"[INFO] Skipping {target.key}: already uploaded")
+                continue
+            try:
+                if target.size_bytes < self.multipart_threshold:
+                    future = self._executor.submit(self._put, target)
+                    pending.append((target, future.result))
+                else:
+                    pending.append((target, self._start_multipart(target)))
+            except (BotoCoreError, ClientError, OSError) as err:
+                print(f"[ERROR] ❌ {target.key}: {err}", file=sys.stderr)
+                pending.append((target, None))
+
+        failed: List[str] = []
+        for target, wait in pending:
+            try:
+                if wait is None:
+                    raise RuntimeError("upload could not be started")
+                wait()
+            except (BotoCoreError, ClientError, OSError, RuntimeError) as err:
+                print(f"[ERROR] ❌ {target.key}: {err}", file=sys.stderr)
+                failed.append(target.key)
+                if self.state.path is None:
+                    # Nothing can resume it, so its parts would only be billed
+                    self._abort_recorded(target)
+                continue
+            self.state.finish(target)
+            print(f"[INFO] ✅ {target.key} ({target.size_bytes} bytes)")
+        return failed
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _object_args(self, target: UploadTarget) -> Dict[str, str]:
+        extra = {"Bucket": self.bucket, "Key": target.key}
+        if self.acl:
+            extra["ACL"] = self.acl
+        if target.content_type:
+            extra["ContentType"] = target.content_type
+        return extra
+
+    def _integrity_args(self, data: bytes | None, sha256_hex: str = "") -> Dict[str, str]:
+        """Content-MD5 by default, or SHA256 checksum headers with --checksums."""
+        if not self.checksums:
+            return {"ContentMD5": b64_digest("md5", data)} if data is not None else {}
+        checksum = hex_to_b64(sha256_hex) if sha256_hex else b64_digest("sha256", data)
+        return {"ChecksumAlgorithm": "SHA256", "ChecksumSHA256": checksum}
+
+    def _put(self, target: UploadTarget) -> None:
+        def put() -> None:
+            # Small by definition (below the multipart threshold)
+            data = target.source.read_bytes()
+            if self.checksums and len(data) != target.size_bytes:
+                raise OSError(f"{target.source} changed size while uploading")
+            self.client.put_object(
+                **self._object_args(target),
+                Body=data,
+                **self._integrity_args(data, target.checksum_sha256),
+            )
+
+        with_retries(put, f"PUT {target.key}")
+
+    def _start_multipart(self, target: UploadTarget) -> Callable[[], None]:
+        """Queue every missing part now; the returned callable completes the upload."""
+        part_size = part_size_for(target.size_bytes, self.part_size)
+        count = -(-target.size_bytes // part_size)
+        entry = self.state.multipart(target, part_size)
+        if entry is None:
+            # A recorded upload for other content or another part size can
+            # never be completed; abort it rather than leave its parts stored
+            self._abort_recorded(target)
+        elif not self._upload_still_open(target, entry):
+            entry = None
+        if entry is None:
+            response = with_retries(
+                lambda: self.client.create_multipart_upload(
+                    **self._object_args(target),
+                    **({"ChecksumAlgorithm": "SHA256"} if self.checksums else {}),
+                ),
+                f"create upload {target.key}",
+            )
+            entry = self.state.start_multipart(target, response["UploadId"], part_size)
+        else:
+            print(
+                f"[INFO] Resuming {target.key}: "
+                f"{len(entry['parts'])}/{count} part(s) already uploaded"
+            )
+
+        futures: Dict[int, Future[Dict[str, str]]] = {
+            number: self._executor.submit(
+                self._upload_part, target, entry["upload_id"], number, part_size
+            )
+            for number in range(1, count + 1)
+            if str(number) not in entry["parts"]
+        }
+
+        def complete() -> None:
+            for future in futures.values():
+                future.result()
+            parts = [
+                {"PartNumber": int(number), **part}
+                for number, part in sorted(
+                    entry["parts"].items(), key=lambda item: int(item[0])
+                )
+            ]
+            with_retries(
+                lambda: self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=target.key,
+                    UploadId=entry["upload_id"],
+                    MultipartUpload={"Parts": parts},
+                ),
+                f"complete upload {target.key}",
+            )
+
+        return complete
+
+    def _abort_recorded(self, target: UploadTarget) -> None:
+        """Abort the multipart upload recorded for ``target``, if any (best effort)."""
+        entry = self.state.recorded_multipart(target)
+        if entry is None:
+            return
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=target.key, UploadId=entry["upload_id"]
+            )
+            print(f"[INFO] Aborted stale upload {entry['upload_id']} of {target.key}")
+        except (BotoCoreError, ClientError) as err:
+            # Already completed, aborted or expired; the bucket's lifecycle
+            # rule is the backstop for anything else
+            print(f"[WARN] Could not abort upload of {target.key}: {err}")
+        self.state.drop_multipart(target)
+
+    def _upload_still_open(self, target: UploadTarget, entry: Dict[str, Any]) -> bool:
+        try:
+            self.client.list_parts(
+                Bucket=self.bucket, Key=target.key, UploadId=entry["upload_id"]
+            )
+        except ClientError:
+            print(f"[WARN] Upload for {target.key} expired; starting over")
+            return False
+        return True
+
+    def _upload_part(
+        self, target: UploadTarget, upload_id: str, number: int, part_size: int
+    ) -> Dict[str, str]:
+        offset = (number - 1) * part_size
+        length = min(part_size, target.size_bytes - offset)
+        # Each part opens its own handle so workers never share a file offset
+        with target.source.open("rb") as handle:
+            handle.seek(offset)
+            data = handle.read(length)
+        if len(data) != length:
+            raise OSError(f"{target.source} changed size while uploading")
+        integrity = self._integrity_args(data)
+
+        response = with_retries(
+            lambda: self.client.upload_part(
+                Bucket=self.bucket,
+                Key=target.key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=data,
+                **integrity,
+            ),
+            f"part {number} of {target.key}",
+        )
+        part = {"ETag": response["ETag"]}
+        if "ChecksumSHA256" in integrity:
+            part["ChecksumSHA256"] = integrity["ChecksumSHA256"]
+        # Recorded as each part lands so an interrupted run resumes from here
+        self.state.record_part(target, number, part)
+        return part
+
+
+def create_client(endpoint_url: str | None, region: str, workers: int) -> Any:
+    options: Dict[str, Any] = {
+        "max_pool_connections": workers,
+        "retries": {"max_attempts": 5, "mode": "standard"},
+    }
+    # botocore 1.36+ adds CRC checksum headers to every upload unless told
+    # otherwise; keep them to the ones _integrity_args asks for
+    if "request_checksum_calculation" in Config.OPTION_DEFAULTS:
+        options["request_checksum_calculation"] = "when_required"
+    session = botocore.session.get_session()
+    return session.create_client(
+        "s3",
+        endpoint_url=endpoint_url or None,
+        region_name=region,
+        config=Config(**options),
+    )
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--payload", type=Path, help="publish-payload.json to upload")
+    source.add_argument(
+        "--uploads",
+        type=Path,
+        help="build_backend_payload.py --uploads-output list to upload",
+    )
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument(
+        "--root",
+        type=Path,
+        action="append",
+        default=[],
+        help="Directory searched (recursively) for payload files; repeatable",
+    )
+    parser.add_argument("--state", type=Path, help="Resume file for interrupted uploads")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument(
+        "--multipart-threshold-mb",
+        type=int,
+        default=DEFAULT_MULTIPART_THRESHOLD // MiB,
+    )
+    parser.add_argument("--part-size-mb", type=int, default=DEFAULT_PART_SIZE // MiB)
+    parser.add_argument("--acl", default="public-read", help="Canned ACL ('' for none)")
+    parser.add_argument(
+        "--checksums",
+        action="store_true",
+        help="Send x-amz-checksum-sha256 instead of Content-MD5 (stores that accept them)",
+    )
+    parser.add_argument(
+        "--endpoint-url",
+        default=os.environ.get("SPACES_ENDPOINT") or os.environ.get("AWS_ENDPOINT_URL"),
+    )
+    parser.add_argument(
+        "--region", default=os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
+    )
+    args = parser.parse_args(argv)
+    if args.payload and not args.root:
+        parser.error("--root is required with --payload")
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    if botocore is None:
+        print("[ERROR] botocore is required (pip install botocore)", file=sys.stderr)
+        return 1
+
+    if args.uploads:
+        entries = json.loads(args.uploads.read_text(encoding="utf-8"))
+        targets, missing = targets_from_uploads(entries)
+        for path in missing:
+            print(f"[ERROR] {path} listed in {args.uploads} does not exist")
+    else:
+        payload = json.loads(args.payload.read_text(encoding="utf-8"))
+        indexes = [ArtifactIndex(root) for root in args.root]
+        targets, missing = targets_from_payload(payload, indexes)
+        for key in missing:
+            print(f"[ERROR] No local file for {key} under {', '.join(map(str, args.root))}")
+    if missing:
+        return 1
+
+    workers = max(1, args.workers)
+    uploader = ReleaseUploader(
+        create_client(args.endpoint_url, args.region, workers),
+        args.bucket,
+        workers=workers,
+        multipart_threshold=args.multipart_threshold_mb * MiB,
+        part_size=args.part_size_mb * MiB,
+        acl=args.acl,
+        checksums=args.checksums,
+        state=UploadState(args.state),
+    )
+    total = sum(target.size_bytes for target in targets)
+    print(
+        f"[INFO] Uploading {len(targets)} object(s), {total / MiB:.1f} MiB, "
+        f"with {workers} worker(s) to s3://{args.bucket}/"
+    )
+    started = time.perf_counter()
+    try:
+        failed = uploader.upload_all(targets)
+    finally:
+        uploader.shutdown()
+
+    elapsed = time.perf_counter() - started
+    if failed:
+        print(f"[ERROR] {len(failed)} of {len(targets)} upload(s) failed", file=sys.stderr)
+        return 1
+    print(f"[INFO] Uploaded {len(targets)} object(s) in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
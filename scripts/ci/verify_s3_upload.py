@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""Verify uploaded release artifacts in S3-compatible storage without local copies.
+
+Replaces the download-then-hash loop of .github/scripts/verify-s3-upload.sh,
+which keeps that loop only as its fallback when botocore is not installed.
+Objects are checked concurrently over one pooled client, and nothing is
+written to disk:
+
+    auto    HEAD with checksum mode enabled; a stored full-object
+            x-amz-checksum-sha256 is compared directly, anything else is
+            streamed through sha256 (default)
+    full    always stream the whole object through sha256
+    sample  ranged GETs of --samples blocks (always the first and last),
+            compared with the block hashes from --inspections; objects without
+            block hashes are streamed in full. Cheaper, but probabilistic.
+
+Every mode also checks the object size when the expected size is known.
+With --state, verified objects are recorded with their ETag and skipped on
+the next run while both the ETag and expected checksum are unchanged, so an
+interrupted verification resumes instead of starting over.
+
+Usage:
+    python verify_s3_upload.py --payload publish-payload.json --bucket BUCKET \\
+        [--inspections inspections.json] [--mode auto|full|sample]
+    python verify_s3_upload.py --object s3://bucket/key <sha256> [--object ...]
+
+Requires botocore (installed alongside the pip awscli); credentials and the
+endpoint come from the usual AWS_* variables or --endpoint-url.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from artifact_hashing import DEFAULT_BUFFER_SIZE
+
+try:
+    import botocore.session
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    botocore = None
+
+MODES = ("auto", "full", "sample")
+DEFAULT_SAMPLES = 8
+# Network-bound, so more workers than cores pays off
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class VerifyTarget:
+    bucket: str
+    key: str
+    checksum_sha256: str
+    size_bytes: int | None = None
+    block_size: int = 0
+    block_hashes: List[str] = field(default_factory=list)
+
+    @property
+    def url(self) -> str:
+        return f"s3://{self.bucket}/{self.key}"
+
+
+@dataclass
+class VerifyResult:
+    target: VerifyTarget
+    ok: bool
+    method: str
+    detail: str
+    etag: str = ""
+
+
+def parse_s3_url(url: str) -> tuple[str, str]:
+    if not url.startswith("s3://") or "/" not in url[5:]:
+        raise ValueError(f"expected s3://bucket/key, got {url!r}")
+    bucket, key = url[5:].split("/", 1)
+    return bucket, key
+
+
+def targets_from_payload(
+    payload: Dict[str, Any], bucket: str, inspections: Dict[str, Any]
+) -> List[VerifyTarget]:
+    """One target per distinct spaces_path (the Windows MSI is listed twice)."""
+    targets: Dict[str, VerifyTarget] = {}
+    for asset in payload.get("assets") or []:
+        key = asset.get("spaces_path")
+        checksum = asset.get("checksum_sha256")
+        if not key or not isinstance(checksum, str) or key in targets:
+            continue
+        inspection = inspections.get(key) or {}
+        targets[key] = VerifyTarget(
+            bucket=bucket,
+            key=key,
+            checksum_sha256=checksum,
+            size_bytes=asset.get("size_bytes"),
+            block_size=int(inspection.get("block_size") or 0),
+            block_hashes=list(inspection.get("block_hashes") or []),
+        )
+    return list(targets.values())
+
+
+class VerifyState:
+    """JSON record of verified objects, rewritten after every success."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._entries: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as err:
+                print(f"[WARN] Ignoring unreadable state file {path}: {err}")
+            else:
+                if data.get("version") == 1:
+                    self._entries = dict(data.get("verified") or {})
+
+    def is_verified(self, target: VerifyTarget, etag: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(target.url)
+        return bool(
+            entry
+            and entry.get("etag") == etag
+            and entry.get("checksum_sha256") == target.checksum_sha256
+        )
+
+    def record(self, target: VerifyTarget, etag: str) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self._entries[target.url] = {
+                "etag": etag,
+                "checksum_sha256": target.checksum_sha256,
+            }
+            payload = json.dumps({"version": 1, "verified": self._entries}, indent=2)
+            # Write-then-rename so an interrupted run never leaves a torn file
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+
+class S3Verifier:
+    def __init__(
+        self,
+        client: Any,
+        mode: str = "auto",
+        samples: int = DEFAULT_SAMPLES,
+        state: VerifyState | None = None,
+    ) -> None:
+        self.client = client
+        self.mode = mode
+        self.samples = samples
+        self.state = state or VerifyState(None)
+
+    def verify(self, target: VerifyTarget) -> VerifyResult:
+        try:
+            return self._verify(target)
+        except (BotoCoreError, ClientError, OSError) as err:
+            return VerifyResult(target, False, "error", str(err))
+
+    def _verify(self, target: VerifyTarget) -> VerifyResult:
+        head = self.client.head_object(
+            Bucket=target.bucket, Key=target.key, ChecksumMode="ENABLED"
+        )
+        etag = head.get("ETag", "").strip('"')
+        size = int(head.get("ContentLength", -1))
+        if target.size_bytes is not None and size != target.size_bytes:
+            return VerifyResult(
+                target,
+                False,
+                "size",
+                f"size mismatch: expected {target.size_bytes}, got {size}",
+                etag,
+            )
+        if self.state.is_verified(target, etag):
+            return VerifyResult(target, True, "resumed", "unchanged since last run", etag)
+
+        result = None
+        if self.mode == "auto":
+            result = self._check_stored_checksum(target, head)
+        elif self.mode == "sample" and target.block_size and target.block_hashes:
+            result = self._sample_blocks(target, size)
+        if result is None:
+            result = self._stream(target)
+        result.etag = etag
+        # Samples are not proof of the whole object, so they never resume
+        if result.ok and result.method != "sample":
+            self.state.record(target, etag)
+        return result
+
+    def _check_stored_checksum(
+        self, target: VerifyTarget, head: Dict[str, Any]
+    ) -> VerifyResult | None:
+        stored = head.get("ChecksumSHA256")
+        # Composite multipart checksums ("<b64>-<parts>") need part boundaries
+        if not stored or "-" in stored:
+            return None
+        checksum_type = head.get("ChecksumType")
+        # Stores that omit ChecksumType may still return a composite value for
+        # multipart objects (ETag "<md5>-<parts>"), so only trust it when told
+        if checksum_type is None and "-" in head.get("ETag", ""):
+            return None
+        if checksum_type not in (None, "FULL_OBJECT"):
+            return None
+        actual = base64.b64decode(stored).hex()
+        return digest_result(target, "stored-checksum", actual)
+
+    def _stream(self, target: VerifyTarget) -> VerifyResult:
+        response = self.client.get_object(Bucket=target.bucket, Key=target.key)
+        digest = hashlib.sha256()
+        for chunk in response["Body"].iter_chunks(DEFAULT_BUFFER_SIZE):
+            digest.update(chunk)
+        return digest_result(target, "stream", digest.hexdigest())
+
+    def _sample_blocks(self, target: VerifyTarget, size: int) -> VerifyResult:
+        count = len(target.block_hashes)
+        # Seeded by key so reruns check the same blocks; first and last always
+        chooser = random.Random(target.key)
+        middle = list(range(1, count - 1))
+        picked = {0, count - 1} | set(
+            chooser.sample(middle, min(len(middle), max(self.samples - 2, 0)))
+        )
+        for index in sorted(picked):
+            start = index * target.block_size
+            end = min(start + target.block_size, size) - 1
+            response = self.client.get_object(
+                Bucket=target.bucket, Key=target.key, Range=f"bytes={start}-{end}"
+            )
+            digest = hashlib.sha256()
+            for chunk in response["Body"].iter_chunks(DEFAULT_BUFFER_SIZE):
+                digest.update(chunk)
+            if digest.hexdigest() != target.block_hashes[index]:
+                return VerifyResult(
+                    target, False, "sample", f"block {index} of {count} differs"
+                )
+        return VerifyResult(
+            target, True, "sample", f"{len(picked)}/{count} block(s) matched"
+        )
+
+
+def digest_result(target: VerifyTarget, method: str, actual: str) -> VerifyResult:
+    if actual == target.checksum_sha256:
+        return VerifyResult(target, True, method, actual)
+    return VerifyResult(
+        target, False, method, f"expected {target.checksum_sha256}, got {actual}"
+    )
+
+
+def create_client(endpoint_url: str | None, region: str, workers: int) -> Any:
+    session = botocore.session.get_session()
+    return session.create_client(
+        "s3",
+        endpoint_url=endpoint_url or None,
+        region_name=region,
+        config=Config(
+            max_pool_connections=workers,
+            retries={"max_attempts": 5, "mode": "standard"},
+        ),
+    )
+
+
+def run(
+    verifier: S3Verifier, targets: List[VerifyTarget], workers: int
+) -> List[VerifyResult]:
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="s3-verify"
+    ) as executor:
+        results = list(executor.map(verifier.verify, targets))
+    for result in results:
+        if result.ok:
+            print(f"[INFO] ✅ {result.target.url} ({result.method}): {result.detail}")
+        else:
+            print(
+                f"[ERROR] ❌ {result.target.url} ({result.method}): {result.detail}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload", type=Path, help="publish-payload.json to verify")
+    parser.add_argument("--bucket", help="Bucket holding the payload's spaces_path keys")
+    parser.add_argument(
+        "--object",
+        nargs=2,
+        action="append",
+        default=[],
+        metavar=("S3_URL", "SHA256"),
+        help="Extra object to verify (repeatable)",
+    )
+    parser.add_argument(
+        "--inspections",
+        type=Path,
+        help=(
+            "JSON of {spaces_path: ArtifactInspection.to_dict()} with block hashes "
+            "for --mode sample"
+        ),
+    )
+    parser.add_argument("--mode", choices=MODES, default="auto")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--state", type=Path, help="Resume file of verified objects")
+    parser.add_argument(
+        "--endpoint-url",
+        default=os.environ.get("SPACES_ENDPOINT") or os.environ.get("AWS_ENDPOINT_URL"),
+    )
+    parser.add_argument(
+        "--region", default=os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
+    )
+    args = parser.parse_args(argv)
+    if args.payload and not args.bucket:
+        parser.error("--bucket is required with --payload")
+    if not args.payload and not args.object:
+        parser.error("nothing to verify: pass --payload and/or --object")
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    if botocore is None:
+        print(
+            "[ERROR] botocore is required (pip install botocore)", file=sys.stderr
+        )
+        return 1
+
+    targets: List[VerifyTarget] = []
+    if args.payload:
+        payload = json.loads(args.payload.read_text(encoding="utf-8"))
+        inspections: Dict[str, Any] = {}
+        if args.inspections:
+            inspections = json.loads(args.inspections.read_text(encoding="utf-8"))
+        targets += targets_from_payload(payload, args.bucket, inspections)
+    for url, checksum in args.object:
+        bucket, key = parse_s3_url(url)
+        targets.append(VerifyTarget(bucket=bucket, key=key, checksum_sha256=checksum))
+
+    workers = max(1, min(args.workers, len(targets)))
+    client = create_client(args.endpoint_url, args.region, workers)
+    verifier = S3Verifier(client, args.mode, args.samples, VerifyState(args.state))
+    print(f"[INFO] Verifying {len(targets)} object(s) with {workers} worker(s)")
+    results = run(verifier, targets, workers)
+
+    failed = [result for result in results if not result.ok]
+    if failed:
+        print(f"[ERROR] {len(failed)} of {len(results)} object(s) failed", file=sys.stderr)
+        return 1
+    print(f"[INFO] All {len(results)} object(s) verified")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -8,9 +8,10 @@ import json
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 try:
     import tomllib
@@ -49,6 +50,33 @@ LEGACY_PATH_MARKERS = (
     ".github/copilot-instructions.md",
 )
 SECRET_KEYS = ("api_key", "apikey", "token", "secret", "password")
+DEFAULT_JOBS = 8
+
+# Runs every hook fixture in one interpreter: loads the hook as a module and
+# calls its main() once per payload with stdin/stdout swapped out.
+HOOK_FIXTURE_DRIVER = """
+import contextlib, importlib.util, io, json, sys
+
+spec = importlib.util.spec_from_file_location("pre_tool_guard", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+results = []
+for payload in json.load(sys.stdin):
+    sys.stdin = io.StringIO(json.dumps(payload))
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            module.main()
+    except SystemExit as exc:
+        if exc.code not in (None, 0):
+            results.append({"returncode": exc.code if isinstance(exc.code, int) else 1})
+            continue
+    except Exception:
+        results.append({"returncode": 1})
+        continue
+    results.append({"returncode": 0, "stdout": stdout.getvalue()})
+json.dump(results, sys.__stdout__)
+"""
 
 
 @dataclass
@@ -211,6 +239,17 @@ def validate_codex_config(repo: Path, reporter: Reporter) -> None:
             reporter.error(repo, f"{path}:{line_no}", "possible hard-coded secret in Codex config")
 
 
+def parse_hook_decision(returncode: int, stdout: str) -> str:
+    if returncode != 0:
+        return f"process-error:{returncode}"
+    try:
+        output = json.loads(stdout)
+    except json.JSONDecodeError:
+        return "invalid-json"
+    hook_output = output.get("hookSpecificOutput", {})
+    return str(hook_output.get("permissionDecision") or "")
+
+
 def run_hook_fixture(script: Path, payload: dict[str, Any]) -> str:
     result = subprocess.run(
         [sys.executable, str(script)],
@@ -219,14 +258,29 @@ def run_hook_fixture(script: Path, payload: dict[str, Any]) -> str:
         capture_output=True,
         check=False,
     )
-    if result.returncode != 0:
-        return f"process-error:{result.returncode}"
+    return parse_hook_decision(result.returncode, result.stdout)
+
+
+def run_hook_fixtures(script: Path, payloads: list[dict[str, Any]]) -> list[str]:
+    """Decide every payload in one batched interpreter instead of one per fixture.
+
+    Falls back to a process per fixture when the hook cannot be driven as a
+    module (no main(), or it fails to import).
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", HOOK_FIXTURE_DRIVER, str(script)],
+        input=json.dumps(payloads),
+        text=True,
+        capture_output=True,
+        check=False,
+    )
     try:
-        output = json.loads(result.stdout)
+        outcomes = json.loads(result.stdout) if result.returncode == 0 else None
     except json.JSONDecodeError:
-        return "invalid-json"
-    hook_output = output.get("hookSpecificOutput", {})
-    return str(hook_output.get("permissionDecision") or "")
+        outcomes = None
+    if not isinstance(outcomes, list) or len(outcomes) != len(payloads):
+        return [run_hook_fixture(script, payload) for payload in payloads]
+    return [parse_hook_decision(outcome["returncode"], outcome.get("stdout", "")) for outcome in outcomes]
 
 
 def validate_hooks(repo: Path, reporter: Reporter) -> None:
@@ -286,8 +340,8 @@ def validate_hooks(repo: Path, reporter: Reporter) -> None:
             "deny",
         ),
     ]
-    for name, payload, expected in fixtures:
-        actual = run_hook_fixture(hook_script, payload)
+    decisions = run_hook_fixtures(hook_script, [payload for _, payload, _ in fixtures])
+    for (name, _, expected), actual in zip(fixtures, decisions):
         if actual != expected:
             reporter.error(repo, hook_script, f"hook fixture failed for {name}: expected {expected}, got {actual}")
 
@@ -307,12 +361,41 @@ def discover_repos(start: Path, scope: str) -> list[Path]:
     return candidates
 
 
+VALIDATORS: tuple[Callable[[Path, Reporter], None], ...] = (
+    validate_agents_md,
+    validate_skills,
+    validate_codex_agents,
+    validate_codex_config,
+    validate_hooks,
+)
+
+
 def validate_repo(repo: Path, reporter: Reporter) -> None:
-    validate_agents_md(repo, reporter)
-    validate_skills(repo, reporter)
-    validate_codex_agents(repo, reporter)
-    validate_codex_config(repo, reporter)
-    validate_hooks(repo, reporter)
+    for validator in VALIDATORS:
+        validator(repo, reporter)
+
+
+def validate_repos(repos: list[Path], jobs: int = DEFAULT_JOBS) -> list[Finding]:
+    """Run every validator for every repo concurrently.
+
+    Each (repo, validator) pair reports into its own Reporter and the findings
+    are concatenated in repo then validator order, so output does not depend
+    on scheduling.
+    """
+    tasks = [(repo, validator) for repo in repos for validator in VALIDATORS]
+
+    def run(task: tuple[Path, Callable[[Path, Reporter], None]]) -> list[Finding]:
+        repo, validator = task
+        reporter = Reporter()
+        validator(repo, reporter)
+        return reporter.findings
+
+    if jobs <= 1:
+        results = [run(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(run, tasks))
+    return [finding for findings in results for finding in findings]
 
 
 def write_reports(repo: Path, findings: list[Finding], output_format: str) -> None:
@@ -353,13 +436,18 @@ def main(argv: list[str]) -> int:
     parser.add_argument("--scope", choices=("repo", "workspace"), default=os.environ.get("SCOPE", "repo"))
     parser.add_argument("--format", choices=("text", "json"), default=os.environ.get("FORMAT", "text"))
     parser.add_argument("--strict", action="store_true", default=os.environ.get("STRICT") == "1")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=int(os.environ.get("JOBS") or DEFAULT_JOBS),
+        help=f"Validators to run concurrently (default: {DEFAULT_JOBS}; 1 runs serially)",
+    )
     args = parser.parse_args(argv)
 
     start = Path(args.repo)
     repos = discover_repos(start, args.scope)
     reporter = Reporter()
-    for repo in repos:
-        validate_repo(repo, reporter)
+    reporter.findings = validate_repos(repos, args.jobs)
 
     if args.strict:
         for finding in list(reporter.findings):
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Benchmark the guard rule engine shared by the Codex and Copilot hooks.
+
+Three measurements:
+- Rule loading: compiling guard_rules.json from source against loading the
+  on-disk cache and the in-process copy.
+- Throughput in decisions per second over a corpus of recorded tool calls
+  (guard_corpus.jsonl by default; record your own with ROSTOC_GUARD_RECORD).
+- decide() on large synthetic apply_patch payloads, against the old scan
+  that tested every string in tool_input, file bodies included, against
+  every generated prefix.
+
+Usage:
+    python guard_benchmark.py [--corpus FILE] [--seconds S]
+                              [--patch-mb 1 8 16] [--files N] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, List
+
+import guard_rules
+
+DEFAULT_CORPUS = Path(__file__).resolve().with_name("guard_corpus.jsonl")
+LEGACY_PREFIXES = (
+    "src/client/generated/",
+    "src/client/backend-api/",
+    "frontend/packages/types/api/",
+)
+BODY_LINE = "+    const value = computeSomething(input, options); // keep the line realistic\n"
+
+
+def load_corpus(path: Path) -> List[Any]:
+    with path.open(encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def synthetic_patch(size_mb: float, files: int) -> str:
+    """An apply_patch body touching ``files`` ordinary source files."""
+    per_file = max(1, int(size_mb * 1024 * 1024 / files / len(BODY_LINE)))
+    parts = ["*** Begin Patch\n"]
+    for index in range(files):
+        parts.append(f"*** Update File: src/features/module_{index}/component.tsx\n@@\n")
+        parts.append(BODY_LINE * per_file)
+    parts.append("*** End Patch\n")
+    return "".join(parts)
+
+
+def legacy_blocked(tool_input: Any) -> bool:
+    """The pre-engine check: every string, every prefix."""
+
+    def collect_strings(value: Any) -> List[str]:
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, list):
+            return [text for item in value for text in collect_strings(item)]
+        if isinstance(value, dict):
+            return [text for item in value.values() for text in collect_strings(item)]
+        return []
+
+    for raw_value in collect_strings(tool_input):
+        candidate = guard_rules.normalize_path(raw_value)
+        if any(
+            candidate.startswith(prefix) or prefix in candidate or f"/{prefix}" in candidate
+            for prefix in LEGACY_PREFIXES
+        ):
+            return True
+    return False
+
+
+def _median_ms(call: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark_loading(repeat: int) -> None:
+    rules_file = guard_rules.RULES_FILE
+    print(f"[INFO] Rule loading, median of {repeat}")
+    previous = os.environ.get("ROSTOC_GUARD_CACHE_DIR")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["ROSTOC_GUARD_CACHE_DIR"] = cache_dir
+        source = _median_ms(lambda: guard_rules.load_rules(rules_file, use_cache=False), repeat)
+        guard_rules.load_rules(rules_file)
+
+        def from_disk() -> None:
+            guard_rules._loaded.clear()
+            guard_rules.load_rules(rules_file)
+
+        disk = _median_ms(from_disk, repeat)
+        memory = _median_ms(lambda: guard_rules.load_rules(rules_file), repeat)
+    if previous is None:
+        del os.environ["ROSTOC_GUARD_CACHE_DIR"]
+    else:
+        os.environ["ROSTOC_GUARD_CACHE_DIR"] = previous
+    print(f"  compile from source {source:.3f} ms, disk cache {disk:.3f} ms, in memory {memory:.4f} ms")
+
+
+def benchmark_corpus(corpus: List[Any], seconds: float) -> None:
+    rules = guard_rules.load_rules()
+    verdicts = Counter(
+        (rules.evaluate(payload) or {"decision": "allow"})["decision"] for payload in corpus
+    )
+    summary = ", ".join(f"{count} {decision}" for decision, count in sorted(verdicts.items()))
+    print(f"[INFO] Corpus: {len(corpus)} recorded calls ({summary})")
+
+    for label, call in (
+        ("evaluate()", rules.evaluate),
+        ("decide() with response", guard_rules.decide),
+    ):
+        decisions = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while time.perf_counter() < deadline:
+            for payload in corpus:
+                call(payload)
+            decisions += len(corpus)
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {label}: {decisions / elapsed:,.0f} decisions/s "
+            f"({elapsed / decisions * 1e6:.1f} us each)"
+        )
+
+
+def benchmark_patches(sizes: List[float], files: int, repeat: int) -> None:
+    for size_mb in sizes:
+        patch = synthetic_patch(size_mb, files)
+        payload = {"tool_name": "apply_patch", "tool_input": {"patch": patch}}
+        decision = guard_rules.decide(payload)["hookSpecificOutput"]["permissionDecision"]
+        legacy = _median_ms(lambda: legacy_blocked(payload["tool_input"]), repeat)
+        current = _median_ms(lambda: guard_rules.decide(payload), repeat)
+        print(
+            f"[INFO] {len(patch) / 1024 / 1024:.1f} MB patch, {files} files: "
+            f"legacy scan {legacy:.2f} ms, decide() {current:.2f} ms "
+            f"({legacy / current:.1f}x), decision {decision}"
+        )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="JSON lines of payloads")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time per throughput run")
+    parser.add_argument(
+        "--patch-mb", type=float, nargs="+", default=[1, 8, 16], help="Patch sizes to time"
+    )
+    parser.add_argument("--files", type=int, default=200, help="Files per synthetic patch")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    args = parser.parse_args(argv)
+
+    if os.environ.pop("ROSTOC_GUARD_RECORD", None):
+        print("[WARN] Ignoring ROSTOC_GUARD_RECORD while benchmarking")
+    benchmark_loading(max(args.repeat, 20))
+    benchmark_corpus(load_corpus(args.corpus), args.seconds)
+    benchmark_patches(args.patch_mb, args.files, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Long-lived PreToolUse guard server for the Codex and Copilot hooks.
+
+Agents run the guard hook before every tool call, and a fresh interpreter
+per call costs more than the decision itself. guard_hook.sh sends each
+payload to this server over a loopback socket instead. If the server is
+not running, guard_hook.sh runs the hook script cold and starts the server
+in the background for the calls that follow.
+
+Protocol (one request per connection):
+    client: "<hook> <payload bytes>\\n" + payload
+    server: "<token>\\n" + response JSON, then close
+
+The port and a random token are written to a 0600 port file. The client
+only trusts responses that start with the token, so a stale port reused
+by another process cannot answer "allow". Decisions come from each hook
+script's decide(), which both delegate to guard_rules.py. A hook module is
+reloaded when it or the rule engine changes on disk, so edits take effect
+on the next call; the engine itself picks up guard_rules.json changes. The server exits after --idle-seconds
+without requests.
+
+Latency benchmark (cold interpreter vs. daemon through guard_hook.sh):
+    python guard_daemon.py --benchmark [--calls N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import secrets
+import socketserver
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows
+    fcntl = None
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+HOOK_SCRIPTS = {
+    "codex": Path(".codex/hooks/pre_tool_guard.py"),
+    "copilot": Path("scripts/copilot_hooks/pre_tool_guard.py"),
+}
+ENGINE = Path(__file__).resolve().with_name("guard_rules.py")
+SHIM = Path(__file__).resolve().parent / "guard_hook.sh"
+DEFAULT_IDLE_SECONDS = 30 * 60
+MAX_HEADER_BYTES = 256
+# apply_patch payloads can carry whole files
+MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+
+
+class HookModules:
+    """Hook scripts loaded as modules, reloaded when they or the engine change on disk."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._loaded: Dict[str, tuple[tuple[int, int], ModuleType]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ModuleType:
+        path = self.root / HOOK_SCRIPTS[name]
+        engine = self.root / "scripts" / "tool_guard" / ENGINE.name
+        mtime = (path.stat().st_mtime_ns, engine.stat().st_mtime_ns if engine.exists() else 0)
+        with self._lock:
+            cached = self._loaded.get(name)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            if cached is not None and cached[0][1] != mtime[1]:
+                # The adapters import the engine; drop it so they import the new one
+                sys.modules.pop(ENGINE.stem, None)
+            spec = importlib.util.spec_from_file_location(f"{name}_pre_tool_guard", path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"cannot load {path}")
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._loaded[name] = (mtime, module)
+            return module
+
+
+def decide(modules: HookModules, name: str, body: bytes) -> Dict[str, Any]:
+    """Same decision the hook script prints when run with ``body`` on stdin."""
+    module = modules.get(name)
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return module.make_response("allow", "Hook input was not valid JSON")
+    return module.decide(payload)
+
+
+class GuardHandler(socketserver.StreamRequestHandler):
+    server: "GuardServer"
+
+    def handle(self) -> None:
+        self.server.touch()
+        header = self.rfile.readline(MAX_HEADER_BYTES).decode("ascii", errors="replace").split()
+        if len(header) != 2 or header[0] not in HOOK_SCRIPTS or not header[1].isdigit():
+            return
+        length = int(header[1])
+        if length > MAX_PAYLOAD_BYTES:
+            return
+        body = self.rfile.read(length)
+        try:
+            response = decide(self.server.modules, header[0], body)
+        except Exception as exc:  # noqa: BLE001 - the client falls back to a cold run
+            print(f"[WARN] {header[0]} hook failed: {exc!r}", file=sys.stderr)
+            return
+        self.wfile.write(f"{self.server.token}\n{json.dumps(response)}".encode("utf-8"))
+
+
+class GuardServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self, root: Path, idle_seconds: float) -> None:
+        super().__init__(("127.0.0.1", 0), GuardHandler)
+        self.modules = HookModules(root)
+        self.token = secrets.token_hex(16)
+        self.idle_seconds = idle_seconds
+        self._last_request = time.monotonic()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def touch(self) -> None:
+        self._last_request = time.monotonic()
+
+    def watch_idle(self) -> None:
+        while time.monotonic() - self._last_request < self.idle_seconds:
+            time.sleep(min(30.0, self.idle_seconds))
+        self.shutdown()
+
+
+def write_port_file(path: Path, port: int, token: str) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="ascii") as handle:
+        handle.write(f"{port} {token}\n")
+    os.replace(tmp_path, path)
+
+
+def remove_port_file(path: Path, token: str) -> None:
+    """Remove the port file unless a newer server has already replaced it."""
+    try:
+        if path.read_text(encoding="ascii").split()[1] == token:
+            path.unlink()
+    except (OSError, IndexError):
+        pass
+
+
+def serve(root: Path, port_file: Path, idle_seconds: float) -> int:
+    lock_handle = None
+    if fcntl is not None:
+        # One server per port file; concurrent hook calls may all try to start one
+        lock_handle = open(f"{port_file}.lock", "w")
+        try:
+            fcntl.flock(lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+
+    server = GuardServer(root, idle_seconds)
+    for name in HOOK_SCRIPTS:
+        try:
+            server.modules.get(name)
+        except (OSError, ImportError, SyntaxError) as exc:
+            print(f"[WARN] Could not preload {name} hook: {exc}", file=sys.stderr)
+    write_port_file(port_file, server.port, server.token)
+    threading.Thread(target=server.watch_idle, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        remove_port_file(port_file, server.token)
+        server.server_close()
+        if lock_handle is not None:
+            lock_handle.close()
+    return 0
+
+
+def _time_calls(command: List[str], payload: str, calls: int, env: Dict[str, str]) -> List[float]:
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        result = subprocess.run(
+            command, input=payload, text=True, capture_output=True, env=env, check=False
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        if '"permissionDecision"' not in result.stdout:
+            raise RuntimeError(f"{command[-1]} returned no decision: {result.stderr.strip()}")
+    return timings
+
+
+def _describe(label: str, timings: List[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{label}: median {statistics.median(ordered):.1f} ms, p95 {p95:.1f} ms"
+
+
+def run_benchmark(root: Path, calls: int) -> int:
+    payload = json.dumps({"tool_name": "Bash", "tool_input": {"command": "git status --short"}})
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as temp_dir:
+        port_file = Path(temp_dir) / "guard.port"
+        env = dict(os.environ, ROSTOC_GUARD_PORT_FILE=str(port_file))
+        server = GuardServer(root, DEFAULT_IDLE_SECONDS)
+        write_port_file(port_file, server.port, server.token)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            for name, script in HOOK_SCRIPTS.items():
+                cold = _time_calls([python, str(root / script)], payload, calls, env)
+                warm = _time_calls(["bash", str(SHIM), name], payload, calls, env)
+                print(f"[INFO] {name} hook, {calls} calls")
+                print(f"  {_describe('cold interpreter', cold)}")
+                print(f"  {_describe('daemon via shim ', warm)}")
+                speedup = statistics.median(cold) / statistics.median(warm)
+                print(f"  {speedup:.1f}x faster per call")
+        finally:
+            server.shutdown()
+            server.server_close()
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", type=Path, default=REPO_ROOT, help="Repository root")
+    parser.add_argument("--port-file", type=Path, help="Where to publish the port and token")
+    parser.add_argument(
+        "--idle-seconds",
+        type=float,
+        default=DEFAULT_IDLE_SECONDS,
+        help="Exit after this long without requests (default: 30 minutes)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare cold-process and daemon latency per hook call",
+    )
+    parser.add_argument("--calls", type=int, default=50, help="Calls per benchmark mode")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        return run_benchmark(args.root.resolve(), args.calls)
+    if args.port_file is None:
+        parser.error("--port-file is required")
+    return serve(args.root.resolve(), args.port_file, args.idle_seconds)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,55 @@
+#!/usr/bin/env bash
+# PreToolUse hook entry point for the Codex and Copilot safety guards.
+# Usage: guard_hook.sh <codex|copilot>   (hook payload JSON on stdin)
+#
+# Asks the long-lived guard_daemon.py over a loopback socket, which avoids an
+# interpreter start per tool call. When no daemon answers, runs the hook
+# script directly and starts a daemon in the background for later calls.
+# Set ROSTOC_GUARD_DAEMON=0 to always run the hook script directly.
+
+set -uo pipefail
+
+HOOK_NAME="${1:?Hook name required (codex or copilot)}"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ROOT="$(cd "${SCRIPT_DIR}/../.." && pwd)"
+
+case "${HOOK_NAME}" in
+  codex) HOOK_SCRIPT="${ROOT}/.codex/hooks/pre_tool_guard.py" ;;
+  copilot) HOOK_SCRIPT="${ROOT}/scripts/copilot_hooks/pre_tool_guard.py" ;;
+  *)
+    echo "[ERROR] Unknown hook: ${HOOK_NAME}" >&2
+    exit 2
+    ;;
+esac
+
+PYTHON_BIN="$(command -v python3 || command -v python)"
+# Per-user, per-checkout; XDG_RUNTIME_DIR is private to the user when set
+RUNTIME_DIR="${XDG_RUNTIME_DIR:-${TMPDIR:-/tmp}}"
+PORT_FILE="${ROSTOC_GUARD_PORT_FILE:-${RUNTIME_DIR%/}/rostoc-tool-guard-${UID}${ROOT//[^A-Za-z0-9]/_}.port}"
+
+PAYLOAD="$(cat)"
+
+if [[ "${ROSTOC_GUARD_DAEMON:-1}" != "0" ]]; then
+  # -O: only trust a port file we own
+  if [[ -O "${PORT_FILE}" ]] && read -r PORT TOKEN < "${PORT_FILE}"; then
+    if { exec 3<>"/dev/tcp/127.0.0.1/${PORT}"; } 2>/dev/null; then
+      # Byte length, not character length, of the payload
+      LC_ALL=C
+      printf '%s %d\n%s' "${HOOK_NAME}" "${#PAYLOAD}" "${PAYLOAD}" >&3
+      RESPONSE=""
+      IFS= read -r -d '' -t 5 RESPONSE <&3
+      READ_STATUS=$?
+      exec 3<&-
+      # read returns 1 at end of input; anything above 128 is a timeout
+      if [[ ${READ_STATUS} -le 1 && "${RESPONSE%%$'\n'*}" == "${TOKEN}" ]]; then
+        printf '%s' "${RESPONSE#*$'\n'}"
+        exit 0
+      fi
+    fi
+  fi
+
+  nohup "${PYTHON_BIN}" "${SCRIPT_DIR}/guard_daemon.py" \
+    --root "${ROOT}" --port-file "${PORT_FILE}" >/dev/null 2>&1 &
+fi
+
+printf '%s' "${PAYLOAD}" | exec "${PYTHON_BIN}" "${HOOK_SCRIPT}"
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""Shared PreToolUse rule engine behind the Codex and Copilot guard hooks.
+
+The rules live in guard_rules.json: which tool names count as file edits
+or terminal commands, which path prefixes are protected, and which
+commands are destructive. compile_rules() turns them into a matcher:
+- Tool names are classified once per name and memoized.
+- All protected prefixes become one regex.
+- Command rules are indexed by program name behind a prefilter, so a
+  command that cannot name any listed program is never tokenized.
+
+The compiled form is cached on disk, keyed by the rule file's mtime and
+size. It is also kept in memory for the life of the process, which is the
+guard daemon's case. Editing the rule file takes effect on the next call.
+Regex objects cannot be persisted, so a cache hit skips validation and
+expansion but still compiles the three patterns.
+
+Set ROSTOC_GUARD_RECORD to a file to append every payload to it as JSON
+lines; guard_benchmark.py replays such a corpus. The daemon only records
+when it was started with the variable set.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shlex
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+RULES_FILE = Path(__file__).resolve().with_name("guard_rules.json")
+RULES_VERSION = 1
+# Bump when the compiled layout changes so stale caches are ignored
+CACHE_VERSION = 1
+DECISIONS = ("allow", "ask", "deny")
+TOOL_KINDS = ("write", "terminal")
+MAX_TOOL_NAMES = 1024
+
+# Bounds for walking tool_input; anything larger is asked about, not skimmed
+MAX_NODES = 10_000
+MAX_DEPTH = 64
+MAX_PATH_CHARS = 4096
+MAX_STRING_CHARS = 16 * 1024 * 1024
+
+# apply_patch headers and unified diff file lines. Anchored on "\n" rather
+# than a MULTILINE "^" so the regex engine skips straight between newlines.
+PATCH_HEADER = re.compile(
+    r"\n(?:\*\*\* (?:Update|Add|Delete) File:|\*\*\* Move to:|\+\+\+|---)[ \t]+"
+    r"(?:[ab]/)?([^\r\n]+?)[ \t]*\r?(?=\n|$)"
+)
+# Quoting can split a program name (g"it") without changing the token shlex
+# yields, so the command prefilter looks at the text with quoting removed
+QUOTING = str.maketrans("", "", "'\"\\")
+
+
+class RuleError(ValueError):
+    pass
+
+
+class InputTooLarge(Exception):
+    pass
+
+
+def make_response(decision, reason, *, context=None):
+    payload = {
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "permissionDecision": decision,
+            "permissionDecisionReason": reason,
+        }
+    }
+    if context:
+        payload["hookSpecificOutput"]["additionalContext"] = context
+    return payload
+
+
+def _require(condition: bool, message: str) -> None:
+    if not condition:
+        raise RuleError(message)
+
+
+def _strings(value: Any, where: str) -> List[str]:
+    _require(
+        isinstance(value, list) and all(isinstance(item, str) and item for item in value),
+        f"{where} must be a list of non-empty strings",
+    )
+    return value
+
+
+def _alternation(words: List[str]) -> str:
+    # Longest first, so a prefix of another entry cannot shadow it
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+def _verdict(group: Dict[str, Any], rule: Dict[str, Any], where: str) -> Dict[str, Any]:
+    verdict = {
+        "rule": rule["name"],
+        "decision": rule.get("decision", group.get("decision")),
+        "reason": rule.get("reason", group.get("reason")),
+        "context": rule.get("context", group.get("context")),
+    }
+    _require(verdict["decision"] in DECISIONS, f"{where}: decision must be one of {DECISIONS}")
+    _require(isinstance(verdict["reason"], str) and verdict["reason"], f"{where}: reason is required")
+    return verdict
+
+
+def _rule_group(data: Dict[str, Any], key: str) -> tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    group = data.get(key, {"rules": []})
+    _require(isinstance(group, dict), f"{key} must be an object")
+    rules = group.get("rules", [])
+    _require(isinstance(rules, list), f"{key}.rules must be a list")
+    for index, rule in enumerate(rules):
+        where = f"{key}.rules[{index}]"
+        _require(isinstance(rule, dict), f"{where} must be an object")
+        _require(isinstance(rule.get("name"), str) and rule["name"], f"{where}: name is required")
+    return group, rules
+
+
+def compile_rules(data: Any) -> Dict[str, Any]:
+    """Validate a parsed rule file and expand it into the JSON-serializable compiled form."""
+    _require(isinstance(data, dict), "rule file must be a JSON object")
+    _require(data.get("version") == RULES_VERSION, f"unsupported rule file version: {data.get('version')!r}")
+
+    keys = data.get("payload_keys", {})
+    _require(isinstance(keys, dict), "payload_keys must be an object")
+    payload_keys = {
+        field: _strings(keys.get(field, [field]), f"payload_keys.{field}")
+        for field in ("tool_name", "tool_input", "command")
+    }
+
+    tool_specs = data.get("tools")
+    _require(isinstance(tool_specs, dict), "tools must be an object")
+    tools = {}
+    for kind in TOOL_KINDS:
+        spec = tool_specs.get(kind)
+        _require(isinstance(spec, dict), f"tools.{kind} must be an object")
+        tools[kind] = {
+            "names": [name.lower() for name in _strings(spec.get("names", []), f"tools.{kind}.names")],
+            "contains": _alternation(_strings(spec.get("contains", []), f"tools.{kind}.contains")),
+            "unless": _alternation(
+                _strings(spec.get("unless_contains", []), f"tools.{kind}.unless_contains")
+            ),
+        }
+
+    group, rules = _rule_group(data, "protected_paths")
+    path_groups = []
+    path_verdicts = []
+    for index, rule in enumerate(rules):
+        where = f"protected_paths.rules[{index}]"
+        prefixes = [
+            prefix.replace("\\", "/").lstrip("./")
+            for prefix in _strings(rule.get("prefixes"), f"{where}.prefixes")
+        ]
+        path_groups.append(f"(?P<p{index}>{_alternation(prefixes)})")
+        path_verdicts.append(_verdict(group, rule, where))
+    # A protected prefix at the start of a candidate path or after a "/"
+    path_regex = f"(?:^|/)(?:{'|'.join(path_groups)})" if path_groups else ""
+
+    group, rules = _rule_group(data, "destructive_commands")
+    by_program: Dict[str, List[Dict[str, Any]]] = {}
+    for index, rule in enumerate(rules):
+        where = f"destructive_commands.rules[{index}]"
+        program = rule.get("program")
+        _require(isinstance(program, str) and program.strip(), f"{where}: program is required")
+        matcher = {
+            "subcommand": rule.get("subcommand"),
+            "option": rule.get("option"),
+            "flags": rule.get("flags", ""),
+            "verdict": _verdict(group, rule, where),
+        }
+        for field in ("subcommand", "option"):
+            _require(
+                matcher[field] is None or isinstance(matcher[field], str) and matcher[field],
+                f"{where}: {field} must be a non-empty string",
+            )
+        _require(isinstance(matcher["flags"], str), f"{where}: flags must be a string")
+        _require(
+            matcher["subcommand"] or matcher["option"] or matcher["flags"],
+            f"{where}: needs a subcommand, option, or flags to match on",
+        )
+        for field in ("subcommand", "option", "flags"):
+            if matcher[field]:
+                matcher[field] = matcher[field].lower()
+        by_program.setdefault(program.lower(), []).append(matcher)
+    prefilter = (
+        f"(?<![\\w.-])(?:{_alternation(list(by_program))})(?![\\w.-])" if by_program else ""
+    )
+
+    return {
+        "payload_keys": payload_keys,
+        "tools": tools,
+        "paths": {"regex": path_regex, "verdicts": path_verdicts},
+        "commands": {"prefilter": prefilter, "by_program": by_program},
+    }
+
+
+def _compile(pattern: str) -> Optional[re.Pattern[str]]:
+    return re.compile(pattern) if pattern else None
+
+
+def patch_header_paths(text: str) -> Iterator[str]:
+    end = text.find("\n")
+    first = PATCH_HEADER.match("\n" + (text if end == -1 else text[:end]))
+    if first:
+        yield first.group(1)
+    for match in PATCH_HEADER.finditer(text):
+        yield match.group(1)
+
+
+def candidate_paths(value: Any) -> Iterator[str]:
+    """Yield strings from tool_input that can name a file.
+
+    Short single-line strings (file_path, filePath, paths lists, ...) are yielded
+    as-is. Multi-line strings are patch or file bodies, so only their patch
+    header paths are yielded. The walk uses an explicit stack and is bounded;
+    oversized input raises InputTooLarge instead of being skimmed.
+    """
+    stack = [(value, 0)]
+    nodes = 0
+    while stack:
+        item, depth = stack.pop()
+        nodes += 1
+        if nodes > MAX_NODES or depth > MAX_DEPTH:
+            raise InputTooLarge("tool input is too deeply nested or has too many values")
+        if isinstance(item, str):
+            if len(item) > MAX_STRING_CHARS:
+                raise InputTooLarge("tool input string is too large to inspect")
+            if "\n" in item or item.startswith(("***", "---", "+++")):
+                yield from patch_header_paths(item)
+            elif len(item) <= MAX_PATH_CHARS:
+                yield item
+        elif isinstance(item, dict):
+            stack.extend((child, depth + 1) for child in item.values())
+        elif isinstance(item, list):
+            stack.extend((child, depth + 1) for child in item)
+
+
+def normalize_path(value: str) -> str:
+    normalized = value.replace("\\", "/").lstrip("./")
+    while normalized.startswith("../"):
+        normalized = normalized[3:]
+    return normalized
+
+
+def command_tokens(command: str) -> List[str]:
+    if not any(char in command for char in "'\"\\"):
+        return command.split()
+    try:
+        return shlex.split(command)
+    except ValueError:
+        return command.split()
+
+
+def flag_letters(tokens: List[str], start: int) -> set[str]:
+    letters: set[str] = set()
+    for token in tokens[start:]:
+        if token == "--":
+            break
+        if token.startswith("--"):
+            continue
+        if token.startswith("-"):
+            letters.update(token.lstrip("-"))
+    return letters
+
+
+def _first(mapping: Dict[str, Any], keys: List[str]) -> Any:
+    for key in keys:
+        value = mapping.get(key)
+        if value:
+            return value
+    return None
+
+
+class GuardRules:
+    """A compiled rule set; evaluate() returns the first matching verdict or None."""
+
+    def __init__(self, compiled: Dict[str, Any]) -> None:
+        self.keys = compiled["payload_keys"]
+        self._tools = {
+            kind: (frozenset(spec["names"]), _compile(spec["contains"]), _compile(spec["unless"]))
+            for kind, spec in compiled["tools"].items()
+        }
+        self._tool_kinds: Dict[str, frozenset[str]] = {}
+        self._path_regex = _compile(compiled["paths"]["regex"])
+        self._path_verdicts = compiled["paths"]["verdicts"]
+        self._prefilter = _compile(compiled["commands"]["prefilter"])
+        self._commands = compiled["commands"]["by_program"]
+
+    def tool_kinds(self, tool_name: str) -> frozenset[str]:
+        kinds = self._tool_kinds.get(tool_name)
+        if kinds is None:
+            kinds = frozenset(
+                kind
+                for kind, (names, contains, unless) in self._tools.items()
+                if tool_name in names
+                or contains is not None
+                and contains.search(tool_name)
+                and not (unless is not None and unless.search(tool_name))
+            )
+            if len(self._tool_kinds) < MAX_TOOL_NAMES:
+                self._tool_kinds[tool_name] = kinds
+        return kinds
+
+    def path_verdict(self, tool_input: Any) -> Optional[Dict[str, Any]]:
+        if self._path_regex is None:
+            return None
+        for raw_value in candidate_paths(tool_input):
+            match = self._path_regex.search(normalize_path(raw_value))
+            if match:
+                return self._path_verdicts[int(match.lastgroup[1:])]
+        return None
+
+    def command_verdict(self, command: str) -> Optional[Dict[str, Any]]:
+        lowered = command.lower()
+        if self._prefilter is None or not self._prefilter.search(lowered.translate(QUOTING)):
+            return None
+        tokens = command_tokens(lowered)
+        for index, token in enumerate(tokens):
+            for matcher in self._commands.get(token, ()):
+                start = index + 1
+                subcommand = matcher["subcommand"]
+                if subcommand is not None:
+                    if start >= len(tokens) or tokens[start] != subcommand:
+                        continue
+                    start += 1
+                if matcher["option"] is not None and matcher["option"] not in tokens[start:]:
+                    continue
+                if matcher["flags"] and not set(matcher["flags"]) <= flag_letters(tokens, start):
+                    continue
+                return matcher["verdict"]
+        return None
+
+    def evaluate(self, payload: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(payload, dict):
+            return None
+        tool_name = str(_first(payload, self.keys["tool_name"]) or "").lower()
+        tool_input = _first(payload, self.keys["tool_input"]) or {}
+        kinds = self.tool_kinds(tool_name)
+
+        if "write" in kinds:
+            try:
+                verdict = self.path_verdict(tool_input)
+            except InputTooLarge as exc:
+                return {
+                    "rule": "input-too-large",
+                    "decision": "ask",
+                    "reason": "Tool input is too large for the safety hook to inspect.",
+                    "context": f"Confirm this edit manually; {exc}.",
+                }
+            if verdict is not None:
+                return verdict
+
+        if "terminal" in kinds and isinstance(tool_input, dict):
+            command = str(_first(tool_input, self.keys["command"]) or "")
+            return self.command_verdict(command)
+        return None
+
+
+def cache_path(rules_file: Path) -> Path:
+    base = os.environ.get("ROSTOC_GUARD_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+        "rostoc-tool-guard",
+    )
+    digest = hashlib.sha1(str(rules_file).encode("utf-8")).hexdigest()[:12]
+    return Path(base) / f"rules-{digest}.json"
+
+
+def read_cache(rules_file: Path, key: List[int]) -> Optional[Dict[str, Any]]:
+    try:
+        cached = json.loads(cache_path(rules_file).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return None
+    if cached.get("source") != str(rules_file) or cached.get("key") != key:
+        return None
+    return cached.get("compiled")
+
+
+def write_cache(rules_file: Path, key: List[int], compiled: Dict[str, Any]) -> None:
+    path = cache_path(rules_file)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(
+            json.dumps(
+                {"version": CACHE_VERSION, "source": str(rules_file), "key": key, "compiled": compiled}
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        print(f"[WARN] Could not cache compiled guard rules at {path}: {exc}", file=sys.stderr)
+
+
+_loaded: Dict[Path, tuple[List[int], GuardRules]] = {}
+
+
+def load_rules(rules_file: Path = RULES_FILE, *, use_cache: bool = True) -> GuardRules:
+    """The compiled rule set for ``rules_file``, recompiled only when the file changes."""
+    stat = rules_file.stat()
+    key = [stat.st_mtime_ns, stat.st_size]
+    loaded = _loaded.get(rules_file)
+    if use_cache and loaded is not None and loaded[0] == key:
+        return loaded[1]
+    compiled = read_cache(rules_file, key) if use_cache else None
+    if compiled is None:
+        compiled = compile_rules(json.loads(rules_file.read_text(encoding="utf-8")))
+        if use_cache:
+            write_cache(rules_file, key, compiled)
+    rules = GuardRules(compiled)
+    if use_cache:
+        _loaded[rules_file] = (key, rules)
+    return rules
+
+
+def record(payload: Any) -> None:
+    path = os.environ.get("ROSTOC_GUARD_RECORD")
+    if not path:
+        return
+    try:
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(payload) + "\n")
+    except OSError as exc:
+        print(f"[WARN] Could not record hook payload to {path}: {exc}", file=sys.stderr)
+
+
+def decide(payload):
+    record(payload)
+    try:
+        rules = load_rules()
+    except (OSError, ValueError) as exc:
+        return make_response(
+            "ask",
+            "Safety hook rules could not be loaded.",
+            context=f"Fix {RULES_FILE.name}: {exc}",
+        )
+    verdict = rules.evaluate(payload)
+    if verdict is None:
+        return make_response("allow", "Allowed by safety hook")
+    return make_response(verdict["decision"], verdict["reason"], context=verdict["context"])
+
+
+def main():
+    try:
+        payload = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        json.dump(make_response("allow", "Hook input was not valid JSON"), sys.stdout)
+        return
+    json.dump(decide(payload), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()